@@ -0,0 +1,254 @@
+"""Benchmarks of the overhead eidos adds to every function call.
+
+Every benchmark is run for a number of rounds after a warmup, and the time per call
+is reported in seconds. Results are written as JSON, so that two runs (e.g., of two
+commits) can be compared:
+
+$ python benchmarks/run.py -o before.json
+$ python benchmarks/run.py -o after.json --compare before.json
+
+The benchmarks only use the settings read from the environment and the public routes
+and functions, so that they also run against older commits. Logging is set to
+warnings, so that the events of every call are not part of the measure.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+SALUTE = {
+    "name": "salute",
+    "description": "Say hello to someone.",
+    "module": "eidos.functions.core.salute",
+    "parameters": [
+        {
+            "name": "who",
+            "type": "str",
+            "description": "Name of whom to salute. o7",
+            "required": True,
+        },
+    ],
+    "response": {"msg": "str"},
+}
+
+
+def write_functions(folder: Path, count: int) -> None:
+    """Writes synthetic definitions until the folder has `count` of them."""
+    for i in range(count):
+        file_path = folder / f"salute_{i}.json"
+        if not file_path.exists():
+            definition = {**SALUTE, "name": f"salute_{i}"}
+            file_path.write_text(json.dumps(definition))
+
+
+def measure(
+    fn: Callable[[], Any], rounds: int, min_time: float = 0.05
+) -> dict[str, float]:
+    """Times a callable, calibrating the number of calls per round.
+
+    Args:
+        fn (Callable[[], Any]): The callable to time.
+        rounds (int): Number of rounds.
+        min_time (float): Minimum duration of a round, in seconds.
+
+    Returns:
+        dict[str, float]: Seconds per call (min, median, mean, stdev), calls per
+        round and rounds.
+    """
+    fn()  # Warmup.
+    calls = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        if time.perf_counter() - started >= min_time or calls >= 1_000_000:
+            break
+        calls *= 2
+
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        timings.append((time.perf_counter() - started) / calls)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "calls": calls,
+        "rounds": rounds,
+    }
+
+
+def bench_validation(rounds: int) -> dict[str, dict[str, float]]:
+    from eidos.models.function import load_model
+    from eidos.validation.schema import validate_input_schema, validate_output_schema
+    from eidos.validation.type import is_value_of_type
+
+    arguments = {"who": "Nikos"}
+    large = [float(i) for i in range(100_000)]
+    return {
+        "validate_input_schema": measure(
+            lambda: validate_input_schema(arguments, SALUTE["parameters"]), rounds
+        ),
+        "validate_output_schema": measure(
+            # Older commits modify the schema, so each call gets a copy.
+            lambda: validate_output_schema("Hello", dict(SALUTE["response"])),
+            rounds,
+        ),
+        "is_value_of_type[list[float] x 100000]": measure(
+            lambda: is_value_of_type(large, "list[float]"), rounds
+        ),
+        "load_model": measure(lambda: load_model(SALUTE), rounds),
+    }
+
+
+def bench_api(
+    rounds: int, folder: Path, sizes: list[int]
+) -> dict[str, dict[str, float]]:
+    """Times requests to the app, called in process, with growing function folders.
+
+    Args:
+        rounds (int): Number of rounds.
+        folder (Path): The functions folder the app was configured with.
+        sizes (list[int]): Numbers of definitions listed.
+
+    Returns:
+        dict[str, dict[str, float]]: The timings of each route.
+    """
+    import httpx
+
+    from eidos.api import app
+
+    loop = asyncio.new_event_loop()
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://eidos"
+    )
+
+    def request(method: str, url: str, **kwargs: Any) -> Callable[[], None]:
+        def round_trip() -> None:
+            response = loop.run_until_complete(client.request(method, url, **kwargs))
+            assert response.status_code == 200, response.text
+
+        return round_trip
+
+    results = {}
+    try:
+        for size in sorted(sizes):
+            write_functions(folder, size)
+            # Getting the newest definition makes the app notice the new files.
+            request("GET", f"/api/v1/functions/salute_{size - 1}")()
+            results[f"list_functions[{size}]"] = measure(
+                request("GET", "/api/v1/functions/"), rounds
+            )
+            if size == min(sizes):
+                results["function_definition"] = measure(
+                    request("GET", "/api/v1/functions/salute_0"), rounds
+                )
+                results["execute_endpoint[asgi]"] = measure(
+                    request(
+                        "POST", "/api/v1/execution/salute_0", json={"who": "Nikos"}
+                    ),
+                    rounds,
+                )
+        loop.run_until_complete(client.aclose())
+    finally:
+        loop.close()
+    return results
+
+
+def quiet_logs() -> None:
+    """Configures the logs of eidos before any module logs, at the level set in the
+    environment."""
+    try:
+        from eidos.logs import configure_logging
+    except ImportError:
+        # Older commits log with the default configuration of structlog.
+        import structlog
+
+        structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(30))
+    else:
+        configure_logging()
+
+
+def commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any]) -> None:
+    """Prints the median time of every benchmark relative to a baseline run."""
+    print(f"{'benchmark':<45} {'baseline':>12} {'current':>12} {'ratio':>8}")
+    for name, stats in results["benchmarks"].items():
+        before = baseline["benchmarks"].get(name)
+        if before is None:
+            continue
+        ratio = stats["median"] / before["median"]
+        print(
+            f"{name:<45} {before['median'] * 1e6:>10.2f}us "
+            f"{stats['median'] * 1e6:>10.2f}us {ratio:>7.2f}x"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", help="Path of the JSON results.")
+    parser.add_argument("--rounds", type=int, default=10, help="Rounds per benchmark.")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1000],
+        help="Numbers of synthetic definitions listed.",
+    )
+    parser.add_argument("--compare", help="Path of the JSON results of a baseline.")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as folder:
+        # Read by the settings of eidos, so set before it is imported.
+        os.environ["EIDOS_FUNCTIONS_FOLDER"] = folder
+        os.environ["EIDOS_LOG_LEVEL"] = "warning"
+        quiet_logs()
+        benchmarks = {}
+        benchmarks.update(bench_validation(args.rounds))
+        benchmarks.update(bench_api(args.rounds, Path(folder), args.sizes))
+
+    results = {
+        "metadata": {
+            "commit": commit(),
+            "date": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+        },
+        "benchmarks": benchmarks,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    for name, stats in benchmarks.items():
+        print(f"{name:<45} {stats['median'] * 1e6:>10.2f}us")
+    if args.compare:
+        compare(results, json.loads(Path(args.compare).read_text()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
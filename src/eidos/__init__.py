@@ -1,3 +1,9 @@
-from importlib.metadata import version
+def __getattr__(name: str):
+    # Resolved on first use: reading the package metadata is slow, and most processes
+    # (e.g. Lambda containers) never need it.
+    if name == "__version__":
+        from importlib.metadata import version
 
-__version__ = version("eidos")
+        globals()["__version__"] = version("eidos")
+        return globals()["__version__"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
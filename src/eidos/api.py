@@ -1,13 +1,24 @@
+from contextlib import asynccontextmanager
+
 import structlog
-from fastapi import FastAPI
+from fastapi import FastAPI, Security
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 
 from eidos import __version__
+from eidos.execute import process_executor
+from eidos.executor import shutdown_executor
+from eidos.logs import configure_logging
+from eidos.metrics import CONTENT_TYPE, metrics
+from eidos.registry import registry
 from eidos.routes.execution import router as router_execution
 from eidos.routes.functions import router as router_functions
+from eidos.secure import query_scheme
 from eidos.settings import settings
+from eidos.tracing import TracingMiddleware, flush_traces
 
+configure_logging()
 log = structlog.get_logger("app")
 
 if not settings.api_key and settings.is_production():
@@ -16,6 +27,9 @@ if not settings.api_key and settings.is_production():
 if settings.root_path:
     log.info(f"Root path set to {settings.root_path}")
 
+# Load every function definition once at startup.
+registry.scan()
+
 openapi_tags = [
     {
         "name": "health",
@@ -23,6 +37,10 @@ openapi_tags = [
             "Health check endpoint. Useful for liveness and readiness probes."
         ),
     },
+    {
+        "name": "metrics",
+        "description": "Execution metrics in the Prometheus text format.",
+    },
     {
         "name": "functions",
         "description": "View and validate functions schema.",
@@ -33,12 +51,24 @@ openapi_tags = [
     },
 ]
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start the process pool before serving if any function runs in it.
+    if any(entry.executor == "process" for entry in registry.entries()):
+        process_executor()
+    yield
+    shutdown_executor()
+    flush_traces()
+
+
 app = FastAPI(
     title="eidos",
     description="Function calling framework for LLMs.",
     version=__version__,
     root_path=settings.root_path,
     openapi_tags=openapi_tags,
+    lifespan=lifespan,
     docs_url=None if settings.is_production() else "/docs",
     redoc_url=None if settings.is_production() else "/redoc",
 )
@@ -52,6 +82,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(TracingMiddleware)
 
 
 class HealthCheckResponse(BaseModel):
@@ -66,5 +97,14 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics", tags=["metrics"], response_class=PlainTextResponse)
+def metrics_endpoint(_: str = Security(query_scheme)) -> PlainTextResponse:
+    """
+    Metrics of the executions in the Prometheus text format: duration of every stage
+    by function, errors, calls in flight, cache hits and executor queue depth.
+    """
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
+
+
 app.include_router(router_execution, prefix="/api/v1/execution")
 app.include_router(router_functions, prefix="/api/v1/functions")
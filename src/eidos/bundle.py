@@ -0,0 +1,140 @@
+import mmap
+import os
+import pickle
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+from eidos.models.function import load_model
+from eidos.registry import FunctionEntry, FunctionRegistry
+from eidos.settings import settings
+from eidos.validation.schema import InputValidator, OutputValidator
+
+log = structlog.get_logger("eidos.bundle")
+
+# Incremented whenever the layout of bundles changes.
+BUNDLE_VERSION = 2
+
+
+def validator_settings() -> dict[str, Any]:
+    """Settings the compiled validators depend on, stored in bundles so that
+    validators built with different settings are not used."""
+    return {"accept_array_values": settings.accept_array_values}
+
+
+def build_bundle(folder: str | Path) -> dict[str, Any]:
+    """Validates every function definition in a folder and precomputes its tables.
+
+    Args:
+        folder (str | Path): Folder containing the JSON definitions.
+
+    Returns:
+        dict[str, Any]: The content of the bundle: the settings the validators were
+        compiled with and, for every function, its definition, digest, OpenAI
+        parameters schema and compiled validators.
+
+    Raises:
+        ValueError: If a definition cannot be read or is not valid.
+    """
+    registry = FunctionRegistry(folder, reload_interval=-1)
+    registry.scan(strict=True)
+    functions = []
+    for entry in registry.entries():
+        try:
+            json_schema = load_model(entry.definition).model_json_schema()
+            input_validator = InputValidator(entry.definition["parameters"])
+            output_validator = OutputValidator(entry.definition["response"])
+        except Exception as e:
+            raise ValueError(
+                f"Invalid definition of function '{entry.name}': {e}"
+            ) from e
+        functions.append(
+            {
+                "name": entry.name,
+                "definition": entry.definition,
+                "digest": entry.digest,
+                "json_schema": json_schema,
+                "input_validator": input_validator,
+                "output_validator": output_validator,
+            }
+        )
+    return {
+        "version": BUNDLE_VERSION,
+        "settings": validator_settings(),
+        "functions": functions,
+    }
+
+
+def write_bundle(folder: str | Path, output: str | Path) -> int:
+    """Builds the bundle of a functions folder and writes it to a file.
+
+    The file is replaced atomically, so running processes never read a partial
+    bundle.
+
+    Args:
+        folder (str | Path): Folder containing the JSON definitions.
+        output (str | Path): Path of the bundle file.
+
+    Returns:
+        int: Number of functions in the bundle.
+    """
+    bundle = build_bundle(folder)
+    output = Path(output)
+    temporary = output.with_name(f".{output.name}.tmp")
+    with open(temporary, "wb") as bundle_file:
+        pickle.dump(bundle, bundle_file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, output)
+    log.info("Bundle written", path=str(output), functions=len(bundle["functions"]))
+    return len(bundle["functions"])
+
+
+def read_bundle(path: str | Path) -> list[FunctionEntry]:
+    """Reads the registry entries of a bundle written by `write_bundle`.
+
+    Bundles are pickles: only read bundles built from trusted definitions.
+
+    Args:
+        path (str | Path): Path of the bundle file.
+
+    Validators compiled with settings different from the current ones are discarded,
+    and built again on first use.
+
+    Returns:
+        list[FunctionEntry]: The entries, with their validators and OpenAI parameters
+        schema already built.
+
+    Raises:
+        ValueError: If the file is not a bundle of the current version.
+    """
+    path = Path(path)
+    with open(path, "rb") as bundle_file:
+        try:
+            with mmap.mmap(bundle_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                bundle = pickle.loads(data)
+        except (ValueError, pickle.UnpicklingError, EOFError) as e:
+            raise ValueError(f"Invalid functions bundle {path}: {e}")
+    if not isinstance(bundle, dict) or bundle.get("version") != BUNDLE_VERSION:
+        raise ValueError(
+            f"Invalid functions bundle {path}: expected version {BUNDLE_VERSION}."
+        )
+    compiled = bundle.get("settings") == validator_settings()
+    if not compiled:
+        log.warning(
+            "Bundle validators built with different settings, rebuilding them.",
+            path=str(path),
+            bundle_settings=bundle.get("settings"),
+        )
+    return [
+        FunctionEntry(
+            name=function["name"],
+            path=path,
+            signature=(0, 0, 0),
+            definition=function["definition"],
+            digest=function["digest"],
+            _input_validator=function["input_validator"] if compiled else None,
+            _output_validator=function["output_validator"] if compiled else None,
+            _json_schema=function["json_schema"],
+        )
+        for function in bundle["functions"]
+    ]
@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+
+class LRUCache:
+    """Thread-safe mapping with bounded size and least-recently-used eviction.
+
+    Values may optionally expire `ttl` seconds after being stored.
+
+    Example:
+    >> cache = LRUCache(maxsize=2)
+    >> cache.set("a", 1)
+    >> cache.get("a")
+    1
+
+    Args:
+        maxsize (int): Maximum number of entries. Zero or less disables the cache.
+        ttl (float | None): Seconds a value is kept, or None to keep it until evicted.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        # Values are stored with their expiration time, if any.
+        self._data: OrderedDict[Hashable, tuple[float | None, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Gets a value and marks it as the most recently used.
+
+        Args:
+            key (Hashable): Key of the value.
+            default (Any): Value returned when the key is not cached.
+
+        Returns:
+            Any: The cached value, or `default`.
+        """
+        with self._lock:
+            try:
+                expires_at, value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Stores a value, evicting the least recently used ones if full.
+
+        Args:
+            key (Hashable): Key of the value.
+            value (Any): Value to store.
+        """
+        if self.maxsize <= 0:
+            return
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Removes a value from the cache.
+
+        Args:
+            key (Hashable): Key of the value.
+            default (Any): Value returned when the key is not cached.
+
+        Returns:
+            Any: The removed value, or `default`.
+        """
+        with self._lock:
+            if key not in self._data:
+                return default
+            return self._data.pop(key)[1]
+
+    def clear(self) -> None:
+        """Removes every value from the cache."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Returns the usage counters of the cache.
+
+        Returns:
+            dict[str, int]: Hits, misses, evictions, expirations, current size and
+            maximum size.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
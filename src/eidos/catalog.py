@@ -0,0 +1,142 @@
+import gzip
+import hashlib
+import threading
+from collections.abc import Callable
+from typing import Any
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from eidos.encoding import dumps as json_dumps
+from eidos.registry import FunctionRegistry
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+class PrecomputedResponse:
+    """A JSON response body serialized and compressed ahead of time.
+
+    Every representation (identity, gzip and, if installed, brotli) gets its own
+    strong ETag derived from the uncompressed body.
+
+    Args:
+        content (Any): JSON serializable content of the response.
+    """
+
+    __slots__ = ("bodies", "etags")
+
+    def __init__(self, content: Any):
+        body = json_dumps(content)
+        digest = hashlib.sha256(body).hexdigest()[:32]
+
+        self.bodies = {"identity": body, "gzip": gzip.compress(body, mtime=0)}
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(body)
+        self.etags = {
+            encoding: f'"{digest}"'
+            if encoding == "identity"
+            else f'"{digest}-{encoding}"'
+            for encoding in self.bodies
+        }
+
+    def select_encoding(self, accept_encoding: str) -> str:
+        """Selects the best available content encoding accepted by the client.
+
+        Args:
+            accept_encoding (str): Value of the `Accept-Encoding` header.
+
+        Returns:
+            str: The selected encoding, `identity` if none is accepted.
+        """
+        accepted = set()
+        for coding in accept_encoding.lower().split(","):
+            name, _, params = coding.partition(";")
+            quality = 1.0
+            for param in params.split(";"):
+                key, _, value = param.strip().partition("=")
+                if key == "q":
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            if quality > 0:
+                accepted.add(name.strip())
+        for encoding in ("br", "gzip"):
+            if encoding in self.bodies and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+    def response(self, request: Request) -> Response:
+        """Builds the response for a request, honoring conditional and encoding headers.
+
+        Args:
+            request (Request): The incoming request.
+
+        Returns:
+            Response: 304 if the client copy is current, else the (compressed) body.
+        """
+        encoding = self.select_encoding(request.headers.get("accept-encoding", ""))
+        etag = self.etags[encoding]
+        headers = {
+            "ETag": etag,
+            "Vary": "Accept-Encoding",
+            "Cache-Control": "no-cache",
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            if "*" in tags or etag in tags:
+                return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(
+            content=self.bodies[encoding],
+            media_type="application/json",
+            headers=headers,
+        )
+
+
+class Catalog:
+    """A precomputed response rebuilt only when the registry changes.
+
+    Example:
+    >> catalog = Catalog(list_functions_names, registry)
+    >> catalog.response(request)
+
+    Args:
+        build (Callable[[], Any]): Function returning the content of the response.
+        registry (FunctionRegistry): Registry whose generation invalidates the content.
+    """
+
+    def __init__(self, build: Callable[[], Any], registry: FunctionRegistry):
+        self.build = build
+        self.registry = registry
+        self._generation: int | None = None
+        self._precomputed: PrecomputedResponse | None = None
+        self._lock = threading.Lock()
+
+    def get(self) -> PrecomputedResponse:
+        """Gets the precomputed response for the current registry generation.
+
+        Returns:
+            PrecomputedResponse: The precomputed response.
+        """
+        self.registry.refresh()
+        generation = self.registry.generation
+        precomputed = self._precomputed
+        if precomputed is None or self._generation != generation:
+            with self._lock:
+                if self._precomputed is None or self._generation != generation:
+                    self._precomputed = PrecomputedResponse(self.build())
+                    self._generation = generation
+                precomputed = self._precomputed
+        return precomputed
+
+    def response(self, request: Request) -> Response:
+        """Builds the response for a request, see `PrecomputedResponse.response`."""
+        return self.get().response(request)
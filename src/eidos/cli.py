@@ -0,0 +1,47 @@
+import argparse
+import sys
+
+from eidos.bundle import write_bundle
+
+
+def bundle_command(args: argparse.Namespace) -> int:
+    try:
+        functions = write_bundle(args.folder, args.output)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"Bundled {functions} functions into {args.output}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point of the `eidos` command line.
+
+    Example:
+    $ eidos bundle functions/ -o functions.bundle
+
+    Args:
+        argv (list[str] | None): Command line arguments, `sys.argv` by default.
+
+    Returns:
+        int: Exit code.
+    """
+    parser = argparse.ArgumentParser(prog="eidos")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    bundle = commands.add_parser(
+        "bundle",
+        help="Validate the function definitions of a folder and write them as a bundle.",
+    )
+    bundle.add_argument("folder", help="Folder containing the JSON definitions.")
+    bundle.add_argument(
+        "-o", "--output", default="functions.bundle", help="Path of the bundle file."
+    )
+    bundle.set_defaults(handler=bundle_command)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
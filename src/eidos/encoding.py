@@ -0,0 +1,278 @@
+import array
+import json
+import sys
+from collections.abc import Callable, Mapping
+from typing import Any
+
+import structlog
+from starlette.responses import JSONResponse, Response
+
+from eidos.settings import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+log = structlog.get_logger("eidos.encoding")
+
+# Binary format of numeric results, see `encode_ndarray`.
+NDARRAY_MEDIA_TYPE = "application/x-ndarray"
+
+# Buffers are aligned so that clients can map them without copying.
+NDARRAY_ALIGNMENT = 8
+
+# Type codes of `array.array` used to pack numeric lists, by declared type.
+_PACK_TYPECODES = {"list[float]": "d", "list[int]": "q", "list[bool]": "b"}
+
+# `struct` formats of the dtypes that can be sent, in NumPy notation.
+_DTYPE_FORMATS = {
+    "f4": "f",
+    "f8": "d",
+    "i1": "b",
+    "i2": "h",
+    "i4": "i",
+    "i8": "q",
+    "u1": "B",
+    "u2": "H",
+    "u4": "I",
+    "u8": "Q",
+    "b1": "?",
+}
+_BYTEORDER = "<" if sys.byteorder == "little" else ">"
+
+
+def _json_dumps(content: Any) -> bytes:
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _orjson_dumps(content: Any) -> bytes:
+    # Non string keys are converted as the standard library does, and numpy arrays
+    # returned by functions are serialized natively. Unlike the standard library,
+    # NaN and infinite floats are serialized as null instead of rejected.
+    try:
+        return orjson.dumps(
+            content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+    except orjson.JSONEncodeError:
+        # E.g. integers wider than 64 bits, which the standard library supports.
+        return _json_dumps(content)
+
+
+def get_encoder(name: str) -> Callable[[Any], bytes]:
+    """Gets a JSON encoder by name.
+
+    Args:
+        name (str): `orjson`, `json` (standard library) or `auto` to use orjson when
+            installed and the standard library otherwise.
+
+    Returns:
+        Callable[[Any], bytes]: Serializes content to UTF-8 encoded compact JSON.
+    """
+    match name:
+        case "auto":
+            return _json_dumps if orjson is None else _orjson_dumps
+        case "orjson":
+            if orjson is None:
+                raise ImportError(
+                    "The orjson encoder requires the orjson package. "
+                    "Install it with `pip install eidos[orjson]`."
+                )
+            return _orjson_dumps
+        case "json":
+            return _json_dumps
+        case _:
+            raise ValueError(f"Unknown JSON encoder: {name}")
+
+
+# Encoder of every JSON response of the API.
+dumps = get_encoder(settings.json_encoder)
+log.debug("JSON encoder selected", encoder=dumps.__name__)
+
+
+class EncodedJSONResponse(JSONResponse):
+    """JSON response serialized with the encoder selected in the settings."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class NdarrayResponse(Response):
+    """Response sending the chunks of `encode_ndarray` one after the other.
+
+    The buffers are written to the connection as they are, without joining them
+    into a single copy of the body.
+
+    Args:
+        chunks (list[bytes | memoryview]): The encoded body.
+        headers (Mapping[str, str] | None): Extra headers.
+    """
+
+    media_type = NDARRAY_MEDIA_TYPE
+
+    def __init__(
+        self,
+        chunks: list[bytes | memoryview],
+        headers: Mapping[str, str] | None = None,
+    ):
+        self.chunks = chunks
+        # The buffers are byte views, so their length is their size.
+        size = sum(map(len, chunks))
+        super().__init__(headers={**(headers or {}), "content-length": str(size)})
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        for chunk in self.chunks:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def _numeric_buffer(value: Any, type_str: str | None) -> tuple[str, memoryview] | None:
+    """Gets the dtype and raw buffer of a numeric list value, None if it has none."""
+    if type_str not in _PACK_TYPECODES:
+        return None
+
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and isinstance(value, numpy.ndarray):
+        if value.ndim != 1:
+            return None
+        kind, itemsize = value.dtype.kind, value.dtype.itemsize
+        if kind == "b":
+            dtype = "|b1"
+        elif f"{kind}{itemsize}" in _DTYPE_FORMATS:
+            # Arrays in the other byte order are swapped to the one in the header.
+            value = value.astype(value.dtype.newbyteorder("="), copy=False)
+            dtype = f"{_BYTEORDER}{kind}{itemsize}"
+        else:
+            # Other dtypes (e.g., float16) cannot be decoded, so they are sent as JSON.
+            return None
+        return dtype, memoryview(numpy.ascontiguousarray(value)).cast("B")
+
+    if isinstance(value, array.array):
+        packed = value
+    elif isinstance(value, list):
+        try:
+            packed = array.array(_PACK_TYPECODES[type_str], value)
+        except (TypeError, OverflowError):
+            # Lists with None or out of range elements are sent as JSON.
+            return None
+    else:
+        return None
+
+    if packed.typecode in "fd":
+        kind = "f"
+    elif packed.typecode in "bhilq":
+        kind = "b" if type_str == "list[bool]" else "i"
+    elif packed.typecode in "BHILQ":
+        kind = "u"
+    else:
+        return None
+    if kind == "b":
+        dtype = "|b1"
+    elif f"{kind}{packed.itemsize}" in _DTYPE_FORMATS:
+        dtype = f"{_BYTEORDER}{kind}{packed.itemsize}"
+    else:
+        return None
+    return dtype, memoryview(packed).cast("B")
+
+
+def _padding(size: int) -> int:
+    return -size % NDARRAY_ALIGNMENT
+
+
+def encode_ndarray(
+    envelope: dict[str, Any], response: dict[str, str]
+) -> list[bytes | memoryview]:
+    """Encodes an execution envelope with its numeric lists as raw binary buffers.
+
+    The body starts with the length of a JSON header as a little-endian 32-bit
+    unsigned integer, followed by the header itself and the buffers, each aligned to
+    `NDARRAY_ALIGNMENT` bytes. The header holds the `status`, the `data` that is not
+    sent as a buffer and an `arrays` list with the `name`, `dtype` (NumPy notation),
+    `length` and `offset` (from the end of the header) of every buffer.
+
+    Output variables declared as `list[int]`, `list[float]` or `list[bool]` are
+    sent as buffers: NumPy arrays and `array.array` values as they are, lists
+    packed into an array first. Other variables stay in the JSON header.
+
+    The body is returned in chunks, the buffers as views of the values, so that it
+    can be sent without copying them (see `NdarrayResponse`).
+
+    Args:
+        envelope (dict[str, Any]): Status envelope of the execution.
+        response (dict[str, str]): Response schema of the function.
+
+    Returns:
+        list[bytes | memoryview]: The chunks of the encoded body.
+    """
+    data = {}
+    arrays = []
+    buffers = []
+    offset = 0
+    for name, value in (envelope.get("data") or {}).items():
+        buffer = _numeric_buffer(value, response.get(name))
+        if buffer is None:
+            data[name] = value
+            continue
+        dtype, view = buffer
+        arrays.append(
+            {
+                "name": name,
+                "dtype": dtype,
+                "length": view.nbytes // int(dtype[2:]),
+                "offset": offset,
+            }
+        )
+        buffers.append(view)
+        offset += view.nbytes + _padding(view.nbytes)
+
+    header = dumps({"status": envelope["status"], "data": data, "arrays": arrays})
+    # Trailing spaces are valid JSON and align the first buffer.
+    header += b" " * _padding(4 + len(header))
+
+    chunks: list[bytes | memoryview] = [len(header).to_bytes(4, "little"), header]
+    for view in buffers:
+        chunks.append(view)
+        if padding := _padding(view.nbytes):
+            chunks.append(b"\0" * padding)
+    return chunks
+
+
+def decode_ndarray(body: bytes) -> dict[str, Any]:
+    """Decodes a body encoded by `encode_ndarray`, once its chunks are joined.
+
+    Args:
+        body (bytes): The encoded body.
+
+    Returns:
+        dict[str, Any]: The status envelope, with every buffer as a memoryview of
+        the body cast to its element type.
+
+    Raises:
+        ValueError: If a buffer has a dtype that cannot be read in this machine.
+    """
+    size = int.from_bytes(body[:4], "little")
+    header = json.loads(body[4 : 4 + size])
+    data = header["data"]
+    view = memoryview(body)
+    for description in header["arrays"]:
+        dtype = description["dtype"]
+        format_ = _DTYPE_FORMATS.get(dtype[1:])
+        if format_ is None or dtype[0] not in ("|", _BYTEORDER):
+            raise ValueError(f"Unsupported dtype: {dtype}")
+        start = 4 + size + description["offset"]
+        end = start + description["length"] * int(dtype[2:])
+        data[description["name"]] = view[start:end].cast(format_)
+    return {"status": header["status"], "data": data}
@@ -1,15 +1,49 @@
-from pathlib import Path
+import asyncio
+import concurrent.futures
+import inspect
+import time
+from collections.abc import AsyncIterator, Callable, Generator, Hashable
+from contextlib import nullcontext
 from typing import Any
 
 import structlog
 
-from eidos.models.function import load_model
+from eidos.executor import (
+    BoundedExecutor,
+    ExecutorBusyError,
+    FunctionBusyError,
+    call_in_worker,
+    concurrency_limits,
+    get_executor,
+    get_process_executor,
+)
+from eidos.inflight import InFlightCalls
+from eidos.metrics import (
+    UNKNOWN_FUNCTION,
+    count_error,
+    measure,
+    observe_stage,
+    running,
+)
+from eidos.registry import FunctionEntry, registry
+from eidos.results import canonical_arguments, result_cache
 from eidos.settings import settings
-from eidos.utils import import_function, json_load
-from eidos.validation.schema import validate_input_schema, validate_output_schema
+from eidos.tracing import tracer
+from eidos.validation.schema import ChunkValidator
 
 log = structlog.get_logger("eidos.execution")
 
+# Calls being computed, so that concurrent identical calls share one execution.
+in_flight = InFlightCalls()
+
+
+def _openai_function_definition(entry: FunctionEntry) -> dict[str, Any]:
+    return {
+        "name": entry.definition["name"],
+        "description": entry.definition["description"],
+        "parameters": entry.json_schema,
+    }
+
 
 def get_openai_function_definition(name: str) -> dict[str, Any]:
     """
@@ -22,17 +56,7 @@ def get_openai_function_definition(name: str) -> dict[str, Any]:
     Returns:
         dict[str, Any]: The function definition in JSON Schema.
     """
-    file_path = Path(settings.functions_folder) / f"{name}.json"
-    function_definition = json_load(file_path)
-
-    model = load_model(function_definition)
-    parameters = model.model_json_schema()
-
-    return {
-        "name": function_definition["name"],
-        "description": function_definition["description"],
-        "parameters": parameters,
-    }
+    return _openai_function_definition(registry.get(name))
 
 
 def available_functions() -> list[dict[str, Any]]:
@@ -41,9 +65,7 @@ def available_functions() -> list[dict[str, Any]]:
     Returns:
         list[dict[str, Any]]: The list of available functions.
     """
-    return [
-        json_load(file_path) for file_path in settings.functions_folder.glob("*.json")
-    ]
+    return [entry.definition for entry in registry.entries()]
 
 
 def get_function_schema(function: str) -> dict[str, Any]:
@@ -55,9 +77,7 @@ def get_function_schema(function: str) -> dict[str, Any]:
     Returns:
         dict: Response schema of the function.
     """
-    file_path = Path(settings.functions_folder) / f"{function}.json"
-    function_definition = json_load(file_path)
-    return function_definition["response"]
+    return registry.get(function).definition["response"]
 
 
 def list_functions_openai() -> list[dict[str, Any]]:
@@ -66,7 +86,7 @@ def list_functions_openai() -> list[dict[str, Any]]:
     Returns:
         List of available AI functions.
     """
-    return [get_openai_function_definition(fn["name"]) for fn in available_functions()]
+    return [_openai_function_definition(entry) for entry in registry.entries()]
 
 
 def list_functions_names() -> list[str]:
@@ -78,48 +98,510 @@ def list_functions_names() -> list[str]:
     return [fn["name"] for fn in available_functions()]
 
 
+def _get_entry(function_name: str) -> FunctionEntry:
+    started = time.perf_counter()
+    try:
+        with tracer.start_span("lookup", {"function": function_name}):
+            entry = registry.get(function_name)
+    except FileNotFoundError:
+        count_error(UNKNOWN_FUNCTION, "load")
+        log.error(
+            "Error: function module not found.",
+            function=function_name,
+            functions_folder=registry.folder,
+        )
+        raise FileNotFoundError("Error: function module not found.")
+    observe_stage(entry.name, "load", started)
+    return entry
+
+
+def _validate_arguments(entry: FunctionEntry, arguments: dict | None) -> dict | None:
+    # Validate input arguments against the function's schema.
+    if arguments:
+        with (
+            measure(entry.name, "input"),
+            tracer.start_span("validation", {"function": entry.name}),
+        ):
+            try:
+                arguments = entry.input_validator(arguments)
+            except (ValueError, TypeError) as e:
+                log.error(
+                    "Error: function arguments are malformed.",
+                    function=entry.name,
+                    error=str(e),
+                )
+                raise ValueError(f"Error: function arguments are malformed.\n{e}")
+    return arguments
+
+
+def _execution_failed(entry: FunctionEntry, e: Exception) -> Exception:
+    log.error("Error: function execution failed.", function=entry.name, error=str(e))
+    return Exception(f"Error: function execution failed.\n{e}")
+
+
+def _execution_timed_out(entry: FunctionEntry, timeout: float) -> TimeoutError:
+    count_error(entry.name, "call")
+    log.error(
+        "Error: function execution timed out.", function=entry.name, timeout=timeout
+    )
+    return TimeoutError("Error: function execution timed out.")
+
+
+def _process_modules() -> list[str]:
+    return [
+        entry.definition["module"]
+        for entry in registry.entries()
+        if entry.executor == "process"
+    ]
+
+
+def process_executor() -> BoundedExecutor:
+    """Gets the process pool, preloading every function defined to run in it.
+
+    Returns:
+        BoundedExecutor: The shared process pool.
+    """
+    return get_process_executor(_process_modules)
+
+
+def _validate_result(entry: FunctionEntry, result: Any) -> dict[str, Any]:
+    with measure(entry.name, "output"):
+        try:
+            return entry.output_validator(result)
+        except (ValueError, TypeError) as e:
+            log.error(
+                "Error: function result is malformed.",
+                function=entry.name,
+                error=str(e),
+            )
+            raise ValueError(f"Error: function result is malformed.\n{e}")
+
+
+async def _wait(awaitable: Any, timeout: float | None) -> tuple[bool, Any]:
+    """Awaits a result for at most `timeout` seconds, cancelling it if it takes longer.
+
+    Unlike `asyncio.wait_for`, a `TimeoutError` raised by the awaitable itself (e.g.,
+    by an HTTP call of the function) is raised as is, not mistaken for the timeout.
+
+    Returns:
+        tuple[bool, Any]: Whether the awaitable finished in time, and its result.
+    """
+    task = asyncio.ensure_future(awaitable)
+    done, _ = await asyncio.wait({task}, timeout=timeout)
+    if not done:
+        task.cancel()
+        return False, None
+    return True, task.result()
+
+
+def _call(
+    entry: FunctionEntry, arguments: dict | None, timeout: float | None = None
+) -> Any:
+    finished = True
+    with measure(entry.name, "call"):
+        try:
+            fn = entry.function
+            result = fn(**arguments) if arguments else fn()
+            if inspect.isawaitable(result):
+                # Coroutine functions called from synchronous code get their own loop.
+                finished, result = asyncio.run(_wait(result, timeout))
+        except Exception as e:
+            raise _execution_failed(entry, e) from e
+    if not finished:
+        raise _execution_timed_out(entry, timeout)
+    return result
+
+
+async def _call_async(entry: FunctionEntry, arguments: dict | None) -> Any:
+    try:
+        with measure(entry.name, "call"):
+            fn = entry.function
+            return await (fn(**arguments) if arguments else fn())
+    except Exception as e:
+        raise _execution_failed(entry, e) from e
+
+
+def _measure_process_call(entry: FunctionEntry):
+    # Calls of the process pool are timed from the parent, including the wait for a
+    # free worker; other calls are timed where they run, see `_call`.
+    if entry.executor == "process":
+        return measure(entry.name, "call")
+    return nullcontext()
+
+
+def _call_and_validate(
+    entry: FunctionEntry, arguments: dict | None, timeout: float | None = None
+) -> dict[str, Any]:
+    return _validate_result(entry, _call(entry, arguments, timeout))
+
+
+def _submit(entry: FunctionEntry, arguments: dict | None) -> concurrent.futures.Future:
+    """Submits a call to the pool the function runs in, holding a concurrency slot
+    of the function until the call is done, even if the caller stops waiting."""
+    release = concurrency_limits.acquire(entry.name, entry.max_concurrency)
+    try:
+        if entry.executor == "process":
+            future = process_executor().submit(
+                call_in_worker, entry.definition["module"], arguments
+            )
+        else:
+            future = get_executor().submit(
+                _call_and_validate, entry, arguments, entry.timeout
+            )
+    except BaseException:
+        release()
+        raise
+    future.add_done_callback(lambda _: release())
+    return future
+
+
+def _result(entry: FunctionEntry, result: Any) -> dict[str, Any]:
+    # Results of threads are validated by the worker, those of processes are not.
+    if entry.executor == "process":
+        return _validate_result(entry, result)
+    return result
+
+
+def _run(entry: FunctionEntry, arguments: dict | None) -> dict[str, Any]:
+    timeout = entry.timeout
+    if entry.executor != "process" and timeout is None:
+        # Nothing to enforce, so the call is made inline.
+        release = concurrency_limits.acquire(entry.name, entry.max_concurrency)
+        try:
+            return _call_and_validate(entry, arguments)
+        finally:
+            release()
+
+    future = _submit(entry, arguments)
+    with _measure_process_call(entry):
+        finished, _ = concurrent.futures.wait([future], timeout)
+    if not finished:
+        future.cancel()
+        raise _execution_timed_out(entry, timeout)
+    try:
+        result = future.result()
+    except Exception as e:
+        if entry.executor == "process":
+            raise _execution_failed(entry, e)
+        raise
+    return _result(entry, result)
+
+
+async def _run_async(entry: FunctionEntry, arguments: dict | None) -> dict[str, Any]:
+    timeout = entry.timeout
+    if entry.executor != "process" and _is_coroutine_function(entry):
+        release = concurrency_limits.acquire(entry.name, entry.max_concurrency)
+        try:
+            # The coroutine is cancelled if it does not finish in time.
+            result = await asyncio.wait_for(_call_async(entry, arguments), timeout)
+        except asyncio.TimeoutError:
+            raise _execution_timed_out(entry, timeout)
+        finally:
+            release()
+        return _validate_result(entry, result)
+
+    future = _submit(entry, arguments)
+    try:
+        # The work is abandoned if it does not finish in time, as threads and
+        # processes cannot be interrupted.
+        with _measure_process_call(entry):
+            finished, result = await _wait(asyncio.wrap_future(future), timeout)
+    except Exception as e:
+        if entry.executor == "process":
+            raise _execution_failed(entry, e)
+        raise
+    if not finished:
+        raise _execution_timed_out(entry, timeout)
+    return _result(entry, result)
+
+
+def _in_flight_key(
+    entry: FunctionEntry, arguments: dict | None, cache_key: Hashable
+) -> Hashable:
+    if cache_key is not None:
+        return cache_key
+    if not entry.definition.get("deduplicate", settings.deduplicate_executions):
+        return None
+    canonical = canonical_arguments(arguments)
+    if canonical is None:
+        return None
+    return entry.name, entry.digest, canonical
+
+
 def execute(function_name: str, arguments: dict | None) -> dict[str, Any]:
     """
     Executes an AI function.
 
+    Coroutine functions are run to completion in a new event loop, use
+    `execute_async` to await them in a running one. Results of functions whose
+    definition has a `cache` block are memoized, and identical concurrent calls
+    share a single execution.
+
+    Args:
+        function_name: Name of the function to execute.
+        arguments: Arguments to pass to the function.
+
+    Returns:
+        dict[str, Any]: The result of the function.
+
+    Raises:
+        TimeoutError: If the function takes longer than its `timeout_s`.
+        FunctionBusyError: If the function already runs `max_concurrency` calls.
+    """
+    with tracer.start_span("execute", {"function": function_name}):
+        return _execute(function_name, arguments)
+
+
+def _invocation(entry: FunctionEntry):
+    return tracer.start_span(
+        "invocation", {"function": entry.name, "executor": entry.executor}
+    )
+
+
+def _execute(function_name: str, arguments: dict | None) -> dict[str, Any]:
+    entry = _get_entry(function_name)
+    arguments = _validate_arguments(entry, arguments)
+
+    cache_key = result_cache.key(entry, arguments)
+    if cache_key is not None:
+        cached_result = result_cache.get(entry, cache_key)
+        if cached_result is not None:
+            return cached_result
+
+    def compute() -> dict[str, Any]:
+        with running(entry.name), _invocation(entry):
+            result = _run(entry, arguments)
+        result_cache.set(entry, cache_key, result)
+        return result
+
+    key = _in_flight_key(entry, arguments, cache_key)
+    if key is None:
+        return compute()
+    return in_flight.run(key, compute)
+
+
+def _is_coroutine_function(entry: FunctionEntry) -> bool:
+    try:
+        return inspect.iscoroutinefunction(entry.function)
+    except Exception:  # noqa: BLE001
+        # Let the synchronous path report the import error.
+        return False
+
+
+async def execute_async(function_name: str, arguments: dict | None) -> dict[str, Any]:
+    """
+    Executes an AI function without blocking the event loop.
+
+    Coroutine functions are awaited directly in the running event loop, while
+    synchronous functions are run by the shared worker pool, or by the process pool
+    if their definition sets `"executor": "process"`. Results of functions whose
+    definition has a `cache` block are memoized, and identical concurrent calls
+    share a single execution.
+
     Args:
         function_name: Name of the function to execute.
         arguments: Arguments to pass to the function.
 
     Returns:
         dict[str, Any]: The result of the function.
+
+    Raises:
+        ExecutorBusyError: If the function is synchronous and its pool is full.
+        TimeoutError: If the function takes longer than its `timeout_s`.
+        FunctionBusyError: If the function already runs `max_concurrency` calls.
     """
-    file_path = Path(settings.functions_folder) / f"{function_name}.json"
+    with tracer.start_span("execute", {"function": function_name}):
+        return await _execute_async(function_name, arguments)
 
+
+async def _execute_async(function_name: str, arguments: dict | None) -> dict[str, Any]:
+    entry = _get_entry(function_name)
+    arguments = _validate_arguments(entry, arguments)
+
+    cache_key = result_cache.key(entry, arguments)
+    if cache_key is not None:
+        cached_result = await result_cache.get_async(entry, cache_key)
+        if cached_result is not None:
+            return cached_result
+
+    async def compute() -> dict[str, Any]:
+        with running(entry.name), _invocation(entry):
+            result = await _run_async(entry, arguments)
+        await result_cache.set_async(entry, cache_key, result)
+        return result
+
+    key = _in_flight_key(entry, arguments, cache_key)
+    if key is None:
+        return await compute()
+    return await in_flight.run_async(key, compute)
+
+
+def _validate_chunk(
+    entry: FunctionEntry, validator: ChunkValidator, chunk: Any
+) -> dict[str, Any]:
     try:
-        function_definition = json_load(file_path)
-    except FileNotFoundError:
-        log.error("Error: function module not found.", function=function_name, file_path=file_path)
-        raise FileNotFoundError("Error: function module not found.")
+        return validator(chunk)
+    except (ValueError, TypeError) as e:
+        log.error(
+            "Error: function result is malformed.", function=entry.name, error=str(e)
+        )
+        raise ValueError(f"Error: function result is malformed.\n{e}")
 
-    # Validate input arguments against the function's schema.
-    if arguments:
-        try:
-            arguments = validate_input_schema(
-                arguments, schema=function_definition["parameters"]
-            )
-        except (ValueError, TypeError) as e:
-            log.error("Error: function arguments are malformed.", error=str(e))
-            raise ValueError(f"Error: function arguments are malformed.\n{str(e)}")
+
+# Marks the end of a synchronous generator iterated from the worker pool.
+_END_OF_STREAM = object()
+
+
+async def execute_stream(
+    function_name: str, arguments: dict | None
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Executes an AI function that streams its result, yielding each chunk.
+
+    Async generator functions are iterated in the running event loop, while the
+    steps of synchronous generator functions are run by the shared worker pool.
+    Every chunk is validated against the element type of the function's single
+    output variable. The function's `max_concurrency` is enforced, `timeout_s` is not.
+
+    Args:
+        function_name: Name of the function to execute.
+        arguments: Arguments to pass to the function.
+
+    Yields:
+        dict[str, Any]: Each validated chunk, keyed by the output variable name.
+    """
+    entry = _get_entry(function_name)
+    arguments = _validate_arguments(entry, arguments)
 
     try:
-        fn = import_function(function_definition["module"])
-        result = fn(**arguments) if arguments else fn()
+        fn = entry.function
+        validator = entry.chunk_validator
+        is_async = inspect.isasyncgenfunction(fn)
+        if not is_async and not inspect.isgeneratorfunction(fn):
+            raise TypeError("the function does not stream its result.")
     except Exception as e:
-        log.error("Error: function execution failed.", error=str(e))
-        raise Exception(f"Error: function execution failed.\n{str(e)}")
+        raise _execution_failed(entry, e) from e
+
+    release = concurrency_limits.acquire(entry.name, entry.max_concurrency)
+    try:
+        chunks = fn(**arguments) if arguments else fn()
+    except Exception as e:
+        release()
+        raise _execution_failed(entry, e) from e
+
+    executor = None if is_async else get_executor()
+    # Step of a synchronous generator submitted to the worker pool, if any.
+    step: concurrent.futures.Future | None = None
+    try:
+        while True:
+            try:
+                if is_async:
+                    chunk = await anext(chunks, _END_OF_STREAM)
+                else:
+                    step = executor.submit(next, chunks, _END_OF_STREAM)
+                    chunk = await asyncio.wrap_future(step)
+            except ExecutorBusyError:
+                raise
+            except Exception as e:
+                raise _execution_failed(entry, e) from e
+            if chunk is _END_OF_STREAM:
+                break
+            yield _validate_chunk(entry, validator, chunk)
+    finally:
+        if is_async:
+            try:
+                await chunks.aclose()
+            finally:
+                release()
+        elif step is None:
+            _close_generator(entry, chunks, release)
+        else:
+            # A generator cannot be closed while a worker runs one of its steps (e.g.,
+            # when the client disconnects), so it is closed once the step is done.
+            step.add_done_callback(lambda _: _close_generator(entry, chunks, release))
+
 
+def _close_generator(
+    entry: FunctionEntry, chunks: Generator, release: Callable[[], None]
+) -> None:
+    """Closes a synchronous generator of a stream, then releases its slot."""
     try:
-        validated_result = validate_output_schema(
-            result, schema=function_definition["response"].copy()
+        chunks.close()
+    except Exception as e:  # noqa: BLE001
+        # Closing runs the cleanup of the function, which may raise anything.
+        log.error(
+            "Error: failed to close the stream.", function=entry.name, error=str(e)
         )
-    except (ValueError, TypeError) as e:
-        log.error("Error: function result is malformed.", error=str(e))
-        raise ValueError(f"Error: function result is malformed.\n{str(e)}")
+    finally:
+        release()
+
+
+def error_status(e: Exception) -> int:
+    """Maps an execution error to the status code reported for it.
+
+    Args:
+        e (Exception): The error raised by the execution.
+
+    Returns:
+        int: HTTP status code.
+    """
+    if isinstance(e, ExecutorBusyError):
+        return 503
+    if isinstance(e, FunctionBusyError):
+        return 429
+    if isinstance(e, TimeoutError):
+        return 504
+    return 500
+
+
+async def execute_envelope(
+    function_name: str, arguments: dict | None
+) -> dict[str, Any]:
+    """
+    Executes an AI function and wraps its result or error in a status envelope.
+
+    Args:
+        function_name: Name of the function to execute.
+        arguments: Arguments to pass to the function.
+
+    Returns:
+        dict[str, Any]: The status of the execution and its result, if any.
+    """
+    try:
+        data = await execute_async(function_name, arguments)
+    except Exception as e:  # noqa: BLE001
+        # Every error becomes the status of its call, not of the batch.
+        status = error_status(e)
+        return {"status": {"code": status, "message": str(e)}, "data": None}
+    return {"status": {"code": 200, "message": "Success"}, "data": data}
+
+
+async def execute_batch(
+    calls: list[dict[str, Any]], max_concurrency: int | None = None
+) -> list[dict[str, Any]]:
+    """
+    Executes several AI functions concurrently.
+
+    Args:
+        calls: The calls to execute, each with a `function` name, optional
+            `arguments` and an optional `id` echoed back in its result.
+        max_concurrency: Maximum number of calls running at the same time.
+            Defaults to the `batch_max_concurrency` setting.
+
+    Returns:
+        list[dict[str, Any]]: The status envelope of each call, in the same order.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or settings.batch_max_concurrency)
+
+    async def run(call: dict[str, Any]) -> dict[str, Any]:
+        if not call.get("function"):
+            return {
+                "id": call.get("id"),
+                "status": {"code": 400, "message": "Error: missing function."},
+                "data": None,
+            }
+        async with semaphore:
+            envelope = await execute_envelope(call["function"], call.get("arguments"))
+        return {"id": call.get("id"), **envelope}
 
-    return validated_result
+    return list(await asyncio.gather(*(run(call) for call in calls)))
@@ -0,0 +1,339 @@
+import asyncio
+import inspect
+import os
+import sys
+import threading
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any
+
+import structlog
+
+from eidos.settings import settings
+from eidos.utils import import_function
+
+log = structlog.get_logger("eidos.executor")
+
+
+class ExecutorBusyError(RuntimeError):
+    """Raised when a task is submitted to an executor whose queue is full."""
+
+
+def _noop() -> None:
+    pass
+
+
+class FunctionBusyError(RuntimeError):
+    """Raised when a function is called while running its maximum number of calls."""
+
+
+class ConcurrencyLimits:
+    """Counts the running calls of each function to enforce its `max_concurrency`."""
+
+    def __init__(self):
+        self._running: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def running(self, name: str) -> int:
+        """Number of calls of a function currently running."""
+        return self._running.get(name, 0)
+
+    def acquire(self, name: str, limit: int | None) -> Callable[[], None]:
+        """Takes a slot for a call of a function.
+
+        Args:
+            name (str): Name of the function.
+            limit (int | None): Maximum number of concurrent calls, None for no limit.
+
+        Returns:
+            Callable[[], None]: Releases the slot. Calling it more than once has no
+            effect.
+
+        Raises:
+            FunctionBusyError: If the function already runs `limit` calls.
+        """
+        if limit is None:
+            return _noop
+        with self._lock:
+            running = self._running.get(name, 0)
+            if running >= limit:
+                raise FunctionBusyError(
+                    "Error: too many concurrent executions of the function."
+                )
+            self._running[name] = running + 1
+
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            with self._lock:
+                if released:
+                    return
+                released = True
+                self._running[name] -= 1
+
+        return release
+
+
+class BoundedExecutor:
+    """Worker pool that rejects new tasks instead of queueing them without bound.
+
+    At most `max_workers` tasks run at the same time and at most `queue_size` more
+    wait for a free worker. Submitting beyond that raises `ExecutorBusyError` right
+    away, so callers can answer with a fast error instead of piling up requests.
+
+    Args:
+        max_workers (int): Number of workers.
+        queue_size (int): Number of tasks allowed to wait for a worker.
+        executor (Executor | None): Pool running the tasks, a thread pool of
+            `max_workers` threads by default.
+    """
+
+    def __init__(
+        self, max_workers: int, queue_size: int, executor: Executor | None = None
+    ):
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="eidos-worker"
+        )
+        self._slots = threading.BoundedSemaphore(max_workers + queue_size)
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of tasks running or waiting for a worker."""
+        return self._pending
+
+    def _release(self, _: Future) -> None:
+        self._slots.release()
+        with self._lock:
+            self._pending -= 1
+
+    def submit(self, fn: Callable, *args: Any, **kwargs: Any) -> Future:
+        """Schedules a callable to be run by a worker.
+
+        Args:
+            fn (Callable): The callable to run.
+            *args: Positional arguments of the callable.
+            **kwargs: Keyword arguments of the callable.
+
+        Returns:
+            Future: The future of the result.
+
+        Raises:
+            ExecutorBusyError: If every worker is busy and the queue is full.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise ExecutorBusyError("Error: too many concurrent executions.")
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._pending += 1
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Runs a callable in a worker and waits for its result without blocking the event loop.
+
+        Args:
+            fn (Callable): The callable to run.
+            *args: Positional arguments of the callable.
+            **kwargs: Keyword arguments of the callable.
+
+        Returns:
+            Any: The result of the callable.
+
+        Raises:
+            ExecutorBusyError: If every worker is busy and the queue is full.
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stops the workers once the tasks already submitted are done."""
+        self._executor.shutdown(wait=wait)
+
+
+class RecyclingExecutor(Executor):
+    """Pool replaced by a fresh one after running a number of tasks.
+
+    Stands in for `max_tasks_per_child` of `ProcessPoolExecutor` before Python 3.11.
+    The replaced pool stops taking tasks and its workers exit once the tasks already
+    submitted are done, so each worker runs about `max_tasks` tasks divided by the
+    number of workers.
+
+    Args:
+        create (Callable[[], Executor]): Creates a pool.
+        max_tasks (int): Number of tasks submitted to a pool before it is replaced.
+    """
+
+    def __init__(self, create: Callable[[], Executor], max_tasks: int):
+        self._create = create
+        self.max_tasks = max_tasks
+        self._pool = create()
+        self._submitted = 0
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable, /, *args: Any, **kwargs: Any) -> Future:
+        with self._lock:
+            if self._submitted >= self.max_tasks:
+                previous, self._pool = self._pool, self._create()
+                self._submitted = 0
+                previous.shutdown(wait=False)
+            self._submitted += 1
+            return self._pool.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True, **kwargs: Any) -> None:
+        with self._lock:
+            self._pool.shutdown(wait=wait, **kwargs)
+
+
+# Functions imported by the current process pool worker, keyed by module path.
+_worker_functions: dict[str, Callable] = {}
+
+
+def _initialize_worker(modules: list[str]) -> None:
+    for module in modules:
+        try:
+            _worker_functions[module] = import_function(module)
+        except Exception as e:  # noqa: BLE001
+            # Importing runs arbitrary module code. The function fails again, with
+            # its error, when called.
+            log.error("Error: failed to preload function.", module=module, error=str(e))
+
+
+def call_in_worker(module: str, arguments: dict | None) -> Any:
+    """Calls a function in a process pool worker, importing it only once per worker.
+
+    Args:
+        module (str): The function module path, e.g., "pprint.pprint".
+        arguments (dict | None): Validated arguments of the function.
+
+    Returns:
+        Any: The result of the function.
+    """
+    fn = _worker_functions.get(module)
+    if fn is None:
+        fn = _worker_functions[module] = import_function(module)
+    result = fn(**arguments) if arguments else fn()
+    if inspect.isawaitable(result):
+        result = asyncio.run(result)
+    return result
+
+
+def create_process_executor(modules: list[str]) -> BoundedExecutor:
+    """Creates a pre-warmed process pool whose workers import the given functions.
+
+    Args:
+        modules (list[str]): Module paths of the functions to import in every worker.
+
+    Returns:
+        BoundedExecutor: The process pool configured in the settings.
+    """
+    # Imported here since it loads multiprocessing, unused by most deployments.
+    from concurrent.futures import ProcessPoolExecutor
+
+    max_workers = settings.process_executor_max_workers or os.cpu_count() or 1
+    max_tasks_per_child = settings.process_executor_max_tasks_per_child
+    options = {
+        "max_workers": max_workers,
+        "initializer": _initialize_worker,
+        "initargs": (modules,),
+    }
+    process_pool: Executor
+    if max_tasks_per_child and sys.version_info < (3, 11):
+        process_pool = RecyclingExecutor(
+            lambda: ProcessPoolExecutor(**options),
+            max_tasks=max_tasks_per_child * max_workers,
+        )
+    else:
+        if max_tasks_per_child:
+            options["max_tasks_per_child"] = max_tasks_per_child
+        process_pool = ProcessPoolExecutor(**options)
+    executor = BoundedExecutor(
+        max_workers=max_workers,
+        queue_size=settings.process_executor_queue_size,
+        executor=process_pool,
+    )
+    # Start every worker now instead of on the first calls.
+    for future in [process_pool.submit(_noop) for _ in range(max_workers)]:
+        future.result()
+    log.info("Process executor started", max_workers=max_workers, modules=modules)
+    return executor
+
+
+concurrency_limits = ConcurrencyLimits()
+
+_executor: BoundedExecutor | None = None
+_process_executor: BoundedExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> BoundedExecutor:
+    """Gets the executor shared by the API, creating it on first use.
+
+    Returns:
+        BoundedExecutor: The executor configured in the settings.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = BoundedExecutor(
+                    max_workers=settings.executor_max_workers,
+                    queue_size=settings.executor_queue_size,
+                )
+                log.info(
+                    "Executor started",
+                    max_workers=settings.executor_max_workers,
+                    queue_size=settings.executor_queue_size,
+                )
+    return _executor
+
+
+def get_process_executor(modules: Callable[[], list[str]]) -> BoundedExecutor:
+    """Gets the process pool shared by the API, creating it on first use.
+
+    Args:
+        modules (Callable[[], list[str]]): Returns the module paths of the functions
+            to preload in the workers. Only called when the pool is created.
+
+    Returns:
+        BoundedExecutor: The process pool configured in the settings.
+    """
+    global _process_executor
+    if _process_executor is None:
+        with _executor_lock:
+            if _process_executor is None:
+                _process_executor = create_process_executor(modules())
+    return _process_executor
+
+
+def executor_pending() -> dict[str, int]:
+    """Number of calls running or waiting for a worker in each started pool.
+
+    Returns:
+        dict[str, int]: The pending calls, keyed by pool: "thread" or "process".
+    """
+    pending = {}
+    if _executor is not None:
+        pending["thread"] = _executor.pending
+    if _process_executor is not None:
+        pending["process"] = _process_executor.pending
+    return pending
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    """Shuts down the shared executors, if they were started."""
+    global _executor, _process_executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
+        if _process_executor is not None:
+            _process_executor.shutdown(wait=wait)
+            _process_executor = None
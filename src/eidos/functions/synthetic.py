@@ -0,0 +1,21 @@
+import time
+
+
+def work(sleep_ms: float, cpu_ms: float, result_size: int) -> list[int]:
+    """Simulate a function with a given latency profile, for load tests.
+
+    Args:
+        sleep_ms (float): Milliseconds spent waiting, as if on I/O.
+        cpu_ms (float): Milliseconds spent busy on the CPU, holding the GIL.
+        result_size (int): Number of integers returned.
+
+    Returns:
+        result (list[int]): The integers from 0 to `result_size`.
+    """
+    if sleep_ms > 0:
+        time.sleep(sleep_ms / 1000)
+    if cpu_ms > 0:
+        deadline = time.perf_counter() + cpu_ms / 1000
+        while time.perf_counter() < deadline:
+            pass
+    return list(range(result_size))
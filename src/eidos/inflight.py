@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from concurrent.futures import Future
+from typing import Any
+
+
+class InFlightCalls:
+    """Table of the calls being computed, so that concurrent identical calls share one.
+
+    The first caller of a key computes the value, and every caller arriving with the
+    same key before it finishes waits for that value (or error) instead of computing
+    it again. Works across threads and event loops alike.
+
+    Example:
+    >> in_flight = InFlightCalls()
+    >> in_flight.run(("salute", "Nikos"), lambda: salute("Nikos"))
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key: Hashable) -> tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = self._calls[key] = Future()
+            # Running futures cannot be cancelled by the callers waiting for them.
+            future.set_running_or_notify_cancel()
+            return future, True
+
+    def _resolve(
+        self,
+        key: Hashable,
+        future: Future,
+        result: Any = None,
+        error: BaseException | None = None,
+    ) -> None:
+        with self._lock:
+            del self._calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def run(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Computes a value, or waits for the identical computation in progress.
+
+        Args:
+            key (Hashable): Identity of the computation.
+            compute (Callable[[], Any]): Computes the value.
+
+        Returns:
+            Any: The computed value.
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = compute()
+        except BaseException as e:
+            self._resolve(key, future, error=e)
+            raise
+        self._resolve(key, future, result)
+        return result
+
+    async def run_async(
+        self, key: Hashable, compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Computes a value, or waits for the identical computation in progress.
+
+        Args:
+            key (Hashable): Identity of the computation.
+            compute (Callable[[], Awaitable[Any]]): Computes the value.
+
+        Returns:
+            Any: The computed value.
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await compute()
+        except BaseException as e:
+            self._resolve(key, future, error=e)
+            raise
+        self._resolve(key, future, result)
+        return result
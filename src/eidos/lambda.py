@@ -1,3 +1,10 @@
+import time
+
+# Taken before anything else is imported, to report the duration of the init phase.
+_init_started = time.perf_counter()
+
+import asyncio
+from collections.abc import Callable, Hashable
 from enum import Enum
 from typing import Any
 
@@ -5,15 +12,88 @@ import structlog
 
 from eidos.execute import (
     execute,
+    execute_batch,
     get_function_schema,
     get_openai_function_definition,
     list_functions_names,
     list_functions_openai,
 )
+from eidos.logs import configure_logging, flush_logs
+from eidos.registry import registry
+from eidos.settings import settings
+from eidos.tracing import flush_traces, tracer
 
+configure_logging()
 log = structlog.get_logger("eidos.lambda")
 
 
+def _initialize() -> dict[str, float]:
+    """Loads and prepares every function while the container initializes.
+
+    Runs at import time, so that the work is done once per container and captured
+    by snapshots (e.g. SnapStart) instead of being billed in the first invocation.
+
+    Returns:
+        dict[str, float]: Milliseconds spent importing eidos, loading the function
+        definitions and preparing the functions.
+    """
+    imported = time.perf_counter()
+    registry.scan()
+    scanned = time.perf_counter()
+    registry.warm(import_functions=settings.lambda_preload_functions)
+    warmed = time.perf_counter()
+    return {
+        "imports_ms": round((imported - _init_started) * 1000, 3),
+        "registry_ms": round((scanned - imported) * 1000, 3),
+        "preload_ms": round((warmed - scanned) * 1000, 3),
+        "init_ms": round((warmed - _init_started) * 1000, 3),
+    }
+
+
+class WarmState:
+    """Responses kept across the warm invocations of a container.
+
+    Compiled validators and imported callables already live in the registry entries,
+    which outlive invocations. This keeps the responses that do not depend on the
+    event arguments, such as the catalog of `LIST`, and drops them all when the
+    digest of the function definitions changes.
+    """
+
+    def __init__(self):
+        self.digest: str | None = None
+        self._responses: dict[Hashable, Any] = {}
+
+    def get(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Gets a response, building it if it is not kept for the current definitions.
+
+        Args:
+            key (Hashable): Identity of the response.
+            build (Callable[[], Any]): Builds the response. Errors are not kept.
+
+        Returns:
+            Any: The response. Must not be modified.
+        """
+        digest = registry.digest
+        if digest != self.digest:
+            if self.digest is not None:
+                log.info("Function definitions changed", digest=digest)
+            self._responses = {}
+            self.digest = digest
+        try:
+            return self._responses[key]
+        except KeyError:
+            response = self._responses[key] = build()
+            return response
+
+
+warm_state = WarmState()
+init_durations = _initialize()
+log.info("Lambda initialized", functions=len(registry.entries()), **init_durations)
+
+# Whether the next invocation is the first one served by this container.
+_cold_start = True
+
+
 class ValidationCommands(Enum):
     """Enum to hold the different validation commands from eidos."""
 
@@ -22,6 +102,7 @@ class ValidationCommands(Enum):
     GET_DEFINITION = "GET_DEFINITION"
     GET_SCHEMA = "GET_SCHEMA"
     EXECUTE = "EXECUTE"
+    EXECUTE_BATCH = "EXECUTE_BATCH"
 
     def __str__(self):
         return self.value
@@ -31,6 +112,38 @@ class ValidationCommands(Enum):
 
 
 def lambda_handler(event: dict[str, Any], context: dict[str, Any]):
+    global _cold_start
+    started = time.perf_counter()
+    # The caller's trace context, from the event or the headers of an HTTP event.
+    traceparent = event.get("traceparent") or (event.get("headers") or {}).get(
+        "traceparent"
+    )
+    try:
+        with tracer.start_span(
+            f"lambda {event.get('command')}",
+            {"faas.coldstart": _cold_start},
+            traceparent=traceparent,
+        ):
+            return _handle(event)
+    finally:
+        handler_ms = round((time.perf_counter() - started) * 1000, 3)
+        if _cold_start:
+            _cold_start = False
+            log.info(
+                "Event handled",
+                handler_ms=handler_ms,
+                cold_start=True,
+                **init_durations,
+            )
+        else:
+            log.info("Event handled", handler_ms=handler_ms, cold_start=False)
+        # The process may be frozen until the next invocation, with logs and spans
+        # still queued.
+        flush_logs()
+        flush_traces()
+
+
+def _handle(event: dict[str, Any]):
     try:
         log.info("Processing event", command=event["command"])
         command = event["command"]
@@ -50,13 +163,16 @@ def lambda_handler(event: dict[str, Any], context: dict[str, Any]):
 
     match validation_function:
         case ValidationCommands.LIST:
-            return list_functions_openai()
+            return warm_state.get("LIST", list_functions_openai)
         case ValidationCommands.LIST_NAMES:
-            return list_functions_names()
+            return warm_state.get("LIST_NAMES", list_functions_names)
         case ValidationCommands.GET_DEFINITION:
             if "function" in event.get("parameters", {}):
                 function = event["parameters"]["function"]
-                return get_openai_function_definition(function)
+                return warm_state.get(
+                    ("GET_DEFINITION", function),
+                    lambda: get_openai_function_definition(function),
+                )
             else:
                 return {
                     "statusCode": 400,
@@ -65,7 +181,9 @@ def lambda_handler(event: dict[str, Any], context: dict[str, Any]):
         case ValidationCommands.GET_SCHEMA:
             if "function" in event.get("parameters", {}):
                 function = event["parameters"]["function"]
-                return get_function_schema(function)
+                return warm_state.get(
+                    ("GET_SCHEMA", function), lambda: get_function_schema(function)
+                )
             else:
                 return {
                     "statusCode": 400,
@@ -86,6 +204,20 @@ def lambda_handler(event: dict[str, Any], context: dict[str, Any]):
             result = execute(function, args)
 
             return result
+        case ValidationCommands.EXECUTE_BATCH:
+            if "calls" in event.get("parameters", {}):
+                calls = event["parameters"]["calls"]
+            else:
+                return {
+                    "statusCode": 400,
+                    "body": "Missing calls. Provide as parameters.calls",
+                }
+
+            log.info(
+                "Executing batch", functions=[call.get("function") for call in calls]
+            )
+
+            return asyncio.run(execute_batch(calls))
         case _:
             raise ValueError(
                 f"Unknown function: {event['command']}. "
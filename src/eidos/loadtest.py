@@ -0,0 +1,384 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+
+@dataclass(frozen=True)
+class Profile:
+    """Latency profile of synthetic functions, see `eidos.functions.synthetic.work`.
+
+    Args:
+        name (str): Name of the profile, used in the function names and the report.
+        sleep_ms (float): Milliseconds every call waits, as if on I/O.
+        cpu_ms (float): Milliseconds every call is busy on the CPU.
+        result_size (int): Number of integers every call returns.
+    """
+
+    name: str
+    sleep_ms: float = 0.0
+    cpu_ms: float = 0.0
+    result_size: int = 1
+
+    @classmethod
+    def parse(cls, spec: str) -> "Profile":
+        """Parses a profile given as `name:sleep_ms:cpu_ms:result_size`."""
+        try:
+            name, sleep_ms, cpu_ms, result_size = spec.split(":")
+            return cls(name, float(sleep_ms), float(cpu_ms), int(result_size))
+        except ValueError:
+            raise argparse.ArgumentTypeError(
+                f"Invalid profile '{spec}', expected name:sleep_ms:cpu_ms:result_size."
+            )
+
+    def arguments(self) -> dict[str, Any]:
+        return {
+            "sleep_ms": float(self.sleep_ms),
+            "cpu_ms": float(self.cpu_ms),
+            "result_size": self.result_size,
+        }
+
+
+DEFAULT_PROFILES = (
+    Profile("fast", 0.0, 0.0, 10),
+    Profile("io", 20.0, 0.0, 10),
+    Profile("cpu", 0.0, 10.0, 10),
+    Profile("large", 0.0, 0.0, 100_000),
+)
+
+
+def write_functions(
+    folder: str | Path, count: int, profiles: tuple[Profile, ...] = DEFAULT_PROFILES
+) -> list[tuple[str, Profile]]:
+    """Writes synthetic function definitions, assigning the profiles in turn.
+
+    Args:
+        folder (str | Path): Functions folder, created if it does not exist.
+        count (int): Number of functions.
+        profiles (tuple[Profile, ...]): Latency profiles of the functions.
+
+    Returns:
+        list[tuple[str, Profile]]: The name and profile of every function.
+    """
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    functions = []
+    for i in range(count):
+        profile = profiles[i % len(profiles)]
+        name = f"synthetic_{i:05d}_{profile.name}"
+        definition = {
+            "name": name,
+            "description": f"Synthetic function with the '{profile.name}' profile.",
+            "module": "eidos.functions.synthetic.work",
+            "parameters": [
+                {
+                    "name": "sleep_ms",
+                    "type": "float",
+                    "description": "Milliseconds spent waiting.",
+                    "required": True,
+                },
+                {
+                    "name": "cpu_ms",
+                    "type": "float",
+                    "description": "Milliseconds spent busy on the CPU.",
+                    "required": True,
+                },
+                {
+                    "name": "result_size",
+                    "type": "int",
+                    "description": "Number of integers returned.",
+                    "required": True,
+                },
+            ],
+            "response": {"result": "list[int]"},
+        }
+        (folder / f"{name}.json").write_text(json.dumps(definition))
+        functions.append((name, profile))
+    return functions
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values, 0 if there are none."""
+    if not values:
+        return 0.0
+    rank = max(1, round(q / 100 * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+
+def summarize(results: list[tuple[str, float, bool]], elapsed: float) -> dict[str, Any]:
+    """Summarizes the (profile, latency, success) of every request."""
+    latencies = sorted(latency for _, latency, _ in results)
+    errors = sum(1 for _, _, ok in results if not ok)
+    return {
+        "requests": len(results),
+        "errors": errors,
+        "throughput": (len(results) - errors) / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 50) * 1000,
+            "p95": percentile(latencies, 95) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+            "max": (latencies[-1] if latencies else 0.0) * 1000,
+        },
+    }
+
+
+async def run_load(
+    client,
+    functions: list[tuple[str, Profile]],
+    rps: float,
+    duration: float,
+    concurrency: int = 100,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """Calls random functions at a constant rate and measures their latency.
+
+    Requests are sent on schedule whether or not the previous ones finished, up to
+    `concurrency` in flight. Latencies are measured from the scheduled send time, so
+    the time waiting for a free slot is included instead of hidden.
+
+    Args:
+        client (httpx.AsyncClient): Client of the eidos API.
+        functions (list[tuple[str, Profile]]): Name and profile of the functions.
+        rps (float): Target requests per second.
+        duration (float): Seconds sending requests.
+        concurrency (int): Maximum number of requests in flight.
+        seed (int): Seed choosing the functions called, for reproducible runs.
+
+    Returns:
+        dict[str, Any]: Requests, errors, throughput and latency percentiles, overall
+        and by profile.
+    """
+    choose = random.Random(seed).choice
+    slots = asyncio.Semaphore(concurrency)
+    results: list[tuple[str, float, bool]] = []
+
+    async def call(name: str, profile: Profile, scheduled: float) -> None:
+        async with slots:
+            try:
+                response = await client.post(
+                    f"/api/v1/execution/{name}", json=profile.arguments()
+                )
+                ok = response.status_code == 200
+            except Exception:  # noqa: BLE001
+                # Any failure of the request, e.g. a dropped connection, is an error.
+                ok = False
+        results.append((profile.name, time.perf_counter() - scheduled, ok))
+
+    started = time.perf_counter()
+    tasks = []
+    for i in range(int(rps * duration)):
+        scheduled = started + i / rps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        name, profile = choose(functions)
+        tasks.append(asyncio.create_task(call(name, profile, scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    report = {"target_rps": rps, "elapsed": elapsed, **summarize(results, elapsed)}
+    report["profiles"] = {
+        profile: summarize([r for r in results if r[0] == profile], elapsed)
+        for profile in sorted({name for name, _, _ in results})
+    }
+    return report
+
+
+@asynccontextmanager
+async def asgi_client(folder: Path) -> AsyncIterator[Any]:
+    """Client calling the app in process, serving the functions of a folder."""
+    import httpx
+
+    # Read by the settings when the app is first imported.
+    os.environ["EIDOS_FUNCTIONS_FOLDER"] = str(folder)
+    os.environ.pop("EIDOS_FUNCTIONS_BUNDLE", None)
+    from eidos.api import app
+
+    async with (
+        app.router.lifespan_context(app),
+        httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://eidos",
+            timeout=None,
+        ) as client,
+    ):
+        yield client
+
+
+@asynccontextmanager
+async def http_client(url: str) -> AsyncIterator[Any]:
+    """Client calling an already running server."""
+    import httpx
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=url, timeout=None, limits=limits) as client:
+        yield client
+
+
+@asynccontextmanager
+async def uvicorn_client(folder: Path, port: int, workers: int) -> AsyncIterator[Any]:
+    """Client calling a local uvicorn server, serving the functions of a folder."""
+    import httpx
+
+    env = {**os.environ, "EIDOS_FUNCTIONS_FOLDER": str(folder)}
+    env.pop("EIDOS_FUNCTIONS_BUNDLE", None)
+    server = await asyncio.create_subprocess_exec(
+        sys.executable,
+        *["-m", "uvicorn", "eidos.api:app"],
+        *["--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)],
+        *["--log-level", "warning"],
+        env=env,
+    )
+    try:
+        async with http_client(f"http://127.0.0.1:{port}") as client:
+            deadline = time.monotonic() + 30
+            while True:
+                if server.returncode is not None:
+                    raise RuntimeError("uvicorn exited before serving requests.")
+                try:
+                    if (await client.get("/healthz")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn did not start in 30 seconds.")
+                await asyncio.sleep(0.1)
+            yield client
+    finally:
+        if server.returncode is None:
+            server.terminate()
+        await server.wait()
+
+
+async def loadtest(args: argparse.Namespace, folder: Path) -> dict[str, Any]:
+    functions = write_functions(folder, args.functions, tuple(args.profile))
+    if args.url:
+        client = http_client(args.url)
+    elif args.server == "uvicorn":
+        client = uvicorn_client(folder, args.port, args.workers)
+    else:
+        client = asgi_client(folder)
+    async with client as client_:
+        report = await run_load(
+            client_, functions, args.rps, args.duration, args.concurrency, args.seed
+        )
+    report["functions"] = args.functions
+    report["server"] = args.url or args.server
+    return report
+
+
+def print_report(report: dict[str, Any]) -> None:
+    print(
+        f"{report['requests']} requests to {report['functions']} functions in "
+        f"{report['elapsed']:.1f}s ({report['server']}, target {report['target_rps']} "
+        f"rps): {report['throughput']:.1f} rps, {report['errors']} errors"
+    )
+    print(f"{'profile':<12} {'requests':>9} {'errors':>7} {'rps':>8}", end="")
+    print(f" {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = [("all", report)] + list(report["profiles"].items())
+    for name, stats in rows:
+        latency = stats["latency_ms"]
+        print(
+            f"{name:<12} {stats['requests']:>9} {stats['errors']:>7} "
+            f"{stats['throughput']:>8.1f} {latency['p50']:>9.2f} "
+            f"{latency['p95']:>9.2f} {latency['p99']:>9.2f}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point of the `eidos-loadtest` command line.
+
+    Generates synthetic functions with the given latency profiles and calls them at a
+    constant rate, reporting the latency percentiles and throughput. Executor settings
+    are taken from the environment as usual, e.g. `EIDOS_EXECUTOR_MAX_WORKERS`.
+
+    Example:
+    $ eidos-loadtest --functions 1000 --rps 200 --duration 30 --server uvicorn
+
+    Args:
+        argv (list[str] | None): Command line arguments, `sys.argv` by default.
+
+    Returns:
+        int: Exit code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="eidos-loadtest",
+        description="Load test eidos with synthetic functions.",
+    )
+    parser.add_argument(
+        "--functions", type=int, default=100, help="Number of synthetic functions."
+    )
+    parser.add_argument(
+        "--profile",
+        type=Profile.parse,
+        action="append",
+        help="Latency profile as name:sleep_ms:cpu_ms:result_size, repeatable. "
+        "Defaults to: "
+        + ", ".join(
+            f"{p.name}:{p.sleep_ms:g}:{p.cpu_ms:g}:{p.result_size}"
+            for p in DEFAULT_PROFILES
+        ),
+    )
+    parser.add_argument(
+        "--rps", type=float, default=100.0, help="Target requests per second."
+    )
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="Seconds sending requests."
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=100, help="Maximum requests in flight."
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed of the functions called."
+    )
+    parser.add_argument(
+        "--server",
+        choices=("asgi", "uvicorn"),
+        default="asgi",
+        help="Call the app in process or through a local uvicorn server.",
+    )
+    parser.add_argument("--port", type=int, default=8099, help="Port of uvicorn.")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Worker processes of uvicorn."
+    )
+    parser.add_argument(
+        "--url",
+        help="Call an already running server instead, whose functions folder must "
+        "be --functions-folder.",
+    )
+    parser.add_argument(
+        "--functions-folder",
+        type=Path,
+        help="Folder of the synthetic functions, a temporary one by default.",
+    )
+    parser.add_argument("-o", "--output", help="Path of the JSON report.")
+    args = parser.parse_args(argv)
+    args.profile = args.profile or list(DEFAULT_PROFILES)
+
+    try:
+        if args.functions_folder:
+            report = asyncio.run(loadtest(args, args.functions_folder))
+        else:
+            with tempfile.TemporaryDirectory(prefix="eidos-loadtest-") as folder:
+                report = asyncio.run(loadtest(args, Path(folder)))
+    except (ImportError, OSError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print_report(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
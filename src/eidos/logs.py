@@ -0,0 +1,321 @@
+import atexit
+import functools
+import queue
+import random
+import sys
+import threading
+from collections.abc import Callable
+from itertools import islice
+from typing import Any, TextIO
+
+import structlog
+
+from eidos.settings import settings
+
+# Numeric levels of the logging methods, as in the standard `logging` module.
+LEVELS = {
+    "debug": 10,
+    "info": 20,
+    "msg": 20,
+    "warning": 30,
+    "warn": 30,
+    "error": 40,
+    "exception": 40,
+    "critical": 50,
+    "fatal": 50,
+}
+
+
+def level_number(level: str) -> int:
+    """Gets the numeric level of a level name, e.g. `"info"` or `"DEBUG"`.
+
+    Raises:
+        ValueError: If the level is unknown.
+    """
+    try:
+        return LEVELS[level.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown log level: {level}")
+
+
+class LevelFilter:
+    """Drops the events below the level of their function, or the default level.
+
+    Args:
+        level (str): Default level.
+        function_levels (dict[str, str]): Level of the events of each function, i.e.
+            those with a `function` key.
+    """
+
+    def __init__(self, level: str, function_levels: dict[str, str]):
+        self.level = level_number(level)
+        self.function_levels = {
+            function: level_number(function_level)
+            for function, function_level in function_levels.items()
+        }
+
+    def __call__(self, logger, method_name: str, event_dict: dict) -> dict:
+        level = self.level
+        if self.function_levels:
+            level = self.function_levels.get(event_dict.get("function"), level)
+        if LEVELS.get(method_name, 20) < level:
+            raise structlog.DropEvent
+        return event_dict
+
+
+class Sampler:
+    """Keeps a fraction of the info and debug events of function calls.
+
+    Warnings and errors, and events not bound to a function (e.g., at startup), are
+    always kept.
+
+    Args:
+        rate (float): Fraction of the events kept, between 0 and 1.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+
+    def __call__(self, logger, method_name: str, event_dict: dict) -> dict:
+        if (
+            self.rate < 1
+            and LEVELS.get(method_name, 20) < 30
+            and "function" in event_dict
+            and random.random() >= self.rate
+        ):
+            raise structlog.DropEvent
+        return event_dict
+
+
+def truncate(value: Any, max_length: int, max_items: int, depth: int = 3) -> Any:
+    """Shortens a logged value without serializing it.
+
+    Strings are cut to `max_length` characters and collections to their first
+    `max_items` items, recursively up to `depth` levels. The cost depends on the
+    limits, not on the size of the value.
+
+    Args:
+        value (Any): The value.
+        max_length (int): Maximum length of strings.
+        max_items (int): Maximum number of items of collections.
+        depth (int): Maximum nesting of the collections kept.
+
+    Returns:
+        Any: The value, or a shortened copy.
+    """
+    if isinstance(value, str):
+        if len(value) <= max_length:
+            return value
+        return f"{value[:max_length]}... ({len(value)} characters)"
+    if isinstance(value, (bytes, bytearray)):
+        return value if len(value) <= max_length else f"<{len(value)} bytes>"
+    if isinstance(value, dict):
+        if depth == 0:
+            return f"<dict of {len(value)} items>"
+        items = {
+            key: truncate(item, max_length, max_items, depth - 1)
+            for key, item in islice(value.items(), max_items)
+        }
+        if len(value) > max_items:
+            items["..."] = f"{len(value) - max_items} more items"
+        return items
+    if isinstance(value, (list, tuple, set, frozenset)):
+        if depth == 0:
+            return f"<{type(value).__name__} of {len(value)} items>"
+        items = [
+            truncate(item, max_length, max_items, depth - 1)
+            for item in islice(value, max_items)
+        ]
+        if len(value) > max_items:
+            items.append(f"... {len(value) - max_items} more items")
+        return items
+    return value
+
+
+class Truncator:
+    """Shortens every value of the events, see `truncate`."""
+
+    def __init__(self, max_length: int, max_items: int):
+        self.max_length = max_length
+        self.max_items = max_items
+
+    def __call__(self, logger, method_name: str, event_dict: dict) -> dict:
+        return {
+            key: truncate(value, self.max_length, self.max_items)
+            for key, value in event_dict.items()
+        }
+
+
+class LogWriter:
+    """Renders the log events and writes them, one per line, in a background thread.
+
+    Request threads and the event loop only put the events in a bounded queue, so
+    they never wait on the output. Events are dropped, and counted, while the queue
+    is full.
+
+    Args:
+        renderer (Callable): Processor turning an event into a line.
+        file (TextIO | None): Where the lines are written, stdout by default.
+        queue_size (int): Maximum number of events waiting. 0 writes the events
+            synchronously, without a thread.
+        max_line_length (int): Lines longer than this are cut.
+    """
+
+    def __init__(
+        self,
+        renderer: Callable[[Any, str, dict], str],
+        file: TextIO | None = None,
+        queue_size: int = 10000,
+        max_line_length: int = 4096,
+    ):
+        self.renderer = renderer
+        self.file = file
+        self.max_line_length = max_line_length
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._queue: queue.Queue | None = None
+        self._thread: threading.Thread | None = None
+        if queue_size > 0:
+            self._queue = queue.Queue(queue_size)
+            self._thread = threading.Thread(
+                target=self._run, name="eidos-logs", daemon=True
+            )
+            self._thread.start()
+
+    def put(self, method_name: str, event_dict: dict) -> None:
+        if self._queue is None:
+            self._write(method_name, event_dict)
+            return
+        try:
+            self._queue.put_nowait((method_name, event_dict))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, method_name: str, event_dict: dict) -> None:
+        with self._lock:
+            dropped, self.dropped = self.dropped, 0
+        lines = []
+        if dropped:
+            lines.append(
+                self._render(
+                    "warning",
+                    {
+                        "event": "Log events dropped, the queue was full.",
+                        "level": "warning",
+                        "count": dropped,
+                    },
+                )
+            )
+        lines.append(self._render(method_name, event_dict))
+        file = self.file or sys.stdout
+        file.write("".join(lines))
+        file.flush()
+
+    def _render(self, method_name: str, event_dict: dict) -> str:
+        try:
+            line = self.renderer(None, method_name, event_dict)
+        except Exception as e:  # noqa: BLE001
+            # Logged values may fail to render in any way, e.g. in their `__repr__`.
+            line = f"Error: failed to render log event {event_dict.get('event')!r}: {e}"
+        if len(line) > self.max_line_length:
+            line = f"{line[: self.max_line_length]}... ({len(line)} characters)"
+        return line + "\n"
+
+    def flush(self) -> None:
+        """Waits until every event put so far is written."""
+        if self._queue is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Writes the pending events and stops the thread."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+
+
+class QueueLogger:
+    """Logger handing the processed events to a `LogWriter`."""
+
+    def __init__(self, writer: LogWriter):
+        for method_name in LEVELS:
+            setattr(self, method_name, functools.partial(self._put, method_name))
+        self._writer = writer
+
+    def _put(self, method_name: str, **event_dict: Any) -> None:
+        self._writer.put(method_name, event_dict)
+
+
+writer: LogWriter | None = None
+
+
+def configure_logging() -> LogWriter:
+    """Configures structlog from the settings, once per process.
+
+    Filtering by level, sampling and truncation run where the event is logged, so
+    that dropped events and large values cost little. Rendering and writing run in
+    the background thread of a `LogWriter`.
+
+    Returns:
+        LogWriter: The writer of the events.
+    """
+    global writer
+    if writer is not None:
+        return writer
+
+    if settings.log_format == "json":
+        json_renderer = structlog.processors.JSONRenderer()
+
+        def renderer(logger, method_name: str, event_dict: dict) -> str:
+            event_dict = structlog.processors.format_exc_info(
+                logger, method_name, event_dict
+            )
+            return json_renderer(logger, method_name, event_dict)
+
+    else:
+        renderer = structlog.dev.ConsoleRenderer()
+
+    writer = LogWriter(
+        renderer,
+        queue_size=settings.log_queue_size,
+        max_line_length=settings.log_max_line_length,
+    )
+    atexit.register(writer.close)
+
+    # Events below every configured level are dropped before any processor runs.
+    min_level = min(
+        map(level_number, [settings.log_level, *settings.log_function_levels.values()])
+    )
+    structlog.configure(
+        processors=[
+            structlog.contextvars.merge_contextvars,
+            LevelFilter(settings.log_level, settings.log_function_levels),
+            Sampler(settings.log_sample_rate),
+            structlog.processors.add_log_level,
+            structlog.processors.StackInfoRenderer(),
+            structlog.dev.set_exc_info,
+            structlog.processors.TimeStamper(fmt="%Y-%m-%d %H:%M:%S", utc=False),
+            # Last, so that its copy of the event is passed to `QueueLogger`.
+            Truncator(settings.log_max_value_length, settings.log_max_items),
+        ],
+        wrapper_class=structlog.make_filtering_bound_logger(min_level),
+        logger_factory=lambda *args: QueueLogger(writer),
+    )
+    return writer
+
+
+def flush_logs() -> None:
+    """Waits until every event logged so far is written, e.g. before the process is
+    frozen between Lambda invocations."""
+    if writer is not None:
+        writer.flush()
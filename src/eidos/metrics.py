@@ -0,0 +1,371 @@
+import asyncio
+import bisect
+import concurrent.futures
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from eidos.executor import executor_pending
+from eidos.results import result_cache
+from eidos.settings import settings
+from eidos.utils import json_cache_stats
+
+# Content type of the Prometheus text exposition format.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds, in seconds, of the buckets of the latency histograms.
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+# Errors of these types are timeouts, counted once where they are reported.
+_TIMEOUT_ERRORS = (TimeoutError, asyncio.TimeoutError, concurrent.futures.TimeoutError)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """A metric family exposed in the Prometheus text format.
+
+    Args:
+        name (str): Name of the metric.
+        documentation (str): Help text of the metric.
+        labelnames (tuple[str, ...]): Names of the labels of every sample.
+    """
+
+    type_ = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def samples(self) -> Iterator[tuple[str, tuple[str, ...], float]]:
+        """Yields the (suffix, label values, value) of every sample."""
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        """Renders the metric family in the Prometheus text format."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_}",
+        ]
+        for suffix, labels, value in self.samples():
+            names = (
+                self.labelnames + ("le",) if suffix == "_bucket" else self.labelnames
+            )
+            lines.append(
+                f"{self.name}{suffix}{_format_labels(names, labels)} "
+                f"{_format_value(value)}"
+            )
+        return lines
+
+
+class Counter(Metric):
+    """A monotonically increasing count, per label values."""
+
+    type_ = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> Iterator[tuple[str, tuple[str, ...], float]]:
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield "", labels, value
+
+
+class Gauge(Counter):
+    """A value that goes up and down, per label values."""
+
+    type_ = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class CallbackGauge(Metric):
+    """A gauge whose values are read when the metrics are collected.
+
+    Args:
+        name (str): Name of the metric.
+        documentation (str): Help text of the metric.
+        labelnames (tuple[str, ...]): Names of the labels of every sample.
+        callback (Callable[[], dict[tuple[str, ...], float]]): Returns the values,
+            keyed by label values.
+        type_ (str): Prometheus type of the metric, "gauge" or "counter".
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...],
+        callback: Callable[[], dict[tuple[str, ...], float]],
+        type_: str = "gauge",
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self.type_ = type_
+
+    def samples(self) -> Iterator[tuple[str, tuple[str, ...], float]]:
+        for labels, value in self.callback().items():
+            yield "", labels, value
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets, per label values.
+
+    Args:
+        name (str): Name of the metric.
+        documentation (str): Help text of the metric.
+        labelnames (tuple[str, ...]): Names of the labels of every sample.
+        buckets (tuple[float, ...]): Sorted upper bounds of the buckets.
+    """
+
+    type_ = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Per label values: the count of each bucket (plus +Inf) and the sum.
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(
+                labels, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    def samples(self) -> Iterator[tuple[str, tuple[str, ...], float]]:
+        with self._lock:
+            values = [
+                (labels, list(counts), total[0])
+                for labels, (counts, total) in self._values.items()
+            ]
+        for labels, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield "_bucket", labels + (_format_value(float(bound)),), cumulative
+            yield "_sum", labels, total
+            yield "_count", labels, cumulative
+
+
+class MetricsRegistry:
+    """The metric families exposed by a process."""
+
+    def __init__(self):
+        self.metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Renders every metric in the Prometheus text format.
+
+        Returns:
+            str: The metrics, ready to be scraped.
+        """
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _result_cache_counters(counter: str) -> dict[tuple[str, ...], float]:
+    return {
+        (function,): stats.get(counter, 0)
+        for function, stats in result_cache.stats().items()
+    }
+
+
+metrics = MetricsRegistry()
+
+stage_duration = metrics.register(
+    Histogram(
+        "eidos_execution_stage_duration_seconds",
+        "Duration of each stage of the executions: load of the definition, input "
+        "validation, function call and output validation.",
+        ("function", "stage"),
+    )
+)
+execution_errors = metrics.register(
+    Counter(
+        "eidos_execution_errors_total",
+        "Executions failed, by the stage that failed.",
+        ("function", "stage"),
+    )
+)
+executions_in_flight = metrics.register(
+    Gauge(
+        "eidos_executions_in_flight",
+        "Executions currently running, shared identical calls counted once.",
+        ("function",),
+    )
+)
+metrics.register(
+    CallbackGauge(
+        "eidos_result_cache_hits_total",
+        "Results served from the result cache.",
+        ("function",),
+        lambda: _result_cache_counters("hits"),
+        type_="counter",
+    )
+)
+metrics.register(
+    CallbackGauge(
+        "eidos_result_cache_misses_total",
+        "Results of cached functions not found in the result cache.",
+        ("function",),
+        lambda: _result_cache_counters("misses"),
+        type_="counter",
+    )
+)
+metrics.register(
+    CallbackGauge(
+        "eidos_definition_cache_hits_total",
+        "Definition files served from the definition cache.",
+        (),
+        lambda: {(): json_cache_stats()["hits"]},
+        type_="counter",
+    )
+)
+metrics.register(
+    CallbackGauge(
+        "eidos_definition_cache_misses_total",
+        "Definition files parsed because they were not cached or changed.",
+        (),
+        lambda: {(): json_cache_stats()["misses"]},
+        type_="counter",
+    )
+)
+metrics.register(
+    CallbackGauge(
+        "eidos_executor_pending",
+        "Calls running or waiting for a worker, by pool.",
+        ("executor",),
+        lambda: {(name,): pending for name, pending in executor_pending().items()},
+    )
+)
+
+# Function label of the errors of calls to functions that do not exist, so that
+# arbitrary names do not create new series.
+UNKNOWN_FUNCTION = "<unknown>"
+
+
+def observe_stage(function: str, stage: str, started: float) -> None:
+    """Records the duration of a stage of an execution.
+
+    Args:
+        function (str): Name of the function.
+        stage (str): Name of the stage.
+        started (float): `time.perf_counter()` when the stage started.
+    """
+    if settings.metrics_enabled:
+        stage_duration.observe(time.perf_counter() - started, function, stage)
+
+
+def count_error(function: str, stage: str) -> None:
+    """Records an execution failed at a stage.
+
+    Args:
+        function (str): Name of the function.
+        stage (str): Name of the stage.
+    """
+    if settings.metrics_enabled:
+        execution_errors.inc(function, stage)
+
+
+@contextmanager
+def measure(function: str, stage: str) -> Iterator[None]:
+    """Records the duration of a stage of an execution, and its errors.
+
+    Timeouts are not counted as errors here: they are counted where they are
+    reported, see `count_error`.
+
+    Example:
+    >> with measure("salute", "call"):
+    >>     salute("Nikos")
+
+    Args:
+        function (str): Name of the function.
+        stage (str): Name of the stage.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except _TIMEOUT_ERRORS:
+        raise
+    except Exception:
+        count_error(function, stage)
+        raise
+    finally:
+        observe_stage(function, stage, started)
+
+
+@contextmanager
+def running(function: str) -> Iterator[None]:
+    """Counts an execution as in flight while the block runs.
+
+    Args:
+        function (str): Name of the function.
+    """
+    if not settings.metrics_enabled:
+        yield
+        return
+    executions_in_flight.inc(function)
+    try:
+        yield
+    finally:
+        executions_in_flight.dec(function)
@@ -0,0 +1,11 @@
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class FunctionCall(BaseModel):
+    """This data model represents a call to an AI function in a batch execution."""
+
+    function: str
+    arguments: dict[str, Any] | None = None
+    id: str | int | None = None
@@ -1,10 +1,16 @@
 import builtins
+from typing import Any
 
 from pydantic import BaseModel, Field, create_model
 
+from eidos.cache import LRUCache
 from eidos.models.parameter import AiParameter
+from eidos.settings import settings
 from eidos.validation.type import parse_type_name
 
+# Generated models and their JSON schema, keyed by function name and definition digest.
+model_cache = LRUCache(maxsize=settings.model_cache_size)
+
 
 def load_model(fn: dict) -> BaseModel:
     """Load a Pydantic model from a function's JSON definition.
@@ -47,3 +53,35 @@ def load_model(fn: dict) -> BaseModel:
         )
 
     return create_model(fn["name"], **parameters_dict)
+
+
+def load_cached_model(fn: dict, digest: str) -> tuple[BaseModel, dict[str, Any]]:
+    """Load the Pydantic model of a function and its JSON schema, memoized.
+
+    Both are generated once per version of the definition and kept in a bounded LRU
+    cache. The returned schema is shared and must not be modified.
+
+    Args:
+        fn (dict): JSON definition of the function.
+        digest (str): Content hash of the definition, see `eidos.utils.definition_digest`.
+
+    Returns:
+        tuple[BaseModel, dict[str, Any]]: The model and its JSON schema.
+    """
+    key = (fn["name"], digest)
+    cached = model_cache.get(key)
+    if cached is None:
+        model = load_model(fn)
+        cached = (model, model.model_json_schema())
+        model_cache.set(key, cached)
+    return cached
+
+
+def invalidate_model(name: str, digest: str) -> None:
+    """Remove a function's model from the cache.
+
+    Args:
+        name (str): Name of the function.
+        digest (str): Content hash of the definition.
+    """
+    model_cache.pop((name, digest))
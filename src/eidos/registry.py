@@ -0,0 +1,438 @@
+import hashlib
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import structlog
+from pydantic import BaseModel
+
+from eidos.models.function import invalidate_model, load_cached_model
+from eidos.settings import settings
+from eidos.utils import definition_digest, import_function, json_load
+from eidos.validation.schema import ChunkValidator, InputValidator, OutputValidator
+
+log = structlog.get_logger("eidos.registry")
+
+# Number of results kept when the `cache` block of a definition sets no `max_entries`.
+DEFAULT_CACHE_MAX_ENTRIES = 128
+
+# Pools a function may run in, set by `executor` in its definition.
+EXECUTORS = ("thread", "process")
+
+
+def cache_config(definition: dict[str, Any]) -> dict[str, Any] | None:
+    """Validates the `cache` block of a definition and fills in its defaults.
+
+    An empty block (`"cache": {}`) opts in to result caching with the defaults.
+
+    Args:
+        definition (dict[str, Any]): The function definition.
+
+    Returns:
+        dict[str, Any] | None: The `max_entries` and `ttl` of the cache, None if the
+        definition has no `cache` block.
+
+    Raises:
+        TypeError: If the block is not an object.
+        ValueError: If `max_entries` is not a positive integer or `ttl` is neither a
+            positive number nor null.
+    """
+    config = definition.get("cache")
+    if config is None:
+        return None
+    if not isinstance(config, dict):
+        raise TypeError(
+            'cache must be an object, e.g. {"ttl": 300, "max_entries": 1000}.'
+        )
+    max_entries = config.get("max_entries", DEFAULT_CACHE_MAX_ENTRIES)
+    if (
+        isinstance(max_entries, bool)
+        or not isinstance(max_entries, int)
+        or max_entries <= 0
+    ):
+        raise ValueError("cache.max_entries must be a positive integer.")
+    ttl = config.get("ttl")
+    if ttl is not None and (
+        isinstance(ttl, bool) or not isinstance(ttl, (int, float)) or ttl <= 0
+    ):
+        raise ValueError("cache.ttl must be a positive number of seconds or null.")
+    return {"max_entries": max_entries, "ttl": ttl}
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate_limits(definition: dict[str, Any]) -> None:
+    """Validates the `timeout_s` and `max_concurrency` of a definition.
+
+    Args:
+        definition (dict[str, Any]): The function definition.
+
+    Raises:
+        ValueError: If `timeout_s` is neither a positive number nor null, or
+            `max_concurrency` is neither a positive integer nor null.
+    """
+    timeout = definition.get("timeout_s")
+    if timeout is not None and (not _is_number(timeout) or timeout <= 0):
+        raise ValueError("timeout_s must be a positive number of seconds or null.")
+    max_concurrency = definition.get("max_concurrency")
+    if max_concurrency is not None and (
+        isinstance(max_concurrency, bool)
+        or not isinstance(max_concurrency, int)
+        or max_concurrency <= 0
+    ):
+        raise ValueError("max_concurrency must be a positive integer or null.")
+
+
+@dataclass
+class FunctionEntry:
+    """A function definition held by the registry.
+
+    The imported callable and the compiled validators are resolved on first use and
+    kept for as long as the definition file does not change. The generated Pydantic
+    model lives in the shared model cache, keyed by name and digest.
+    """
+
+    name: str
+    path: Path
+    signature: tuple[int, int, int]
+    definition: dict[str, Any]
+    digest: str
+    _function: Callable | None = None
+    _input_validator: InputValidator | None = None
+    _output_validator: OutputValidator | None = None
+    _chunk_validator: ChunkValidator | None = None
+    _json_schema: dict[str, Any] | None = None
+    _cache: dict[str, Any] | None = field(default=None, init=False)
+
+    def __post_init__(self):
+        # Validated once, as the result cache reads it on every call.
+        self._cache = cache_config(self.definition)
+
+    @property
+    def function(self) -> Callable:
+        """The function object referenced by the definition's `module`."""
+        if self._function is None:
+            self._function = import_function(self.definition["module"])
+        return self._function
+
+    @property
+    def executor(self) -> str:
+        """Where the function runs: "thread" (the default) or "process"."""
+        return self.definition.get("executor", "thread")
+
+    @property
+    def timeout(self) -> float | None:
+        """Seconds a call may run, from `timeout_s` or the default in the settings."""
+        timeout = self.definition.get("timeout_s", settings.execution_timeout)
+        if timeout is None and self.executor == "process":
+            return settings.process_executor_timeout
+        return timeout
+
+    @property
+    def max_concurrency(self) -> int | None:
+        """Maximum number of calls running at the same time, from `max_concurrency`."""
+        return self.definition.get("max_concurrency")
+
+    @property
+    def cache(self) -> dict[str, Any] | None:
+        """The `max_entries` and `ttl` of the result cache, None if not cached."""
+        return self._cache
+
+    @property
+    def model(self) -> BaseModel:
+        """The Pydantic model generated from the definition's parameters."""
+        return load_cached_model(self.definition, self.digest)[0]
+
+    @property
+    def json_schema(self) -> dict[str, Any]:
+        """The JSON schema of the definition's parameters. Must not be modified."""
+        if self._json_schema is not None:
+            return self._json_schema
+        return load_cached_model(self.definition, self.digest)[1]
+
+    @property
+    def input_validator(self) -> InputValidator:
+        """The validator compiled from the definition's parameters."""
+        if self._input_validator is None:
+            self._input_validator = InputValidator(self.definition["parameters"])
+        return self._input_validator
+
+    @property
+    def output_validator(self) -> OutputValidator:
+        """The validator compiled from the definition's response."""
+        if self._output_validator is None:
+            self._output_validator = OutputValidator(self.definition["response"])
+        return self._output_validator
+
+    @property
+    def chunk_validator(self) -> ChunkValidator:
+        """The validator of streamed chunks compiled from the definition's response."""
+        if self._chunk_validator is None:
+            self._chunk_validator = ChunkValidator(self.definition["response"])
+        return self._chunk_validator
+
+    def prepare(self, import_function: bool = True) -> None:
+        """Builds the JSON schema and compiled validators ahead of the first call.
+
+        Args:
+            import_function (bool): Whether to also import the callable.
+        """
+        _ = self.json_schema
+        _ = self.input_validator
+        _ = self.output_validator
+        if import_function:
+            _ = self.function
+
+
+def file_signature(file_path: Path) -> tuple[int, int, int]:
+    """Returns the (inode, mtime, size) used to detect changes in a definition file.
+
+    Args:
+        file_path (Path): Path of the definition file.
+
+    Returns:
+        tuple[int, int, int]: Inode number, modification time in nanoseconds and size
+        in bytes. The inode changes when the file is replaced, e.g. by an atomic
+        rename or a ConfigMap update.
+    """
+    stat = file_path.stat()
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class FunctionRegistry:
+    """In-memory registry of the AI functions defined in a folder.
+
+    The folder is scanned once and every definition is parsed and kept in memory,
+    keyed by the name of its file. Afterwards the folder is polled at most once every
+    `reload_interval` seconds, and only the files whose inode, modification time or
+    size changed are parsed again. A negative interval disables hot reloading.
+
+    When a bundle built by `eidos bundle` is given, the definitions are read from it
+    instead of the folder, with their validators already compiled, and never reloaded.
+
+    Args:
+        folder (Path): Folder containing the JSON definitions.
+        reload_interval (float): Minimum number of seconds between two scans.
+        bundle (Path | None): Bundle of the definitions, if any.
+    """
+
+    def __init__(
+        self,
+        folder: str | Path,
+        reload_interval: float = 2.0,
+        bundle: str | Path | None = None,
+    ):
+        self.folder = Path(folder)
+        self.reload_interval = reload_interval
+        self.bundle = Path(bundle) if bundle is not None else None
+        # Incremented every time a definition is added, changed or removed.
+        self.generation = 0
+        self._entries: dict[str, FunctionEntry] = {}
+        self._last_scan: float | None = None
+        self._digest: tuple[int, str] | None = None
+        self._lock = threading.RLock()
+
+    def _load_entry(self, file_path: Path) -> FunctionEntry:
+        signature = file_signature(file_path)
+        definition = json_load(file_path)
+        if not isinstance(definition, dict):
+            raise TypeError("the definition must be a JSON object.")
+        validate_limits(definition)
+        if definition.get("executor", "thread") not in EXECUTORS:
+            raise ValueError(f"executor must be one of {', '.join(EXECUTORS)}.")
+        # Also validates the `cache` block, see `cache_config`.
+        return FunctionEntry(
+            name=file_path.stem,
+            path=file_path,
+            signature=signature,
+            definition=definition,
+            digest=definition_digest(definition),
+        )
+
+    def _discard(self, entry: FunctionEntry) -> None:
+        invalidate_model(entry.definition.get("name"), entry.digest)
+
+    def _load_bundle(self) -> bool:
+        # Imported here as the bundle module builds on the registry.
+        from eidos.bundle import read_bundle
+
+        if self._last_scan is not None:
+            return False
+        self._entries = {entry.name: entry for entry in read_bundle(self.bundle)}
+        self.generation += 1
+        self._last_scan = time.monotonic()
+        log.info(
+            "Function definitions loaded",
+            bundle=str(self.bundle),
+            functions=len(self._entries),
+            generation=self.generation,
+        )
+        return True
+
+    def scan(self, strict: bool = False) -> bool:
+        """Scans the folder and reloads the definitions that changed.
+
+        Definitions that cannot be read are logged and skipped, unless `strict`.
+
+        Args:
+            strict (bool): Whether to raise on definitions that cannot be read.
+
+        Returns:
+            bool: Whether any definition was added, changed or removed.
+
+        Raises:
+            ValueError: If `strict` and a definition cannot be read.
+        """
+        with self._lock:
+            if self.bundle is not None:
+                return self._load_bundle()
+            # Built aside and swapped in at the end, so that readers never see a
+            # dictionary being modified.
+            entries = dict(self._entries)
+            discarded = []
+            changed = False
+            seen = set()
+            for file_path in sorted(self.folder.glob("*.json")):
+                name = file_path.stem
+                seen.add(name)
+                entry = entries.get(name)
+                try:
+                    if entry is not None and entry.signature == file_signature(
+                        file_path
+                    ):
+                        continue
+                    new_entry = self._load_entry(file_path)
+                except (OSError, TypeError, ValueError) as e:
+                    if strict:
+                        raise ValueError(
+                            f"Invalid function definition {file_path}: {e}"
+                        )
+                    log.error(
+                        "Error: failed to load function definition.",
+                        file_path=file_path,
+                        error=str(e),
+                    )
+                    new_entry = None
+
+                if new_entry is None:
+                    if entry is None:
+                        continue
+                    discarded.append(entries.pop(name))
+                    changed = True
+                elif entry is not None and entry.digest == new_entry.digest:
+                    # The file was touched but its content is the same.
+                    entry.signature = new_entry.signature
+                    continue
+                else:
+                    if entry is not None:
+                        discarded.append(entry)
+                    entries[name] = new_entry
+                    changed = True
+
+            for name in entries.keys() - seen:
+                discarded.append(entries.pop(name))
+                changed = True
+
+            if changed:
+                self._entries = dict(sorted(entries.items()))
+                for entry in discarded:
+                    self._discard(entry)
+                self.generation += 1
+                log.info(
+                    "Function definitions loaded",
+                    folder=str(self.folder),
+                    functions=len(self._entries),
+                    generation=self.generation,
+                )
+            self._last_scan = time.monotonic()
+            return changed
+
+    def refresh(self) -> None:
+        """Scans the folder if it was never scanned or the reload interval elapsed."""
+        last_scan = self._last_scan
+        if last_scan is None or (
+            self.reload_interval >= 0
+            and time.monotonic() - last_scan >= self.reload_interval
+        ):
+            self.scan()
+
+    def get(self, name: str) -> FunctionEntry:
+        """Gets a function definition by name.
+
+        Args:
+            name (str): Name of the function, i.e., the stem of its definition file.
+
+        Returns:
+            FunctionEntry: The registry entry of the function.
+
+        Raises:
+            FileNotFoundError: If there is no definition for the function.
+        """
+        self.refresh()
+        entry = self._entries.get(name)
+        if entry is None:
+            # The file may have been created since the last scan.
+            file_path = self.folder / f"{name}.json"
+            if self.bundle is None and file_path.is_file():
+                self.scan()
+                entry = self._entries.get(name)
+            if entry is None:
+                raise FileNotFoundError(f"Function '{name}' not found.")
+        return entry
+
+    @property
+    def digest(self) -> str:
+        """Digest of every definition in the registry, changing whenever one does."""
+        self.refresh()
+        with self._lock:
+            if self._digest is None or self._digest[0] != self.generation:
+                digest = hashlib.sha256()
+                for name, entry in self._entries.items():
+                    digest.update(f"{name}:{entry.digest}\n".encode())
+                self._digest = (self.generation, digest.hexdigest())
+            return self._digest[1]
+
+    def warm(self, import_functions: bool = True) -> None:
+        """Prepares every function ahead of its first call.
+
+        Builds the generated model and compiled validators of every function and,
+        optionally, imports its callable. Meant to run while a process initializes,
+        e.g. before a snapshot of a Lambda container is taken. Functions failing to
+        prepare are logged and fail again on their first call.
+
+        Args:
+            import_functions (bool): Whether to import the callables. Functions run
+                by the process pool are imported by its workers instead.
+        """
+        for entry in self.entries():
+            try:
+                entry.prepare(import_functions and entry.executor != "process")
+            except Exception as e:  # noqa: BLE001
+                # Importing runs arbitrary module code. The function fails again,
+                # with its error, when called.
+                log.error(
+                    "Error: failed to prepare function.",
+                    function=entry.name,
+                    error=str(e),
+                )
+
+    def entries(self) -> list[FunctionEntry]:
+        """Lists every function in the registry, sorted by name.
+
+        Returns:
+            list[FunctionEntry]: The registry entries.
+        """
+        self.refresh()
+        return list(self._entries.values())
+
+
+registry = FunctionRegistry(
+    settings.functions_folder,
+    reload_interval=settings.functions_reload_interval,
+    bundle=settings.functions_bundle,
+)
@@ -0,0 +1,394 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Hashable
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+from eidos.cache import LRUCache
+from eidos.registry import FunctionEntry
+from eidos.settings import settings
+
+log = structlog.get_logger("eidos.results")
+
+
+def canonical_arguments(arguments: dict[str, Any] | None) -> str | None:
+    """Serializes validated arguments so that equal arguments give equal strings.
+
+    Args:
+        arguments (dict[str, Any] | None): Validated arguments of a call.
+
+    Returns:
+        str | None: The canonical JSON of the arguments, None if not serializable.
+    """
+    try:
+        return json.dumps(
+            arguments or {}, sort_keys=True, separators=(",", ":"), allow_nan=False
+        )
+    except (TypeError, ValueError):
+        return None
+
+
+def key_digest(key: Hashable) -> str:
+    """Hashes the key of a call into a fixed length string, for external stores."""
+    return hashlib.sha256(json.dumps(key).encode()).hexdigest()
+
+
+class ResultCacheBackend(ABC):
+    """Storage of the memoized results of functions.
+
+    Keys are `(function name, definition digest, canonical arguments)` tuples and
+    the cache settings of each function come from the `cache` block of its
+    definition.
+    """
+
+    # Whether `get` and `set` may block on I/O, so that the event loop runs them in a
+    # thread instead.
+    blocking = False
+
+    def __init__(self):
+        self.hits: dict[str, int] = {}
+        self.misses: dict[str, int] = {}
+
+    def _count(self, entry: FunctionEntry, hit: bool) -> None:
+        counters = self.hits if hit else self.misses
+        counters[entry.name] = counters.get(entry.name, 0) + 1
+
+    @abstractmethod
+    def get(self, entry: FunctionEntry, key: Hashable) -> dict[str, Any] | None:
+        """Gets the validated result of a call, None on a miss."""
+
+    @abstractmethod
+    def set(self, entry: FunctionEntry, key: Hashable, result: dict[str, Any]) -> None:
+        """Stores the validated result of a call."""
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Returns the hit and miss counters of this process, keyed by function name."""
+        return {
+            name: {"hits": self.hits.get(name, 0), "misses": self.misses.get(name, 0)}
+            for name in self.hits.keys() | self.misses.keys()
+        }
+
+
+class MemoryBackend(ResultCacheBackend):
+    """Results kept in the memory of the process, in one LRU cache per function.
+
+    The cache of a function is replaced whenever its definition changes.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._caches: dict[str, tuple[str, LRUCache]] = {}
+        self._lock = threading.Lock()
+
+    def _cache(self, entry: FunctionEntry) -> LRUCache:
+        cached = self._caches.get(entry.name)
+        if cached is None or cached[0] != entry.digest:
+            with self._lock:
+                cached = self._caches.get(entry.name)
+                if cached is None or cached[0] != entry.digest:
+                    config = entry.cache
+                    cache = LRUCache(maxsize=config["max_entries"], ttl=config["ttl"])
+                    cached = self._caches[entry.name] = (entry.digest, cache)
+        return cached[1]
+
+    def get(self, entry: FunctionEntry, key: Hashable) -> dict[str, Any] | None:
+        return self._cache(entry).get(key)
+
+    def set(self, entry: FunctionEntry, key: Hashable, result: dict[str, Any]) -> None:
+        self._cache(entry).set(key, result)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {name: cache.stats() for name, (_, cache) in self._caches.items()}
+
+
+class SQLiteBackend(ResultCacheBackend):
+    """Results kept in a SQLite database, shared by the processes of one host.
+
+    Several workers of the same host (e.g., `uvicorn --workers`) share their
+    results. The database uses WAL mode, which does not work on network filesystems
+    (NFS, EFS): do not share it between replicas on different nodes. Values are
+    stored as JSON, expire after the `ttl` of the function and the least recently
+    used ones are deleted beyond its `max_entries`.
+
+    Args:
+        path (Path): Path of the database file, created if it does not exist.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str | Path):
+        # Imported here so that processes using the memory backend do not load it.
+        import sqlite3
+
+        super().__init__()
+        self.path = Path(path)
+        self._connection = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None, timeout=5.0
+        )
+        self._lock = threading.Lock()
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, function TEXT NOT NULL, value TEXT NOT NULL, "
+                "expires_at REAL, accessed_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS results_function "
+                "ON results (function, accessed_at)"
+            )
+
+    def get(self, entry: FunctionEntry, key: Hashable) -> dict[str, Any] | None:
+        now = time.time()
+        db_key = key_digest(key)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM results "
+                "WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (db_key, now),
+            ).fetchone()
+            if row is not None:
+                self._connection.execute(
+                    "UPDATE results SET accessed_at = ? WHERE key = ?", (now, db_key)
+                )
+        self._count(entry, row is not None)
+        return None if row is None else json.loads(row[0])
+
+    def set(self, entry: FunctionEntry, key: Hashable, result: dict[str, Any]) -> None:
+        config = entry.cache
+        max_entries = config["max_entries"]
+        ttl = config["ttl"]
+        now = time.time()
+        try:
+            value = json.dumps(result, allow_nan=False)
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (
+                    key_digest(key),
+                    entry.name,
+                    value,
+                    None if ttl is None else now + ttl,
+                    now,
+                ),
+            )
+            self._connection.execute(
+                "DELETE FROM results WHERE function = ? AND (expires_at <= ? OR key IN "
+                "(SELECT key FROM results WHERE function = ? "
+                "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?))",
+                (entry.name, now, entry.name, max_entries),
+            )
+
+    def close(self) -> None:
+        """Closes the connection to the database."""
+        with self._lock:
+            self._connection.close()
+
+
+class RedisBackend(ResultCacheBackend):
+    """Results kept in a server speaking the Redis protocol, shared by every replica.
+
+    Values are stored as JSON and expire after the `ttl` of the function. The keys of
+    each function are indexed by last access in a sorted set, and the least recently
+    used ones are deleted beyond its `max_entries`. While the server cannot be
+    reached, calls are logged and run as cache misses.
+
+    Args:
+        url (str): URL of the server, e.g. "redis://redis:6379/0".
+    """
+
+    blocking = True
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError(
+                "The redis result cache backend requires the redis package. "
+                "Install it with `pip install eidos[redis]`."
+            )
+
+        super().__init__()
+        # RESP2 is understood by every server version, and its replies have the same
+        # shape across client versions.
+        self._client = redis.Redis.from_url(url, protocol=2)
+        self._error = redis.RedisError
+
+    @staticmethod
+    def _keys(entry: FunctionEntry, key: Hashable) -> tuple[str, str]:
+        prefix = f"eidos:results:{entry.name}"
+        return f"{prefix}:{key_digest(key)}", f"{prefix}:index"
+
+    def get(self, entry: FunctionEntry, key: Hashable) -> dict[str, Any] | None:
+        db_key, index = self._keys(entry, key)
+        pipeline = self._client.pipeline(transaction=False)
+        pipeline.get(db_key)
+        pipeline.zadd(index, {db_key: time.time()}, xx=True)
+        try:
+            value, _ = pipeline.execute()
+        except self._error as e:
+            log.warning(
+                "Error: failed to read the result cache.",
+                function=entry.name,
+                error=str(e),
+            )
+            value = None
+        self._count(entry, value is not None)
+        return None if value is None else json.loads(value)
+
+    def set(self, entry: FunctionEntry, key: Hashable, result: dict[str, Any]) -> None:
+        config = entry.cache
+        ttl = config["ttl"]
+        try:
+            value = json.dumps(result, allow_nan=False)
+        except (TypeError, ValueError):
+            return
+        db_key, index = self._keys(entry, key)
+        pipeline = self._client.pipeline(transaction=False)
+        pipeline.set(db_key, value, px=None if ttl is None else max(1, int(ttl * 1000)))
+        pipeline.zadd(index, {db_key: time.time()})
+        pipeline.zcard(index)
+        try:
+            *_, size = pipeline.execute()
+            if size > config["max_entries"]:
+                evicted = self._client.zpopmin(index, size - config["max_entries"])
+                self._client.delete(*(member for member, _ in evicted))
+        except self._error as e:
+            log.warning(
+                "Error: failed to write the result cache.",
+                function=entry.name,
+                error=str(e),
+            )
+
+    def close(self) -> None:
+        """Closes the connections to the server."""
+        self._client.close()
+
+
+def create_backend() -> ResultCacheBackend:
+    """Creates the result cache backend selected in the settings.
+
+    Returns:
+        ResultCacheBackend: The backend.
+    """
+    match settings.result_cache_backend:
+        case "memory":
+            return MemoryBackend()
+        case "sqlite":
+            log.info("Using shared result cache", path=str(settings.result_cache_path))
+            return SQLiteBackend(settings.result_cache_path)
+        case "redis":
+            log.info("Using shared result cache", backend="redis")
+            return RedisBackend(settings.result_cache_url)
+        case backend:
+            raise ValueError(f"Unknown result cache backend: {backend}")
+
+
+class ResultCache:
+    """Memoized results of the functions whose definition opts in with a `cache` block.
+
+    Example of definition:
+    >> {"name": "lookup", ..., "cache": {"ttl": 300, "max_entries": 1000}}
+
+    Results are keyed by function name, definition digest and canonical arguments,
+    and stored in a pluggable backend.
+
+    Args:
+        backend (ResultCacheBackend | None): Where results are stored. Defaults to
+            the backend selected in the settings, created on first use.
+    """
+
+    def __init__(self, backend: ResultCacheBackend | None = None):
+        self._backend = backend
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self) -> ResultCacheBackend:
+        """The backend storing the results."""
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = create_backend()
+        return self._backend
+
+    def key(self, entry: FunctionEntry, arguments: dict[str, Any] | None) -> Hashable:
+        """Computes the key of a call, None if the function results are not cached.
+
+        Args:
+            entry (FunctionEntry): The function called.
+            arguments (dict[str, Any] | None): Validated arguments of the call.
+
+        Returns:
+            Hashable: The key of the call, or None.
+        """
+        if entry.cache is None:
+            return None
+        canonical = canonical_arguments(arguments)
+        if canonical is None:
+            return None
+        return entry.name, entry.digest, canonical
+
+    def get(self, entry: FunctionEntry, key: Hashable) -> dict[str, Any] | None:
+        """Gets the validated result of a call, None on a miss.
+
+        Args:
+            entry (FunctionEntry): The function called.
+            key (Hashable): Key of the call, see `key`.
+
+        Returns:
+            dict[str, Any] | None: The cached result.
+        """
+        if key is None:
+            return None
+        return self.backend.get(entry, key)
+
+    async def get_async(
+        self, entry: FunctionEntry, key: Hashable
+    ) -> dict[str, Any] | None:
+        """Same as `get`, without blocking the event loop on the backend's I/O."""
+        if key is None:
+            return None
+        if self.backend.blocking:
+            return await asyncio.to_thread(self.backend.get, entry, key)
+        return self.backend.get(entry, key)
+
+    def set(self, entry: FunctionEntry, key: Hashable, result: dict[str, Any]) -> None:
+        """Stores the validated result of a call.
+
+        Args:
+            entry (FunctionEntry): The function called.
+            key (Hashable): Key of the call, see `key`.
+            result (dict[str, Any]): The validated result.
+        """
+        if key is not None:
+            self.backend.set(entry, key, result)
+
+    async def set_async(
+        self, entry: FunctionEntry, key: Hashable, result: dict[str, Any]
+    ) -> None:
+        """Same as `set`, without blocking the event loop on the backend's I/O."""
+        if key is None:
+            return
+        if self.backend.blocking:
+            await asyncio.to_thread(self.backend.set, entry, key, result)
+        else:
+            self.backend.set(entry, key, result)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Returns the usage counters of the cache of every function.
+
+        Returns:
+            dict[str, dict[str, int]]: The counters, keyed by function name.
+        """
+        return self.backend.stats()
+
+
+result_cache = ResultCache()
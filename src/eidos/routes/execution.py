@@ -1,14 +1,75 @@
+from collections.abc import AsyncIterator
 from typing import Any
 
 import structlog
-from eidos.execute import execute
+from eidos.encoding import (
+    NDARRAY_MEDIA_TYPE,
+    EncodedJSONResponse,
+    NdarrayResponse,
+    dumps,
+    encode_ndarray,
+)
+from eidos.execute import (
+    error_status,
+    execute_batch,
+    execute_envelope,
+    execute_stream,
+    get_function_schema,
+)
+from eidos.models.execution import FunctionCall
+from eidos.results import result_cache
 from eidos.secure import query_scheme
-from fastapi import APIRouter, Security
-from fastapi.responses import JSONResponse
+from eidos.tracing import tracer
+from fastapi import APIRouter, Request, Security
+from fastapi.responses import Response, StreamingResponse
 
 log = structlog.get_logger("eidos.execution")
 
-router = APIRouter()
+# Responses are returned already serialized, skipping the `response_model` validation.
+router = APIRouter(default_response_class=EncodedJSONResponse)
+
+
+@router.get(
+    "/cache",
+    name="Get result cache statistics",
+    tags=["execution"],
+    response_model=dict[str, dict[str, int]],
+)
+async def result_cache_endpoint(
+    _: str = Security(query_scheme),
+) -> dict[str, dict[str, int]]:
+    """Get the hit and miss counters of the result cache of each function."""
+    return result_cache.stats()
+
+
+# Declared before `/{function_name}` so that it is not taken as a function name.
+@router.post(
+    "/batch",
+    name="Execute several AI functions",
+    tags=["execution"],
+    response_model=list[dict[str, Any]],
+)
+async def execute_batch_endpoint(
+    calls: list[FunctionCall], _: str = Security(query_scheme)
+) -> EncodedJSONResponse:
+    """Executes several AI functions concurrently.
+
+    Every call gets its own status envelope, identified by the `id` of the call.
+    """
+    log.info("Running batch", functions=[call.function for call in calls])
+    response = await execute_batch([call.model_dump() for call in calls])
+    with tracer.start_span("serialization"):
+        try:
+            return EncodedJSONResponse(content=response, status_code=200)
+        except (TypeError, ValueError):
+            # Only the calls whose result cannot be serialized get an error.
+            return EncodedJSONResponse(
+                content=[
+                    _serializable(result, call.function)
+                    for result, call in zip(response, calls)
+                ],
+                status_code=200,
+            )
 
 
 @router.post(
@@ -18,31 +79,112 @@ router = APIRouter()
     response_model=dict[str, Any],
 )
 async def execute_endpoint(
-    function_name: str, arguments: dict | None = None, _: str = Security(query_scheme)
-) -> JSONResponse:
-    """Executes an AI function with the given arguments."""
+    function_name: str,
+    request: Request,
+    arguments: dict | None = None,
+    _: str = Security(query_scheme),
+) -> Response:
+    """Executes an AI function with the given arguments.
+
+    Clients accepting `application/x-ndarray` get the numeric list outputs of a
+    successful execution as raw binary buffers, see `eidos.encoding.encode_ndarray`.
+    """
     log.info("Running function", function=function_name, arguments=arguments)
+    response = await execute_envelope(function_name, arguments)
+    status = response["status"]["code"]
+    ndarray = NDARRAY_MEDIA_TYPE in request.headers.get("accept", "")
+    # Executions rejected because the workers are busy can be retried shortly.
+    headers = {"Retry-After": "1"} if status in (429, 503) else None
+    with tracer.start_span("serialization", {"function": function_name}):
+        try:
+            if status == 200 and ndarray:
+                schema = get_function_schema(function_name)
+                return NdarrayResponse(encode_ndarray(response, schema))
+            return EncodedJSONResponse(
+                content=response, status_code=status, headers=headers
+            )
+        except (TypeError, ValueError) as e:
+            return EncodedJSONResponse(
+                content=_unserializable(e, function_name), status_code=500
+            )
+
+
+def _error_envelope(e: Exception) -> dict[str, Any]:
+    return {"status": {"code": error_status(e), "message": str(e)}, "data": None}
+
+
+def _unserializable(e: Exception, function_name: str) -> dict[str, Any]:
+    log.error(
+        "Error: function result cannot be serialized.",
+        function=function_name,
+        error=str(e),
+    )
+    message = f"Error: function result cannot be serialized.\n{e}"
+    return {"status": {"code": 500, "message": message}, "data": None}
+
+
+def _serializable(result: dict[str, Any], function_name: str) -> dict[str, Any]:
+    """Replaces the result of a batch call by an error if it cannot be serialized."""
     try:
-        data = execute(function_name, arguments)
-        response, status = (
-            {
-                "status": {
-                    "code": 200,
-                    "message": "Success",
-                },
-                "data": data,
-            },
-            200,
-        )
-    except Exception as e:
-        response, status = (
-            {
-                "status": {
-                    "code": 500,
-                    "message": str(e),
-                },
-                "data": None,
-            },
-            500,
+        dumps(result)
+    except (TypeError, ValueError) as e:
+        return {"id": result.get("id"), **_unserializable(e, function_name)}
+    return result
+
+
+@router.post(
+    "/{function_name}/stream",
+    name="Execute an AI function streaming its result",
+    tags=["execution"],
+    response_model=dict[str, Any],
+)
+async def execute_stream_endpoint(
+    function_name: str,
+    request: Request,
+    arguments: dict | None = None,
+    _: str = Security(query_scheme),
+) -> StreamingResponse:
+    """Executes an AI generator function, streaming each chunk of its result.
+
+    Chunks are sent as newline-delimited JSON, or as server-sent events if the
+    request accepts `text/event-stream`. Each chunk is a `{"data": ...}` object, and
+    an error while streaming is sent as a last chunk with the usual status envelope.
+    Errors before the first chunk are answered as in the non-streaming endpoint.
+    """
+    log.info("Streaming function", function=function_name, arguments=arguments)
+    chunks = execute_stream(function_name, arguments)
+
+    # Wait for the first chunk, so that early errors get a proper status code.
+    try:
+        first_chunk = await anext(chunks, None)
+    except Exception as e:  # noqa: BLE001
+        # Every error is answered with its status envelope.
+        response = _error_envelope(e)
+        return EncodedJSONResponse(
+            content=response, status_code=response["status"]["code"]
         )
-    return JSONResponse(content=response, status_code=status)
+
+    if "text/event-stream" in request.headers.get("accept", ""):
+        media_type = "text/event-stream"
+
+        def encode(message: dict[str, Any]) -> bytes:
+            return b"data: " + dumps(message) + b"\n\n"
+
+    else:
+        media_type = "application/x-ndjson"
+
+        def encode(message: dict[str, Any]) -> bytes:
+            return dumps(message) + b"\n"
+
+    async def body() -> AsyncIterator[bytes]:
+        if first_chunk is None:
+            return
+        yield encode({"data": first_chunk})
+        try:
+            async for chunk in chunks:
+                yield encode({"data": chunk})
+        except Exception as e:  # noqa: BLE001
+            # The status is already sent, so the error ends the stream instead.
+            yield encode(_error_envelope(e))
+
+    return StreamingResponse(body(), media_type=media_type)
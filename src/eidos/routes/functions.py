@@ -1,16 +1,25 @@
 import structlog
+from eidos.catalog import Catalog
+from eidos.encoding import EncodedJSONResponse
 from eidos.execute import (
     get_function_schema,
     get_openai_function_definition,
     list_functions_names,
     list_functions_openai,
 )
+from eidos.registry import registry
 from eidos.secure import query_scheme
-from fastapi import APIRouter, Security
+from fastapi import APIRouter, Request, Security
+from fastapi.responses import Response
 
 log = structlog.get_logger("eidos.functions")
 
-router = APIRouter()
+# Responses are returned already serialized, skipping the `response_model` validation.
+router = APIRouter(default_response_class=EncodedJSONResponse)
+
+# Serialized once per registry generation and served with an ETag.
+functions_catalog = Catalog(list_functions_openai, registry)
+names_catalog = Catalog(list_functions_names, registry)
 
 
 @router.get(
@@ -19,9 +28,11 @@ router = APIRouter()
     tags=["functions"],
     response_model=list[dict],
 )
-async def list_functions_endpoint(_: str = Security(query_scheme)) -> list[dict]:
+async def list_functions_endpoint(
+    request: Request, _: str = Security(query_scheme)
+) -> Response:
     """List all available functions."""
-    return list_functions_openai()
+    return functions_catalog.response(request)
 
 
 @router.get(
@@ -30,9 +41,11 @@ async def list_functions_endpoint(_: str = Security(query_scheme)) -> list[dict]
     tags=["functions"],
     response_model=list[str],
 )
-async def list_functions_names_endpoint(_: str = Security(query_scheme)) -> list[str]:
+async def list_functions_names_endpoint(
+    request: Request, _: str = Security(query_scheme)
+) -> Response:
     """List function names."""
-    return list_functions_names()
+    return names_catalog.response(request)
 
 
 @router.get(
@@ -41,9 +54,11 @@ async def list_functions_names_endpoint(_: str = Security(query_scheme)) -> list
     tags=["functions"],
     response_model=dict,
 )
-async def function_definition(function: str, _: str = Security(query_scheme)) -> dict:
+async def function_definition(
+    function: str, _: str = Security(query_scheme)
+) -> EncodedJSONResponse:
     """Get the definition of a function."""
-    return get_openai_function_definition(function)
+    return EncodedJSONResponse(content=get_openai_function_definition(function))
 
 
 @router.get(
@@ -52,6 +67,8 @@ async def function_definition(function: str, _: str = Security(query_scheme)) ->
     tags=["functions"],
     response_model=dict,
 )
-async def function_schema(function: str, _: str = Security(query_scheme)) -> dict:
+async def function_schema(
+    function: str, _: str = Security(query_scheme)
+) -> EncodedJSONResponse:
     """Get the response schema of a function."""
-    return get_function_schema(function)
+    return EncodedJSONResponse(content=get_function_schema(function))
@@ -1,5 +1,6 @@
 from enum import Enum
 from pathlib import Path
+from typing import Literal
 
 import structlog
 from pydantic import field_validator
@@ -8,6 +9,10 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 log = structlog.get_logger("eidos.settings")
 
 
+# Names of the log levels, from the most to the least verbose.
+LOG_LEVELS = ("debug", "info", "warning", "error", "critical")
+
+
 class Environment(str, Enum):
     development = "development"
     production = "production"
@@ -26,6 +31,111 @@ class Settings(BaseSettings):
     # The path to the folder containing the AI functions.
     functions_folder: Path = Path("functions")
 
+    # Bundle of the functions built with `eidos bundle`. When set, the definitions are
+    # loaded from it at startup instead of parsing the functions folder.
+    functions_bundle: Path | None = None
+
+    # Minimum number of seconds between two scans of the functions folder looking for
+    # changed definitions. Set to a negative value to disable hot reloading.
+    functions_reload_interval: float = 2.0
+
+    # Maximum number of parsed definition files kept in memory. Should be at least the
+    # number of functions, or listing them reads every file again.
+    definition_cache_size: int = 1024
+
+    # Maximum number of generated function models (and their JSON schema) kept in memory.
+    model_cache_size: int = 1024
+
+    # Number of worker threads running functions, and number of executions allowed to
+    # wait for a free worker. Executions beyond that are rejected with a 503 error.
+    executor_max_workers: int = 16
+    executor_queue_size: int = 64
+
+    # Process pool running the functions defined with `"executor": "process"`. The
+    # number of workers defaults to the number of CPUs. Workers are replaced after
+    # running `max_tasks_per_child` functions (on Python 3.10, the whole pool is
+    # replaced after `max_tasks_per_child` functions per worker). Calls taking longer
+    # than `timeout` seconds are abandoned: the caller gets a timeout error, but the
+    # worker is not killed and stays busy until the function returns.
+    process_executor_max_workers: int | None = None
+    process_executor_queue_size: int = 64
+    process_executor_max_tasks_per_child: int | None = None
+    process_executor_timeout: float | None = None
+
+    # Default number of seconds a function may run, overridden by `timeout_s` in its
+    # definition. Coroutine functions are cancelled when they time out, while calls
+    # running in threads or processes are abandoned.
+    execution_timeout: float | None = None
+
+    # Maximum number of calls of a batch execution running at the same time.
+    batch_max_concurrency: int = 8
+
+    # Where the results of functions defined with a `cache` block are stored: in the
+    # memory of each process, in a SQLite database at `result_cache_path` shared by
+    # the worker processes of one host, or in a Redis (or Valkey) server at
+    # `result_cache_url` shared by every replica (`pip install eidos[redis]`). The
+    # SQLite database must be on a local disk: SQLite in WAL mode does not work over
+    # network filesystems, so replicas on different nodes cannot share it.
+    result_cache_backend: Literal["memory", "sqlite", "redis"] = "memory"
+    result_cache_path: Path = Path("eidos-results.sqlite3")
+    result_cache_url: str = "redis://localhost:6379/0"
+
+    # Whether identical calls (same function and arguments) running at the same time
+    # share a single execution. Off by default, as functions may have side effects:
+    # functions opt in with `"deduplicate": true` in their definition, or out with
+    # `false` when enabled here. Calls of functions with a `cache` block always share.
+    deduplicate_executions: bool = False
+
+    # Library serializing JSON responses: `orjson` is much faster on large results,
+    # `auto` uses it when installed and falls back to the standard `json` module.
+    # orjson sends NaN and infinite floats as null, while `json` answers them with an
+    # error, and values orjson rejects (e.g. integers wider than 64 bits) are
+    # serialized by `json` instead.
+    json_encoder: Literal["auto", "orjson", "json"] = "auto"
+
+    # Whether one-dimensional NumPy arrays are valid `list[int]`, `list[float]` and
+    # `list[bool]` values, checked by dtype instead of element by element. Arrays in
+    # responses are only serialized by the `orjson` encoder.
+    accept_array_values: bool = False
+
+    # Whether the Lambda handler imports the module of every function while the
+    # container initializes (and is snapshotted, with SnapStart) instead of on their
+    # first call. Disable it to keep rarely used, heavy function modules out of init.
+    lambda_preload_functions: bool = True
+
+    # Whether the duration of every stage of the executions is recorded and exposed,
+    # with other counters, at `/metrics` in the Prometheus text format.
+    metrics_enabled: bool = True
+
+    # Where the spans of every request and execution stage are exported: nowhere
+    # (tracing disabled), to memory (for tests) or to `tracing_path`, one OpenTelemetry
+    # JSON span per line. Incoming W3C `traceparent` headers are honored.
+    tracing_exporter: Literal["none", "memory", "file"] = "none"
+    tracing_path: Path = Path("eidos-traces.jsonl")
+
+    # Minimum level of the logs, overridden for the events of some functions, e.g.
+    # `EIDOS_LOG_FUNCTION_LEVELS='{"salute": "debug"}'`.
+    log_level: str = "info"
+    log_function_levels: dict[str, str] = {}
+
+    # Fraction of the info and debug events of function calls that are logged, to
+    # keep the logs of busy deployments affordable. Warnings and errors are all kept.
+    log_sample_rate: float = 1.0
+
+    # Logged strings (e.g., arguments) are cut to `log_max_value_length` characters,
+    # collections to their first `log_max_items` items and lines to
+    # `log_max_line_length` characters.
+    log_max_value_length: int = 256
+    log_max_items: int = 10
+    log_max_line_length: int = 4096
+
+    # Events waiting to be written by a background thread, so that requests never
+    # block on the output. Events beyond are dropped; 0 writes synchronously.
+    log_queue_size: int = 10000
+
+    # Format of the log lines: human readable, or one JSON object per line.
+    log_format: Literal["console", "json"] = "console"
+
     model_config = SettingsConfigDict(
         env_prefix="eidos_",
         # `.env.prod` takes priority over `.env`
@@ -42,6 +152,21 @@ class Settings(BaseSettings):
             raise ValueError('must not end with "/"')
         return v
 
+    @field_validator("log_level")
+    @classmethod
+    def log_level_must_be_known(cls, v: str) -> str:
+        if v.lower() not in LOG_LEVELS:
+            raise ValueError(f"must be one of {', '.join(LOG_LEVELS)}")
+        return v.lower()
+
+    @field_validator("log_function_levels")
+    @classmethod
+    def log_function_levels_must_be_known(cls, v: dict[str, str]) -> dict[str, str]:
+        return {
+            function: cls.log_level_must_be_known(level)
+            for function, level in v.items()
+        }
+
     def is_production(self) -> bool:
         return self.env == Environment.production
 
@@ -0,0 +1,357 @@
+import atexit
+import json
+import queue
+import random
+import re
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+from eidos.settings import settings
+
+log = structlog.get_logger("eidos.tracing")
+
+# W3C trace context header: version, trace id, parent span id and flags.
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+def parse_traceparent(traceparent: str | None) -> tuple[str, str] | None:
+    """Parses a W3C `traceparent` header.
+
+    Args:
+        traceparent (str | None): Value of the header.
+
+    Returns:
+        tuple[str, str] | None: The trace id and parent span id, None if the header is
+        missing or invalid.
+    """
+    if not traceparent:
+        return None
+    match = TRACEPARENT.match(traceparent.strip().lower())
+    if match is None:
+        return None
+    trace_id, span_id, _ = match.groups()
+    if trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id, span_id
+
+
+class Span:
+    """A timed operation of a trace, in the OpenTelemetry data model.
+
+    Args:
+        name (str): Name of the operation.
+        trace_id (str): Hexadecimal id of the trace.
+        parent_id (str | None): Hexadecimal id of the parent span, None for a root.
+        attributes (dict[str, Any] | None): Attributes of the operation.
+    """
+
+    __slots__ = (
+        "attributes",
+        "end_time",
+        "name",
+        "parent_id",
+        "span_id",
+        "start_time",
+        "status",
+        "trace_id",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: str | None = None,
+        attributes: dict[str, Any] | None = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.start_time = time.time_ns()
+        self.end_time: int | None = None
+        self.status: dict[str, str] = {"code": "UNSET"}
+
+    @property
+    def traceparent(self) -> str:
+        """The W3C `traceparent` header propagating this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, error: BaseException) -> None:
+        self.status = {"code": "ERROR", "message": str(error)}
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serializes the span with the field names of OTLP/JSON."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": self.start_time,
+            "endTimeUnixNano": self.end_time,
+            "attributes": self.attributes,
+            "status": self.status,
+        }
+
+
+class _NoopSpan:
+    """Span returned while tracing is disabled, ignoring everything."""
+
+    traceparent = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_error(self, error: BaseException) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class SpanExporter:
+    """Receives the spans once they end."""
+
+    def export(self, span: Span) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """Waits until every span received so far is exported."""
+
+    def close(self) -> None:
+        """Exports the pending spans and releases the resources of the exporter."""
+
+
+class InMemoryExporter(SpanExporter):
+    """Keeps the finished spans in a list, for tests."""
+
+    def __init__(self):
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+
+class FileExporter(SpanExporter):
+    """Appends the finished spans to a file, one JSON object per line.
+
+    Spans are serialized and written by a background thread, so the event loop only
+    puts them in a bounded queue. Spans are dropped, and counted, while the queue is
+    full.
+
+    Args:
+        path (Path): Path of the file, created if it does not exist.
+        queue_size (int): Maximum number of spans waiting to be written.
+    """
+
+    def __init__(self, path: str | Path, queue_size: int = 10000):
+        self.path = Path(path)
+        # Created here, so that an unwritable path fails at startup.
+        self.path.touch()
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._queue: queue.Queue[Span | None] = queue.Queue(queue_size)
+        self._thread = threading.Thread(
+            target=self._run, name="eidos-traces", daemon=True
+        )
+        self._thread.start()
+
+    def export(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def _run(self) -> None:
+        with self.path.open("a", encoding="utf-8") as file:
+            while True:
+                span = self._queue.get()
+                try:
+                    if span is None:
+                        return
+                    file.write(json.dumps(span.to_dict(), default=str) + "\n")
+                    # Flushed once the queue is drained, not after every span.
+                    if self._queue.empty():
+                        file.flush()
+                        self._log_dropped()
+                finally:
+                    self._queue.task_done()
+
+    def _log_dropped(self) -> None:
+        with self._lock:
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            log.warning("Spans dropped, the queue was full.", count=dropped)
+
+    def flush(self) -> None:
+        self._queue.join()
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+
+
+# Span the current code runs in, propagated to tasks and to threads that copy the
+# context.
+_current_span: ContextVar[Span | None] = ContextVar("eidos_span", default=None)
+
+
+class Tracer:
+    """Creates the spans of the executions and hands them to an exporter.
+
+    Without an exporter tracing is disabled and spans cost a single check.
+
+    Example:
+    >> with tracer.start_span("lookup", {"function": "salute"}):
+    >>     registry.get("salute")
+
+    Args:
+        exporter (SpanExporter | None): Where finished spans are sent.
+    """
+
+    def __init__(self, exporter: SpanExporter | None = None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    @contextmanager
+    def start_span(
+        self,
+        name: str,
+        attributes: dict[str, Any] | None = None,
+        traceparent: str | None = None,
+    ) -> Iterator[Span | _NoopSpan]:
+        """Runs a block in a new span, child of the current one.
+
+        Args:
+            name (str): Name of the operation.
+            attributes (dict[str, Any] | None): Attributes of the operation.
+            traceparent (str | None): W3C `traceparent` of a remote parent, used
+                instead of the current span when valid.
+
+        Yields:
+            Span: The span, ended and exported when the block exits.
+        """
+        if self.exporter is None:
+            yield NOOP_SPAN
+            return
+
+        remote = parse_traceparent(traceparent)
+        parent = _current_span.get()
+        if remote is not None:
+            trace_id, parent_id = remote
+        elif parent is not None:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        else:
+            trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+
+        span = Span(name, trace_id, parent_id, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_time = time.time_ns()
+            try:
+                self.exporter.export(span)
+            except Exception as e:  # noqa: BLE001
+                # A failing exporter must not fail the traced operation.
+                log.error("Error: failed to export span.", error=str(e))
+
+
+class TracingMiddleware:
+    """ASGI middleware running every HTTP request in a span.
+
+    The span is a child of the W3C `traceparent` header of the request, if any. Does
+    nothing but a check while tracing is disabled.
+
+    Args:
+        app (ASGIApp): The wrapped application.
+        tracer (Tracer | None): The tracer, the shared one by default.
+    """
+
+    def __init__(self, app, tracer: "Tracer | None" = None):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send) -> None:
+        tracer_ = self.tracer or tracer
+        if scope["type"] != "http" or not tracer_.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for key, value in scope.get("headers", []):
+            if key == b"traceparent":
+                traceparent = value.decode("latin-1")
+        method, path = scope["method"], scope["path"]
+        with tracer_.start_span(
+            f"{method} {path}",
+            {"http.method": method, "http.target": path},
+            traceparent=traceparent,
+        ) as span:
+
+            async def send_with_status(message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
+
+
+def current_span() -> Span | None:
+    """Gets the span the current code runs in, None if there is none."""
+    return _current_span.get()
+
+
+def create_exporter() -> SpanExporter | None:
+    """Creates the span exporter selected in the settings.
+
+    Returns:
+        SpanExporter | None: The exporter, None if tracing is disabled.
+    """
+    match settings.tracing_exporter:
+        case "none":
+            return None
+        case "memory":
+            return InMemoryExporter()
+        case "file":
+            log.info("Exporting traces", path=str(settings.tracing_path))
+            exporter = FileExporter(settings.tracing_path)
+            atexit.register(exporter.close)
+            return exporter
+        case exporter:
+            raise ValueError(f"Unknown tracing exporter: {exporter}")
+
+
+tracer = Tracer(create_exporter())
+
+
+def flush_traces() -> None:
+    """Waits until every span ended so far is exported, e.g. at shutdown or before
+    the process is frozen between Lambda invocations."""
+    if tracer.exporter is not None:
+        tracer.exporter.flush()
@@ -1,16 +1,28 @@
+import hashlib
 import importlib
 import json
-from functools import lru_cache
+import os
 from pathlib import Path
+from typing import Any
 
 import structlog
 
+from eidos.cache import LRUCache
+from eidos.settings import settings
+
 log = structlog.get_logger("eidos.utils")
 
+# Parsed JSON files, keyed by path and stored with the (inode, mtime, size) they had.
+json_cache = LRUCache(maxsize=settings.definition_cache_size)
+
 
-@lru_cache(maxsize=128)
 def json_load(file_path: str | Path) -> dict:
-    """Loads a JSON file.
+    """Loads a JSON file, parsing it again only when it changes.
+
+    Files are cached by absolute path and reloaded whenever their inode, modification
+    time or size differ from when they were parsed, so edits (including atomic
+    replacements) are picked up without a restart. The returned dictionary is shared
+    and must not be modified.
 
     Args:
         file_path (str): The file path.
@@ -18,8 +30,49 @@ def json_load(file_path: str | Path) -> dict:
     Returns:
         dict: The JSON file as a dictionary.
     """
-    with open(file_path, "r") as json_file:
-        return json.load(json_file)
+    path = os.path.abspath(file_path)
+    stat = os.stat(path)
+    signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    cached = json_cache.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with open(path, "r") as json_file:
+        content = json.load(json_file)
+    json_cache.set(path, (signature, content))
+    return content
+
+
+def invalidate_json(file_path: str | Path | None = None) -> None:
+    """Removes a file, or every file if None, from the cache of `json_load`.
+
+    Args:
+        file_path (str | Path | None): The file path.
+    """
+    if file_path is None:
+        json_cache.clear()
+    else:
+        json_cache.pop(os.path.abspath(file_path))
+
+
+def json_cache_stats() -> dict[str, Any]:
+    """Returns the usage counters of the cache of `json_load`, see `LRUCache.stats`."""
+    return json_cache.stats()
+
+
+def definition_digest(definition: dict) -> str:
+    """Computes a content hash of a function definition.
+
+    The definition is serialized canonically, so formatting changes in the JSON file
+    do not change the digest.
+
+    Args:
+        definition (dict): The function definition.
+
+    Returns:
+        str: Hexadecimal SHA-256 digest.
+    """
+    canonical = json.dumps(definition, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
 
 
 def import_function(module: str) -> callable:
@@ -1,6 +1,198 @@
 from typing import Any
 
-from eidos.validation.type import is_value_of_type
+from eidos.settings import settings
+from eidos.validation.type import TypeChecker, parse_type_name
+
+
+class InputValidator:
+    """Validator of the input arguments of a function, compiled from its schema.
+
+    The parameter tables and type checkers are built once, so validating a call only
+    walks the arguments.
+
+    Args:
+        schema (list[dict[str, Any]]): Schema of the function arguments.
+    """
+
+    __slots__ = ("known_keys", "parameters")
+
+    def __init__(self, schema: list[dict[str, Any]]):
+        self.known_keys = frozenset(param["name"] for param in schema)
+        self.parameters = tuple(
+            (
+                param["name"],
+                param.get("required", True),
+                param["type"],
+                param.get("default", None),
+                TypeChecker(
+                    param["type"],
+                    accept_none=param.get("default", None) is None,
+                    accept_arrays=settings.accept_array_values,
+                ),
+            )
+            for param in schema
+        )
+
+    def __call__(self, input_arguments: dict[str, Any]) -> dict[str, Any]:
+        """Validates input arguments against the compiled schema.
+
+        Args:
+            input_arguments (dict): Arguments to validate.
+
+        Returns:
+            dict[str, Any]: Validated and transformed arguments.
+        """
+        # Check for unknown arguments.
+        if not self.known_keys.issuperset(input_arguments):
+            for arg_key in input_arguments:
+                if arg_key not in self.known_keys:
+                    raise ValueError(
+                        f"Unknown argument {arg_key}: not found in schema."
+                    )
+
+        validated_arguments = {}
+        for (
+            param_name,
+            is_required,
+            param_type,
+            param_default,
+            check,
+        ) in self.parameters:
+            if param_name not in input_arguments:
+                if is_required:
+                    raise ValueError(
+                        f"Argument {param_name} is required but was not provided."
+                    )
+                else:
+                    validated_arguments[param_name] = param_default
+            else:
+                arg_value = input_arguments[param_name]
+                if not check(arg_value):
+                    raise TypeError(
+                        f"Argument {param_name} is not of type {param_type}. Got {type(arg_value).__name__} instead."
+                    )
+                validated_arguments[param_name] = arg_value
+
+        return validated_arguments
+
+
+class OutputValidator:
+    """Validator of the output of a function, compiled from its response schema.
+
+    Args:
+        schema (dict[str, Any]): A schema defining the expected structure and types of the function output.
+            Each key in the schema represents an output variable name, and the associated
+            value specifies the expected type of that output variable.
+    """
+
+    __slots__ = ("variables",)
+
+    def __init__(self, schema: dict[str, Any]):
+        if len(schema) == 1:
+            ((variable_name, expected_type),) = schema.items()
+            self.variables = (
+                (
+                    variable_name,
+                    expected_type,
+                    TypeChecker(
+                        expected_type, accept_arrays=settings.accept_array_values
+                    ),
+                ),
+            )
+        else:
+            self.variables = tuple(
+                (
+                    out_variable,
+                    type_,
+                    TypeChecker(
+                        type_,
+                        accept_none=True,
+                        accept_arrays=settings.accept_array_values,
+                    ),
+                )
+                for out_variable, type_ in schema.items()
+            )
+
+    def __call__(self, output: Any) -> dict[str, Any]:
+        """Validates and formats the output of a function.
+
+        Args:
+            output (Any): The output of the function to validate and format.
+
+        Returns:
+            dict[str, Any]: Validated and transformed result.
+        """
+        formatted_output = {}
+        if len(self.variables) == 1:
+            ((variable_name, expected_type, check),) = self.variables
+            if check(output):
+                formatted_output[variable_name] = output
+            else:
+                raise TypeError(
+                    f"Output variable {variable_name} is not of the expected type {expected_type}."
+                )
+        else:
+            len_result = 1 if isinstance(output, str) else len(output)
+
+            if len_result != len(self.variables):
+                raise ValueError(
+                    f"Number of output variables ({len_result}) does not match "
+                    f"number of variables in the schema ({len(self.variables)})"
+                )
+            for (out_variable, type_, check), result_value in zip(
+                self.variables, output
+            ):
+                if check(result_value):
+                    formatted_output[out_variable] = result_value
+                else:
+                    raise TypeError(
+                        f"Output variable {out_variable} is not of type {type_}."
+                    )
+
+        return formatted_output
+
+
+class ChunkValidator:
+    """Validator of the chunks of a function that streams its output.
+
+    The response schema must declare a single output variable. Chunks of a
+    `list[T]` variable must be of type `T`, chunks of an untyped `list` may be
+    anything, and chunks of any other type must be of that same type, e.g., pieces
+    of text for a `str` variable.
+
+    Args:
+        schema (dict[str, Any]): Response schema of the function.
+    """
+
+    __slots__ = ("check", "element_type", "variable_name")
+
+    def __init__(self, schema: dict[str, Any]):
+        if len(schema) != 1:
+            raise ValueError(
+                "Streaming functions must declare a single output variable."
+            )
+        ((self.variable_name, type_),) = schema.items()
+        main_type, contained_type = parse_type_name(type_)
+        if main_type == "list":
+            self.element_type = contained_type
+        else:
+            self.element_type = type_
+        self.check = TypeChecker(self.element_type) if self.element_type else None
+
+    def __call__(self, chunk: Any) -> dict[str, Any]:
+        """Validates and formats a chunk of the output of a function.
+
+        Args:
+            chunk (Any): The chunk to validate and format.
+
+        Returns:
+            dict[str, Any]: Validated and transformed chunk.
+        """
+        if self.check is not None and not self.check(chunk):
+            raise TypeError(
+                f"Output chunk of {self.variable_name} is not of the expected type {self.element_type}."
+            )
+        return {self.variable_name: chunk}
 
 
 def validate_input_schema(
@@ -8,6 +200,9 @@ def validate_input_schema(
 ) -> dict[str, Any]:
     """Validates input arguments against a predefined schema.
 
+    Prefer compiling an `InputValidator` once when validating many calls against
+    the same schema.
+
     Args:
         input_arguments (dict): Arguments to validate.
         schema (dict): Schema of the function arguments.
@@ -15,43 +210,15 @@ def validate_input_schema(
     Returns:
         dict[str, Any]: Validated and transformed arguments.
     """
-    schema_keys = {param["name"] for param in schema}
-
-    # Check for unknown arguments.
-    for arg_key in input_arguments.keys():
-        if arg_key not in schema_keys:
-            raise ValueError(f"Unknown argument {arg_key}: not found in schema.")
-
-    validated_arguments = {}
-    for param in schema:
-        param_name = param["name"]
-        is_required = param.get("required", True)
-        param_type = param["type"]
-        param_default = param.get("default", None)
-
-        if param_name not in input_arguments:
-            if is_required:
-                raise ValueError(
-                    f"Argument {param_name} is required but was not provided."
-                )
-            else:
-                validated_arguments[param_name] = param_default
-        else:
-            arg_value = input_arguments[param_name]
-            if not is_value_of_type(
-                arg_value, param_type, accept_none=param_default is None
-            ):
-                raise TypeError(
-                    f"Argument {param_name} is not of type {param_type}. Got {type(arg_value).__name__} instead."
-                )
-            validated_arguments[param_name] = arg_value
-
-    return validated_arguments
+    return InputValidator(schema)(input_arguments)
 
 
 def validate_output_schema(output: Any, schema: dict[str, Any]) -> dict[str, Any]:
     """Validates and formats the output of a function based on a predefined schema.
 
+    Prefer compiling an `OutputValidator` once when validating many results against
+    the same schema.
+
     Args:
         output (Any): The output of the function to validate and format.
         schema (dict[str, Any]): A schema defining the expected structure and types of the function output.
@@ -61,29 +228,4 @@ def validate_output_schema(output: Any, schema: dict[str, Any]) -> dict[str, Any
     Returns:
         dict[str, Any]: Validated and transformed result.
     """
-    formatted_output = {}
-    if len(schema) == 1:
-        variable_name, expected_type = schema.popitem()
-        if is_value_of_type(output, expected_type):
-            formatted_output[variable_name] = output
-        else:
-            raise TypeError(
-                f"Output variable {variable_name} is not of the expected type {expected_type}."
-            )
-    else:
-        len_result = 1 if isinstance(output, str) else len(output)
-
-        if len_result != len(schema):
-            raise ValueError(
-                f"Number of output variables ({len_result}) does not match "
-                f"number of variables in the schema ({len(schema)})"
-            )
-        for (out_variable, type_), result_value in zip(schema.items(), output):
-            if is_value_of_type(result_value, type_, accept_none=True):
-                formatted_output[out_variable] = result_value
-            else:
-                raise TypeError(
-                    f"Output variable {out_variable} is not of type {type_}."
-                )
-
-    return formatted_output
+    return OutputValidator(schema)(output)
@@ -1,10 +1,28 @@
+import array
 import builtins
+import sys
+from functools import lru_cache
+from itertools import islice
 from typing import Any
 
 ALLOWED_TYPES = ["str", "int", "float", "bool", "list", "dict"]
 
 ALLOWED_GENERIC_TYPES = ["str", "int", "float", "bool"]
 
+# Number of elements whose types are collected at once when checking a list, so that
+# checking a wrong list stops early without giving up the speed of `map`.
+LIST_CHECK_CHUNK_SIZE = 4096
+
+# Element type of `array.array` values by type code, as seen when iterating them.
+ARRAY_ELEMENT_TYPES = {
+    **dict.fromkeys("bBhHiIlLqQ", int),
+    **dict.fromkeys("fd", float),
+    "u": str,
+}
+
+# NumPy dtype kinds accepted for each element type when arrays are accepted.
+NUMPY_KINDS = {int: "iub", float: "f", bool: "b"}
+
 
 def parse_type_name(type_str: str) -> tuple[str, str | None]:
     """Extracts the base type and the generic (contained) type from a type string.
@@ -51,24 +69,127 @@ def is_value_of_type(value: Any, type_str: str, accept_none: bool = False) -> bo
     if accept_none and value is None:
         return True
 
-    main_type, contained_type = parse_type_name(type_str)
+    return _cached_type_checker(type_str, accept_none)(value)
+
+
+def _elements_of_type(
+    value: Any, element_class: type, accept_none: bool = False
+) -> bool:
+    """Checks that every element of an iterable is an instance of a class.
+
+    Lists and tuples are checked by collecting the distinct types of their elements
+    in chunks, which runs at C speed for the large homogeneous lists exchanged by
+    functions; other iterables are checked element by element.
+    """
+    if type(value) is array.array:
+        array_class = ARRAY_ELEMENT_TYPES.get(value.typecode)
+        if array_class is not None:
+            return not value or issubclass(array_class, element_class)
 
-    if main_type == "list" and contained_type is not None:
-        contained_type_class = getattr(builtins, contained_type)
-        # Validate each element in the list if it matches the contained type.
+    if not isinstance(value, (list, tuple)):
         if accept_none:
-            all_elements_match_type = all(
-                (isinstance(element, contained_type_class) or element is None)
+            return all(
+                (isinstance(element, element_class) or element is None)
                 for element in value
             )
+        return all(isinstance(element, element_class) for element in value)
+
+    # Types already known to match, so each chunk only looks at the new ones.
+    matching = {type(None)} if accept_none else set()
+    elements = iter(value)
+    while True:
+        types = set(map(type, islice(elements, LIST_CHECK_CHUNK_SIZE)))
+        if not types:
+            return True
+        for type_ in types - matching:
+            if not issubclass(type_, element_class):
+                return False
+            matching.add(type_)
+
+
+def _is_numeric_array(value: Any, element_class: type) -> bool:
+    """Checks if a value is a one-dimensional NumPy array of elements of a class."""
+    # NumPy is optional: arrays cannot exist if it was never imported.
+    numpy = sys.modules.get("numpy")
+    if numpy is None or not isinstance(value, numpy.ndarray):
+        return False
+    return value.ndim == 1 and value.dtype.kind in NUMPY_KINDS.get(element_class, "")
+
+
+class TypeChecker:
+    """Precompiled equivalent of `is_value_of_type` for a fixed type string.
+
+    The type string is parsed and its classes are resolved once, so checking a value
+    only costs the `isinstance` calls.
+
+    Example:
+    >> is_int_list = TypeChecker("list[int]")
+    >> is_int_list([1, 2, 3])
+    True
+
+    Args:
+        type_str (str): Type to validate values against.
+        accept_none (bool): Whether to allow None as a valid value.
+        accept_arrays (bool): Whether one-dimensional NumPy arrays of a matching
+            dtype are valid `list[int]`, `list[float]` and `list[bool]` values,
+            without converting them to lists.
+    """
+
+    __slots__ = (
+        "accept_arrays",
+        "accept_none",
+        "element_class",
+        "type_class",
+        "type_str",
+    )
+
+    def __init__(
+        self, type_str: str, accept_none: bool = False, accept_arrays: bool = False
+    ):
+        self.type_str = type_str
+        self.accept_none = accept_none
+        self.accept_arrays = accept_arrays
+        self.type_class = None
+        self.element_class = None
+
+        main_type, contained_type = parse_type_name(type_str)
+        # Unknown types are only reported when a value is checked, as
+        # `is_value_of_type` does.
+        if main_type == "list" and contained_type is not None:
+            self.element_class = getattr(builtins, contained_type, None)
         else:
-            all_elements_match_type = all(
-                isinstance(element, contained_type_class) for element in value
+            self.type_class = getattr(builtins, type_str, None)
+
+    def __call__(self, value: Any) -> bool:
+        if self.accept_none and value is None:
+            return True
+
+        element_class = self.element_class
+        if element_class is not None:
+            if self.accept_arrays and _is_numeric_array(value, element_class):
+                return True
+            return _elements_of_type(value, element_class, self.accept_none)
+
+        if self.type_class is None:
+            raise AttributeError(
+                f"module 'builtins' has no attribute '{self._unknown_type()}'"
             )
-        return all_elements_match_type
-    else:
-        type_class = getattr(builtins, type_str)
-        return isinstance(value, type_class)
+        return isinstance(value, self.type_class)
+
+    def _unknown_type(self) -> str:
+        main_type, contained_type = parse_type_name(self.type_str)
+        return contained_type if main_type == "list" else self.type_str
+
+    def __repr__(self) -> str:
+        return (
+            f"TypeChecker({self.type_str!r}, accept_none={self.accept_none}, "
+            f"accept_arrays={self.accept_arrays})"
+        )
+
+
+@lru_cache(maxsize=256)
+def _cached_type_checker(type_str: str, accept_none: bool) -> TypeChecker:
+    return TypeChecker(type_str, accept_none)
 
 
 def get_variable_type_name(variable: Any) -> str:
@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+import eidos.execute
+from eidos.registry import FunctionRegistry
+
+
+class FunctionsFolder:
+    """Temporary functions folder backing the registry used by `eidos.execute`."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.registry = FunctionRegistry(folder, reload_interval=-1)
+
+    def add(self, name, module, parameters=None, response=None, **extra):
+        definition = {
+            "name": name,
+            "description": f"Test function {name}.",
+            "module": module,
+            "parameters": parameters if parameters is not None else [],
+            "response": response if response is not None else {"result": "str"},
+            **extra,
+        }
+        (self.folder / f"{name}.json").write_text(json.dumps(definition))
+        self.registry.scan()
+        return definition
+
+
+@pytest.fixture
+def functions(tmp_path, monkeypatch):
+    folder = FunctionsFolder(tmp_path)
+    monkeypatch.setattr(eidos.execute, "registry", folder.registry)
+    return folder
@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+from eidos.bundle import read_bundle, write_bundle
+from eidos.cli import main
+from eidos.registry import FunctionRegistry
+from eidos.settings import settings
+
+SALUTE = {
+    "name": "salute",
+    "description": "Say hello to someone.",
+    "module": "eidos.functions.core.salute",
+    "parameters": [
+        {"name": "who", "type": "str", "description": "Name of whom to salute."}
+    ],
+    "response": {"msg": "str"},
+}
+
+
+def test_bundle_round_trip(tmp_path):
+    (tmp_path / "salute.json").write_text(json.dumps(SALUTE))
+    bundle = tmp_path / "functions.bundle"
+
+    assert write_bundle(tmp_path, bundle) == 1
+
+    (entry,) = read_bundle(bundle)
+    assert entry.name == "salute"
+    assert entry.definition == SALUTE
+    assert entry.json_schema["properties"]["who"]["type"] == "string"
+    assert entry.input_validator({"who": "Nikos"}) == {"who": "Nikos"}
+
+
+def test_bundle_validators_rebuilt_with_other_settings(tmp_path, monkeypatch):
+    (tmp_path / "salute.json").write_text(json.dumps(SALUTE))
+    bundle = tmp_path / "functions.bundle"
+    monkeypatch.setattr(settings, "accept_array_values", False)
+    write_bundle(tmp_path, bundle)
+
+    (entry,) = read_bundle(bundle)
+    assert entry._input_validator is not None
+
+    monkeypatch.setattr(settings, "accept_array_values", True)
+    (entry,) = read_bundle(bundle)
+    assert entry._input_validator is None
+    assert entry._output_validator is None
+    assert entry.input_validator({"who": "Nikos"}) == {"who": "Nikos"}
+
+
+def test_registry_from_bundle(tmp_path):
+    (tmp_path / "salute.json").write_text(json.dumps(SALUTE))
+    bundle = tmp_path / "functions.bundle"
+    write_bundle(tmp_path, bundle)
+    # Changes in the folder are ignored once bundled.
+    (tmp_path / "salute.json").unlink()
+
+    registry = FunctionRegistry(tmp_path, reload_interval=0, bundle=bundle)
+
+    assert [entry.name for entry in registry.entries()] == ["salute"]
+    assert registry.get("salute").function("Nikos") == "Hello, Nikos! o7"
+    assert registry.generation == 1
+
+
+def test_bundle_invalid_definition(tmp_path):
+    definition = {**SALUTE, "parameters": [{**SALUTE["parameters"][0], "type": "set"}]}
+    (tmp_path / "salute.json").write_text(json.dumps(definition))
+
+    with pytest.raises(ValueError, match="Invalid definition of function 'salute'"):
+        write_bundle(tmp_path, tmp_path / "functions.bundle")
+
+
+def test_read_invalid_bundle(tmp_path):
+    bundle = tmp_path / "functions.bundle"
+    bundle.write_bytes(b"not a bundle")
+
+    with pytest.raises(ValueError, match="Invalid functions bundle"):
+        read_bundle(bundle)
+
+
+def test_cli_bundle(tmp_path, capsys):
+    (tmp_path / "salute.json").write_text(json.dumps(SALUTE))
+    bundle = tmp_path / "functions.bundle"
+
+    assert main(["bundle", str(tmp_path), "-o", str(bundle)]) == 0
+    assert bundle.is_file()
+    assert "Bundled 1 functions" in capsys.readouterr().out
+
+
+def test_cli_bundle_malformed_definition(tmp_path, capsys):
+    functions = tmp_path / "functions"
+    functions.mkdir()
+    (functions / "salute.json").write_text(json.dumps(SALUTE))
+    (functions / "broken.json").write_text("{not json")
+    bundle = tmp_path / "functions.bundle"
+
+    assert main(["bundle", str(functions), "-o", str(bundle)]) == 1
+    assert not bundle.exists()
+    assert "broken.json" in capsys.readouterr().err
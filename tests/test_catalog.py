@@ -0,0 +1,33 @@
+import json
+
+from eidos.catalog import Catalog, PrecomputedResponse
+from eidos.registry import FunctionRegistry
+
+
+def test_precomputed_response_select_encoding():
+    precomputed = PrecomputedResponse(["salute"])
+
+    assert precomputed.bodies["identity"] == b'["salute"]'
+    assert precomputed.select_encoding("") == "identity"
+    assert precomputed.select_encoding("gzip, deflate") == "gzip"
+    assert precomputed.select_encoding("gzip;q=0, deflate") == "identity"
+    assert precomputed.etags["identity"] != precomputed.etags["gzip"]
+
+
+def test_catalog_rebuilds_on_registry_change(tmp_path):
+    registry = FunctionRegistry(tmp_path, reload_interval=0)
+    calls = []
+
+    def build():
+        calls.append(1)
+        return [entry.name for entry in registry.entries()]
+
+    catalog = Catalog(build, registry)
+    first = catalog.get()
+    assert catalog.get() is first
+    assert len(calls) == 1
+
+    (tmp_path / "salute.json").write_text(json.dumps({"name": "salute"}))
+
+    assert catalog.get().bodies["identity"] == b'["salute"]'
+    assert len(calls) == 2
@@ -0,0 +1,124 @@
+import array
+import sys
+
+import pytest
+
+from eidos.encoding import (
+    NDARRAY_ALIGNMENT,
+    EncodedJSONResponse,
+    decode_ndarray,
+    encode_ndarray,
+    get_encoder,
+)
+
+CONTENT = {"values": [0.5, 1, None], "label": "año", 1: True}
+
+
+@pytest.mark.parametrize("name", ["json", "orjson", "auto"])
+def test_encoders_agree(name):
+    if name != "json":
+        pytest.importorskip("orjson")
+    dumps = get_encoder(name)
+
+    assert dumps(CONTENT) == '{"values":[0.5,1,null],"label":"año","1":true}'.encode()
+
+
+def test_orjson_encoder_nan_and_large_int():
+    pytest.importorskip("orjson")
+    dumps = get_encoder("orjson")
+
+    # NaN is sent as null, and integers orjson rejects fall back to `json`.
+    assert dumps({"value": float("nan")}) == b'{"value":null}'
+    assert dumps({"value": 2**70}) == b'{"value":1180591620717411303424}'
+    with pytest.raises(ValueError):
+        get_encoder("json")({"value": float("nan")})
+
+
+def test_unknown_encoder():
+    with pytest.raises(ValueError, match="Unknown JSON encoder"):
+        get_encoder("pickle")
+
+
+def test_encoded_json_response():
+    response = EncodedJSONResponse(content={"msg": "Hello"}, status_code=201)
+
+    assert response.body == b'{"msg":"Hello"}'
+    assert response.status_code == 201
+    assert response.media_type == "application/json"
+
+
+SUCCESS = {"code": 200, "message": "Success"}
+
+
+def test_encode_ndarray_round_trip():
+    response = {
+        "embedding": "list[float]",
+        "counts": "list[int]",
+        "flags": "list[bool]",
+        "maybe": "list[float]",
+        "label": "str",
+    }
+    envelope = {
+        "status": SUCCESS,
+        "data": {
+            "embedding": [0.5, 1.5, -2.0],
+            "counts": array.array("i", [1, 2]),
+            "flags": [True, False, True],
+            "maybe": [1.0, None],
+            "label": "signal",
+        },
+    }
+
+    chunks = encode_ndarray(envelope, response)
+    body = b"".join(chunks)
+    decoded = decode_ndarray(body)
+
+    assert decoded["status"] == SUCCESS
+    data = decoded["data"]
+    assert data["embedding"].tolist() == [0.5, 1.5, -2.0]
+    assert data["counts"].tolist() == [1, 2]
+    assert data["flags"].tolist() == [True, False, True]
+    # Lists that cannot be packed stay in the JSON header.
+    assert data["maybe"] == [1.0, None]
+    assert data["label"] == "signal"
+
+    header_size = int.from_bytes(body[:4], "little")
+    assert (4 + header_size) % NDARRAY_ALIGNMENT == 0
+    # Buffers are views of the values, not copies.
+    assert chunks[3].obj is envelope["data"]["counts"]
+
+
+def test_encode_ndarray_numpy():
+    numpy = pytest.importorskip("numpy")
+    values = numpy.linspace(0, 1, 5, dtype=numpy.float32)
+    envelope = {"status": SUCCESS, "data": {"values": values}}
+
+    decoded = decode_ndarray(
+        b"".join(encode_ndarray(envelope, {"values": "list[float]"}))
+    )
+
+    assert numpy.array_equal(numpy.asarray(decoded["data"]["values"]), values)
+
+
+def test_encode_ndarray_numpy_non_native_byte_order():
+    numpy = pytest.importorskip("numpy")
+    swapped = "<f8" if sys.byteorder == "big" else ">f8"
+    values = numpy.array([0.5, 1.5, -2.25], dtype=swapped)
+    envelope = {"status": SUCCESS, "data": {"values": values}}
+
+    decoded = decode_ndarray(
+        b"".join(encode_ndarray(envelope, {"values": "list[float]"}))
+    )
+
+    assert list(decoded["data"]["values"]) == [0.5, 1.5, -2.25]
+
+
+def test_encode_ndarray_numpy_unsupported_dtype_stays_json():
+    numpy = pytest.importorskip("numpy")
+    values = numpy.array([0.5, 1.5], dtype=numpy.float16)
+    envelope = {"status": SUCCESS, "data": {"values": values}}
+
+    body = b"".join(encode_ndarray(envelope, {"values": "list[float]"}))
+    header_size = int.from_bytes(body[:4], "little")
+
+    assert b'"arrays":[]' in body[4 : 4 + header_size]
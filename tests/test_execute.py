@@ -0,0 +1,411 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+from structlog.testing import capture_logs
+
+from eidos.execute import error_status, execute, execute_async, execute_stream
+from eidos.executor import FunctionBusyError, concurrency_limits, shutdown_executor
+from eidos.results import result_cache
+from eidos.settings import settings
+
+WHO = [{"name": "who", "type": "str", "description": "Name."}]
+
+
+def salute(who):
+    return f"Hello, {who}!"
+
+
+async def async_salute(who):
+    await asyncio.sleep(0)
+    return f"Hello, {who}!"
+
+
+async def async_fail():
+    raise RuntimeError("boom")
+
+
+def process_id():
+    return os.getpid()
+
+
+def slow():
+    time.sleep(0.5)
+    return "done"
+
+
+CALLS = []
+
+
+def counted_salute(who):
+    CALLS.append(who)
+    return f"Hello, {who}!"
+
+
+def slow_counted_salute(who):
+    CALLS.append(who)
+    time.sleep(0.05)
+    return f"Hello, {who}!"
+
+
+CANCELLED = []
+
+
+async def async_slow():
+    try:
+        await asyncio.sleep(1)
+    except asyncio.CancelledError:
+        CANCELLED.append(True)
+        raise
+    return "done"
+
+
+def socket_timeout():
+    raise TimeoutError("read timed out")
+
+
+async def async_socket_timeout():
+    raise TimeoutError("read timed out")
+
+
+def thread_slow():
+    time.sleep(0.2)
+    return "done"
+
+
+def numbered_thread_slow(n):
+    return thread_slow()
+
+
+def count(n):
+    yield from range(n)
+
+
+def count_list(n):
+    return list(range(n))
+
+
+async def async_count(n):
+    for i in range(n):
+        await asyncio.sleep(0)
+        yield i
+
+
+STEP_STARTED = threading.Event()
+UNBLOCK_STEP = threading.Event()
+
+
+def blocking_count(n):
+    yield 0
+    STEP_STARTED.set()
+    UNBLOCK_STEP.wait(5)
+    yield 1
+
+
+def bad_count(n):
+    yield 0
+    yield "one"
+
+
+N = [{"name": "n", "type": "int", "description": "Number of chunks."}]
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+@pytest.fixture
+def process_pool(monkeypatch):
+    monkeypatch.setattr(settings, "process_executor_max_workers", 1)
+    yield
+    shutdown_executor()
+
+
+def test_execute_async_sync_function(functions):
+    functions.add("salute", "test_execute.salute", WHO, {"msg": "str"})
+
+    result = asyncio.run(execute_async("salute", {"who": "Nikos"}))
+    assert result == {"msg": "Hello, Nikos!"}
+
+
+def test_execute_async_coroutine_function(functions):
+    functions.add("async_salute", "test_execute.async_salute", WHO, {"msg": "str"})
+
+    result = asyncio.run(execute_async("async_salute", {"who": "Nikos"}))
+    assert result == {"msg": "Hello, Nikos!"}
+
+
+def test_execute_coroutine_function_synchronously(functions):
+    functions.add("async_salute", "test_execute.async_salute", WHO, {"msg": "str"})
+
+    assert execute("async_salute", {"who": "Nikos"}) == {"msg": "Hello, Nikos!"}
+
+
+def test_execute_async_coroutine_function_failure(functions):
+    functions.add("async_fail", "test_execute.async_fail")
+
+    with pytest.raises(Exception, match="function execution failed.\nboom"):
+        asyncio.run(execute_async("async_fail", None))
+
+
+def test_execute_async_import_failure(functions):
+    functions.add("missing", "test_execute.missing")
+
+    with pytest.raises(Exception, match="function execution failed"):
+        asyncio.run(execute_async("missing", None))
+
+
+def test_execute_in_process_pool(functions, process_pool):
+    functions.add(
+        "process_id",
+        "test_execute.process_id",
+        response={"pid": "int"},
+        executor="process",
+    )
+
+    pid = execute("process_id", None)["pid"]
+    assert pid != os.getpid()
+    assert asyncio.run(execute_async("process_id", None)) == {"pid": pid}
+
+
+def test_execute_in_process_pool_timeout(functions, process_pool, monkeypatch):
+    monkeypatch.setattr(settings, "process_executor_timeout", 0.05)
+    functions.add("slow", "test_execute.slow", executor="process")
+
+    with pytest.raises(TimeoutError, match="timed out"):
+        asyncio.run(execute_async("slow", None))
+
+
+def test_execute_cached_result(functions):
+    CALLS.clear()
+    functions.add(
+        "cached_salute",
+        "test_execute.counted_salute",
+        WHO,
+        {"msg": "str"},
+        cache={"ttl": 60, "max_entries": 2},
+    )
+
+    assert execute("cached_salute", {"who": "Nikos"}) == {"msg": "Hello, Nikos!"}
+    assert execute("cached_salute", {"who": "Nikos"}) == {"msg": "Hello, Nikos!"}
+    assert asyncio.run(execute_async("cached_salute", {"who": "Nikos"})) == {
+        "msg": "Hello, Nikos!"
+    }
+    assert execute("cached_salute", {"who": "Antonio"}) == {"msg": "Hello, Antonio!"}
+    assert CALLS == ["Nikos", "Antonio"]
+
+    stats = result_cache.stats()["cached_salute"]
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+
+
+def test_execute_without_cache(functions):
+    CALLS.clear()
+    functions.add("salute", "test_execute.counted_salute", WHO, {"msg": "str"})
+
+    execute("salute", {"who": "Nikos"})
+    execute("salute", {"who": "Nikos"})
+    assert CALLS == ["Nikos", "Nikos"]
+
+
+def run_concurrently(*calls):
+    async def main():
+        return await asyncio.gather(
+            *(execute_async(name, arguments) for name, arguments in calls)
+        )
+
+    return asyncio.run(main())
+
+
+def test_execute_async_deduplicates_concurrent_calls(functions):
+    CALLS.clear()
+    functions.add(
+        "salute",
+        "test_execute.slow_counted_salute",
+        WHO,
+        {"msg": "str"},
+        deduplicate=True,
+    )
+
+    results = run_concurrently(
+        ("salute", {"who": "Nikos"}),
+        ("salute", {"who": "Nikos"}),
+        ("salute", {"who": "Antonio"}),
+    )
+
+    assert [result["msg"] for result in results] == [
+        "Hello, Nikos!",
+        "Hello, Nikos!",
+        "Hello, Antonio!",
+    ]
+    assert sorted(CALLS) == ["Antonio", "Nikos"]
+
+
+def test_execute_async_no_deduplication_by_default(functions):
+    CALLS.clear()
+    functions.add("salute", "test_execute.slow_counted_salute", WHO, {"msg": "str"})
+
+    run_concurrently(("salute", {"who": "Nikos"}), ("salute", {"who": "Nikos"}))
+
+    assert CALLS == ["Nikos", "Nikos"]
+
+
+def test_execute_async_deduplication_opt_out(functions, monkeypatch):
+    monkeypatch.setattr(settings, "deduplicate_executions", True)
+    CALLS.clear()
+    functions.add(
+        "salute",
+        "test_execute.slow_counted_salute",
+        WHO,
+        {"msg": "str"},
+        deduplicate=False,
+    )
+
+    run_concurrently(("salute", {"who": "Nikos"}), ("salute", {"who": "Nikos"}))
+
+    assert CALLS == ["Nikos", "Nikos"]
+
+
+def test_execute_async_coroutine_timeout(functions):
+    CANCELLED.clear()
+    functions.add("async_slow", "test_execute.async_slow", timeout_s=0.01)
+
+    with pytest.raises(TimeoutError) as exc_info:
+        asyncio.run(execute_async("async_slow", None))
+    assert error_status(exc_info.value) == 504
+    assert CANCELLED == [True]
+
+
+def test_execute_thread_timeout(functions):
+    functions.add("thread_slow", "test_execute.thread_slow", timeout_s=0.01)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(execute_async("thread_slow", None))
+    with pytest.raises(TimeoutError):
+        execute("thread_slow", None)
+
+
+@pytest.mark.parametrize("module", ["socket_timeout", "async_socket_timeout"])
+def test_execute_function_timeout_error_is_a_failure(functions, module):
+    # A timeout raised by the function itself is not a timeout of the execution.
+    functions.add(module, f"test_execute.{module}", timeout_s=5)
+
+    for run in (
+        lambda: execute(module, None),
+        lambda: asyncio.run(execute_async(module, None)),
+    ):
+        with pytest.raises(Exception, match="function execution failed") as exc_info:
+            run()
+        assert not isinstance(exc_info.value, TimeoutError)
+        assert error_status(exc_info.value) == 500
+
+
+def test_execute_async_max_concurrency(functions):
+    functions.add(
+        "thread_slow",
+        "test_execute.numbered_thread_slow",
+        [{"name": "n", "type": "int", "description": "Call number."}],
+        {"result": "str"},
+        max_concurrency=1,
+    )
+
+    async def main():
+        return await asyncio.gather(
+            execute_async("thread_slow", {"n": 1}),
+            execute_async("thread_slow", {"n": 2}),
+            return_exceptions=True,
+        )
+
+    first, second = asyncio.run(main())
+    assert first == {"result": "done"}
+    assert isinstance(second, FunctionBusyError)
+    assert error_status(second) == 429
+
+
+def test_execute_stream_generator_function(functions):
+    functions.add("count", "test_execute.count", N, {"numbers": "list[int]"})
+
+    chunks = asyncio.run(collect(execute_stream("count", {"n": 3})))
+    assert chunks == [{"numbers": 0}, {"numbers": 1}, {"numbers": 2}]
+
+
+def test_execute_stream_async_generator_function(functions):
+    functions.add("async_count", "test_execute.async_count", N, {"i": "int"})
+
+    chunks = asyncio.run(collect(execute_stream("async_count", {"n": 2})))
+    assert chunks == [{"i": 0}, {"i": 1}]
+
+
+def test_execute_stream_malformed_chunk(functions):
+    functions.add("bad_count", "test_execute.bad_count", N, {"numbers": "list[int]"})
+
+    with pytest.raises(ValueError, match="function result is malformed"):
+        asyncio.run(collect(execute_stream("bad_count", {"n": 2})))
+
+
+def test_execution_errors_are_logged_with_the_function(functions):
+    functions.add("salute", "test_execute.salute", WHO, {"msg": "int"})
+    functions.add("async_fail", "test_execute.async_fail")
+    functions.add("bad_count", "test_execute.bad_count", N, {"numbers": "list[int]"})
+
+    with capture_logs() as events:
+        with pytest.raises(ValueError):
+            execute("salute", {"who": 1})
+        with pytest.raises(ValueError):
+            execute("salute", {"who": "Nikos"})
+        with pytest.raises(Exception, match="execution failed"):
+            execute("async_fail", None)
+        with pytest.raises(ValueError):
+            asyncio.run(collect(execute_stream("bad_count", {"n": 2})))
+
+    errors = [event for event in events if event["log_level"] == "error"]
+    assert [event["function"] for event in errors] == [
+        "salute",
+        "salute",
+        "async_fail",
+        "bad_count",
+    ]
+
+
+def test_execute_stream_not_a_generator(functions):
+    functions.add("salute", "test_execute.salute", WHO, {"msg": "str"})
+
+    with pytest.raises(Exception, match="does not stream its result"):
+        asyncio.run(collect(execute_stream("salute", {"who": "Nikos"})))
+
+
+def test_execute_stream_cancelled_releases_slot(functions):
+    functions.add(
+        "blocking_count",
+        "test_execute.blocking_count",
+        N,
+        {"numbers": "list[int]"},
+        max_concurrency=1,
+    )
+    STEP_STARTED.clear()
+    UNBLOCK_STEP.clear()
+
+    async def cancel_partway():
+        chunks = execute_stream("blocking_count", {"n": 2})
+        assert await anext(chunks) == {"numbers": 0}
+        # Cancel the stream while a worker runs the generator's next step.
+        task = asyncio.create_task(anext(chunks))
+        await asyncio.to_thread(STEP_STARTED.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await chunks.aclose()
+
+    asyncio.run(cancel_partway())
+    # The slot is held until the running step finishes, then released.
+    assert concurrency_limits.running("blocking_count") == 1
+    UNBLOCK_STEP.set()
+    deadline = time.monotonic() + 5
+    while concurrency_limits.running("blocking_count") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert concurrency_limits.running("blocking_count") == 0
+
+    chunks = asyncio.run(collect(execute_stream("blocking_count", {"n": 2})))
+    assert chunks == [{"numbers": 0}, {"numbers": 1}]
@@ -0,0 +1,52 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from eidos.executor import BoundedExecutor, ExecutorBusyError, RecyclingExecutor
+
+
+def test_bounded_executor_runs_tasks():
+    executor = BoundedExecutor(max_workers=2, queue_size=0)
+
+    assert asyncio.run(executor.run(sum, [1, 2, 3])) == 6
+    assert executor.pending == 0
+    executor.shutdown()
+
+
+def test_bounded_executor_rejects_when_full():
+    executor = BoundedExecutor(max_workers=1, queue_size=1)
+    release = threading.Event()
+
+    running = executor.submit(release.wait)
+    queued = executor.submit(release.wait)
+    with pytest.raises(ExecutorBusyError):
+        executor.submit(release.wait)
+    assert executor.pending == 2
+
+    release.set()
+    running.result()
+    queued.result()
+    while executor.pending:
+        time.sleep(0.001)
+    executor.submit(sum, [1]).result()
+    executor.shutdown()
+
+
+def test_recycling_executor_replaces_pool():
+    pools = []
+
+    def create():
+        pools.append(ThreadPoolExecutor(max_workers=1))
+        return pools[-1]
+
+    executor = RecyclingExecutor(create, max_tasks=2)
+    results = [executor.submit(pow, 2, i).result() for i in range(5)]
+    executor.shutdown()
+
+    assert results == [1, 2, 4, 8, 16]
+    assert len(pools) == 3
+    with pytest.raises(RuntimeError):
+        pools[0].submit(pow, 2, 0)
@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from eidos.inflight import InFlightCalls
+
+
+def test_in_flight_calls_share_one_computation():
+    in_flight = InFlightCalls()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(in_flight.run, "key", compute)
+        started.wait()
+        follower = pool.submit(in_flight.run, "key", compute)
+        # Give the follower time to join the call in progress.
+        time.sleep(0.05)
+        release.set()
+        assert leader.result() == "result"
+        assert follower.result() == "result"
+
+    assert calls == [1]
+    assert len(in_flight) == 0
+
+
+def test_in_flight_calls_share_one_coroutine():
+    in_flight = InFlightCalls()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(
+            *(in_flight.run_async("key", compute) for _ in range(5))
+        )
+
+    assert asyncio.run(main()) == ["result"] * 5
+    assert calls == [1]
+    assert len(in_flight) == 0
+
+
+def test_in_flight_calls_share_errors():
+    in_flight = InFlightCalls()
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(
+            *(in_flight.run_async("key", compute) for _ in range(2)),
+            return_exceptions=True,
+        )
+
+    errors = asyncio.run(main())
+    assert all(isinstance(error, ValueError) for error in errors)
+    with pytest.raises(ValueError):
+        asyncio.run(in_flight.run_async("key", compute))
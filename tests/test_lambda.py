@@ -0,0 +1,57 @@
+import importlib
+
+lambda_module = importlib.import_module("eidos.lambda")
+
+
+def test_lambda_execute():
+    event = {
+        "command": "EXECUTE",
+        "parameters": {"function": "salute", "args": {"who": "Nikos"}},
+    }
+    assert lambda_module.lambda_handler(event, {}) == {"msg": "Hello, Nikos! o7"}
+
+
+def test_lambda_execute_batch():
+    event = {
+        "command": "EXECUTE_BATCH",
+        "parameters": {
+            "calls": [
+                {"id": 1, "function": "salute", "arguments": {"who": "Nikos"}},
+                {"id": 2, "function": "salute", "arguments": {"hey": "Nikos"}},
+            ]
+        },
+    }
+    first, second = lambda_module.lambda_handler(event, {})
+    assert first == {
+        "id": 1,
+        "status": {"code": 200, "message": "Success"},
+        "data": {"msg": "Hello, Nikos! o7"},
+    }
+    assert second["id"] == 2
+    assert second["status"]["code"] == 500
+
+
+def test_lambda_execute_batch_missing_calls():
+    event = {"command": "EXECUTE_BATCH", "parameters": {}}
+    assert lambda_module.lambda_handler(event, {})["statusCode"] == 400
+
+
+def test_lambda_initialized():
+    assert set(lambda_module.init_durations) == {
+        "imports_ms",
+        "registry_ms",
+        "preload_ms",
+        "init_ms",
+    }
+    assert lambda_module.registry.get("salute")._function is not None
+
+
+def test_lambda_list_is_kept_across_invocations(monkeypatch):
+    event = {"command": "LIST_NAMES"}
+    first = lambda_module.lambda_handler(event, {})
+    assert lambda_module.lambda_handler(event, {}) is first
+
+    # A change in the definitions drops the kept responses.
+    monkeypatch.setattr(lambda_module.warm_state, "digest", "stale")
+    assert lambda_module.lambda_handler(event, {}) is not first
+    assert lambda_module.lambda_handler(event, {}) == first
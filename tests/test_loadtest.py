@@ -0,0 +1,69 @@
+import argparse
+import asyncio
+import json
+
+import httpx
+import pytest
+
+import eidos.execute
+from eidos.api import app
+from eidos.functions.synthetic import work
+from eidos.loadtest import Profile, percentile, run_load, write_functions
+from eidos.registry import FunctionRegistry
+
+
+def test_work():
+    assert work(sleep_ms=1, cpu_ms=1, result_size=3) == [0, 1, 2]
+
+
+def test_parse_profile():
+    assert Profile.parse("io:20:0.5:100") == Profile("io", 20.0, 0.5, 100)
+    with pytest.raises(argparse.ArgumentTypeError):
+        Profile.parse("io:20")
+
+
+def test_write_functions(tmp_path):
+    profiles = (Profile("fast"), Profile("slow", sleep_ms=10.0))
+    functions = write_functions(tmp_path, 3, profiles)
+
+    assert [(name, profile.name) for name, profile in functions] == [
+        ("synthetic_00000_fast", "fast"),
+        ("synthetic_00001_slow", "slow"),
+        ("synthetic_00002_fast", "fast"),
+    ]
+    definition = json.loads((tmp_path / "synthetic_00001_slow.json").read_text())
+    assert definition["module"] == "eidos.functions.synthetic.work"
+    entries = FunctionRegistry(tmp_path, reload_interval=-1).entries()
+    assert [entry.name for entry in entries] == [name for name, _ in functions]
+
+
+def test_percentile():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([], 50) == 0.0
+
+
+def test_run_load(tmp_path, monkeypatch):
+    profiles = (Profile("fast"), Profile("large", result_size=1000))
+    functions = write_functions(tmp_path, 4, profiles)
+    monkeypatch.setattr(
+        eidos.execute, "registry", FunctionRegistry(tmp_path, reload_interval=-1)
+    )
+
+    async def load():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://eidos"
+        ) as client:
+            return await run_load(client, functions, rps=100, duration=0.2)
+
+    report = asyncio.run(load())
+
+    assert report["requests"] == 20
+    assert report["errors"] == 0
+    assert report["throughput"] > 0
+    assert 0 < report["latency_ms"]["p50"] <= report["latency_ms"]["p99"]
+    assert set(report["profiles"]) == {"fast", "large"}
+    assert sum(stats["requests"] for stats in report["profiles"].values()) == 20
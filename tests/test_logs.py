@@ -0,0 +1,102 @@
+import io
+import json
+
+import pytest
+import structlog
+
+from eidos.logs import LevelFilter, LogWriter, Sampler, level_number, truncate
+from eidos.settings import Settings
+
+
+def test_truncate():
+    assert truncate("short", max_length=10, max_items=3) == "short"
+    assert truncate("x" * 20, max_length=10, max_items=3) == (
+        "xxxxxxxxxx... (20 characters)"
+    )
+    assert truncate(list(range(1000)), max_length=10, max_items=3) == [
+        0,
+        1,
+        2,
+        "... 997 more items",
+    ]
+    assert truncate({"a": 1, "b": 2}, max_length=10, max_items=1) == {
+        "a": 1,
+        "...": "1 more items",
+    }
+    assert truncate([[[[1]]]], max_length=10, max_items=3, depth=2) == [
+        ["<list of 1 items>"]
+    ]
+
+
+def test_level_filter():
+    level_filter = LevelFilter("warning", {"salute": "debug"})
+
+    assert level_filter(None, "error", {"event": "e"}) == {"event": "e"}
+    with pytest.raises(structlog.DropEvent):
+        level_filter(None, "info", {"event": "e"})
+    event = {"event": "e", "function": "salute"}
+    assert level_filter(None, "debug", event) == event
+    with pytest.raises(structlog.DropEvent):
+        level_filter(None, "info", {"event": "e", "function": "other"})
+
+
+def test_sampler():
+    sampler = Sampler(0.0)
+
+    with pytest.raises(structlog.DropEvent):
+        sampler(None, "info", {"event": "e", "function": "salute"})
+    # Errors and events not bound to a function are always kept.
+    assert sampler(None, "error", {"event": "e", "function": "salute"})
+    assert sampler(None, "info", {"event": "e"})
+    assert Sampler(1.0)(None, "info", {"event": "e", "function": "salute"})
+
+
+def test_log_writer():
+    output = io.StringIO()
+    writer = LogWriter(structlog.processors.JSONRenderer(), file=output)
+
+    writer.put("info", {"event": "Running function", "function": "salute"})
+    writer.flush()
+    writer.close()
+
+    assert json.loads(output.getvalue()) == {
+        "event": "Running function",
+        "function": "salute",
+    }
+
+
+def test_log_writer_synchronous_caps_lines():
+    output = io.StringIO()
+    writer = LogWriter(
+        structlog.processors.JSONRenderer(),
+        file=output,
+        queue_size=0,
+        max_line_length=20,
+    )
+
+    writer.put("info", {"event": "x" * 100})
+
+    assert output.getvalue() == '{"event": "xxxxxxxxx... (113 characters)\n'
+
+
+def test_log_writer_counts_dropped_events():
+    output = io.StringIO()
+    writer = LogWriter(structlog.processors.JSONRenderer(), file=output, queue_size=1)
+    writer.dropped = 3
+
+    writer.put("info", {"event": "e"})
+    writer.flush()
+    writer.close()
+
+    dropped, event = map(json.loads, output.getvalue().splitlines())
+    assert dropped["count"] == 3
+    assert event == {"event": "e"}
+
+
+def test_log_level_settings():
+    settings = Settings(log_level="DEBUG", log_function_levels={"salute": "Error"})
+    assert settings.log_level == "debug"
+    assert settings.log_function_levels == {"salute": "error"}
+    assert level_number(settings.log_level) == 10
+    with pytest.raises(ValueError):
+        Settings(log_level="verbose")
@@ -0,0 +1,62 @@
+import pytest
+
+from eidos.execute import execute
+from eidos.metrics import (
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    execution_errors,
+    measure,
+    metrics,
+    stage_duration,
+)
+
+WHO = [{"name": "who", "type": "str", "description": "Name."}]
+
+
+def test_histogram_render():
+    registry = MetricsRegistry()
+    histogram = registry.register(
+        Histogram("latency_seconds", "Latency.", ("stage",), buckets=(0.1, 1.0))
+    )
+    histogram.observe(0.05, "call")
+    histogram.observe(0.5, "call")
+    histogram.observe(5, "call")
+
+    assert registry.render().splitlines() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{stage="call",le="0.1"} 1',
+        'latency_seconds_bucket{stage="call",le="1.0"} 2',
+        'latency_seconds_bucket{stage="call",le="+Inf"} 3',
+        'latency_seconds_sum{stage="call"} 5.55',
+        'latency_seconds_count{stage="call"} 3',
+    ]
+
+
+def test_counter_render_escapes_labels():
+    counter = Counter("errors_total", "Errors.", ("function",))
+    counter.inc('say "hi"')
+
+    assert counter.render()[-1] == 'errors_total{function="say \\"hi\\""} 1'
+
+
+def test_measure_counts_errors():
+    with pytest.raises(ValueError), measure("metrics_test", "call"):
+        raise ValueError("boom")
+
+    assert execution_errors._values[("metrics_test", "call")] == 1
+    assert stage_duration._values[("metrics_test", "call")][0][-1] >= 0
+
+
+def test_execute_records_stages(functions):
+    functions.add("metrics_salute", "test_execute.salute", WHO, {"msg": "str"})
+
+    execute("metrics_salute", {"who": "Nikos"})
+
+    rendered = metrics.render()
+    for stage in ("load", "input", "call", "output"):
+        assert (
+            "eidos_execution_stage_duration_seconds_count"
+            f'{{function="metrics_salute",stage="{stage}"}} 1'
+        ) in rendered
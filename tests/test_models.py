@@ -1,5 +1,5 @@
 import pytest
-from eidos.models.function import load_model
+from eidos.models.function import load_cached_model, load_model, model_cache
 from eidos.models.parameter import AiParameter
 from pydantic import ValidationError
 
@@ -171,3 +171,23 @@ def test_validate_ai_parameter_types_options_type_matching():
     }
     with pytest.raises(ValidationError):
         AiParameter(**values)
+
+
+def test_load_cached_model():
+    json_definition = {
+        "name": "CachedFunction",
+        "parameters": [
+            {
+                "name": "param1",
+                "description": "This is a test parameter.",
+                "type": "str",
+                "required": True,
+            }
+        ],
+    }
+    model, schema = load_cached_model(json_definition, digest="v1")
+
+    assert load_cached_model(json_definition, digest="v1")[0] is model
+    assert load_cached_model(json_definition, digest="v2")[0] is not model
+    assert schema == model.model_json_schema()
+    assert ("CachedFunction", "v1") in model_cache
@@ -0,0 +1,231 @@
+import json
+import os
+
+import pytest
+
+from eidos.models.function import model_cache
+from eidos.registry import DEFAULT_CACHE_MAX_ENTRIES, FunctionRegistry
+
+
+def write_definition(folder, name, description="Say hello to someone.", **extra):
+    definition = {
+        "name": name,
+        "description": description,
+        "module": "eidos.functions.core.salute",
+        "parameters": [
+            {
+                "name": "who",
+                "type": "str",
+                "description": "Name of whom to salute. o7",
+                "required": True,
+            }
+        ],
+        "response": {"msg": "str"},
+        **extra,
+    }
+    file_path = folder / f"{name}.json"
+    file_path.write_text(json.dumps(definition))
+    return file_path
+
+
+def test_registry_scans_folder(tmp_path):
+    write_definition(tmp_path, "salute")
+    write_definition(tmp_path, "greet")
+    registry = FunctionRegistry(tmp_path)
+
+    assert [entry.name for entry in registry.entries()] == ["greet", "salute"]
+    assert registry.get("salute").definition["name"] == "salute"
+    assert registry.generation == 1
+
+
+def test_registry_missing_function(tmp_path):
+    registry = FunctionRegistry(tmp_path)
+
+    with pytest.raises(FileNotFoundError):
+        registry.get("nonexistent")
+
+
+def test_registry_reloads_changed_files(tmp_path):
+    file_path = write_definition(tmp_path, "salute")
+    registry = FunctionRegistry(tmp_path, reload_interval=0)
+    entry = registry.get("salute")
+    assert entry.function("Nikos") == "Hello, Nikos! o7"
+
+    write_definition(tmp_path, "salute", description="Say hello again.")
+    stat = file_path.stat()
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert registry.get("salute").definition["description"] == "Say hello again."
+    assert registry.get("salute") is not entry
+    assert registry.generation == 2
+
+
+def test_registry_keeps_unchanged_entries(tmp_path):
+    write_definition(tmp_path, "salute")
+    registry = FunctionRegistry(tmp_path, reload_interval=0)
+    entry = registry.get("salute")
+
+    write_definition(tmp_path, "greet")
+
+    assert registry.get("salute") is entry
+    assert [entry.name for entry in registry.entries()] == ["greet", "salute"]
+
+
+def test_registry_drops_removed_files(tmp_path):
+    file_path = write_definition(tmp_path, "salute")
+    registry = FunctionRegistry(tmp_path, reload_interval=0)
+    registry.get("salute")
+
+    file_path.unlink()
+
+    assert registry.entries() == []
+    with pytest.raises(FileNotFoundError):
+        registry.get("salute")
+
+
+def test_registry_finds_new_files_without_reload(tmp_path):
+    registry = FunctionRegistry(tmp_path, reload_interval=-1)
+    assert registry.entries() == []
+
+    write_definition(tmp_path, "salute")
+
+    assert registry.get("salute").name == "salute"
+
+
+def test_registry_invalidates_changed_models(tmp_path):
+    file_path = write_definition(tmp_path, "salute")
+    registry = FunctionRegistry(tmp_path, reload_interval=0)
+    entry = registry.get("salute")
+    assert entry.json_schema["required"] == ["who"]
+    assert ("salute", entry.digest) in model_cache
+
+    write_definition(tmp_path, "salute", description="Say hello again.")
+    stat = file_path.stat()
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert registry.get("salute").digest != entry.digest
+    assert ("salute", entry.digest) not in model_cache
+
+
+def test_registry_ignores_touched_files(tmp_path):
+    file_path = write_definition(tmp_path, "salute")
+    registry = FunctionRegistry(tmp_path, reload_interval=0)
+    entry = registry.get("salute")
+
+    stat = file_path.stat()
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert registry.get("salute") is entry
+    assert registry.generation == 1
+
+
+def test_registry_strict_scan_keeps_entries_on_error(tmp_path):
+    file_path = write_definition(tmp_path, "a_salute")
+    registry = FunctionRegistry(tmp_path, reload_interval=-1)
+    entry = registry.get("a_salute")
+
+    write_definition(tmp_path, "a_salute", description="Say hello again.")
+    stat = file_path.stat()
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    (tmp_path / "b_broken.json").write_text("[]")
+
+    with pytest.raises(ValueError):
+        registry.scan(strict=True)
+    assert registry.entries() == [entry]
+    assert registry.generation == 1
+
+
+def test_registry_warm(tmp_path):
+    write_definition(tmp_path, "salute")
+    broken = json.loads((tmp_path / "salute.json").read_text())
+    broken["module"] = "eidos.functions.core.missing"
+    (tmp_path / "broken.json").write_text(json.dumps(broken))
+    registry = FunctionRegistry(tmp_path)
+
+    registry.warm()
+
+    entry = registry.get("salute")
+    assert entry._function is not None
+    assert entry._input_validator is not None
+    assert registry.get("broken")._function is None
+
+
+def test_registry_digest(tmp_path):
+    write_definition(tmp_path, "salute")
+    registry = FunctionRegistry(tmp_path, reload_interval=0)
+    digest = registry.digest
+    assert registry.digest == digest
+
+    write_definition(tmp_path, "salute", description="Say hi to someone.")
+    assert registry.digest != digest
+
+
+@pytest.mark.parametrize(
+    "cache",
+    [True, [], {"max_entries": 0}, {"max_entries": "10"}, {"ttl": "1h"}, {"ttl": -1}],
+)
+def test_registry_rejects_invalid_cache(tmp_path, cache):
+    write_definition(tmp_path, "salute", cache=cache)
+    registry = FunctionRegistry(tmp_path, reload_interval=-1)
+
+    with pytest.raises(FileNotFoundError):
+        registry.get("salute")
+    with pytest.raises(ValueError, match="cache"):
+        registry.scan(strict=True)
+
+
+def test_registry_cache_defaults(tmp_path):
+    write_definition(tmp_path, "salute", cache={})
+    write_definition(tmp_path, "greet", cache={"ttl": 60, "max_entries": 2})
+    write_definition(tmp_path, "uncached")
+    registry = FunctionRegistry(tmp_path, reload_interval=-1)
+
+    assert registry.get("salute").cache == {
+        "max_entries": DEFAULT_CACHE_MAX_ENTRIES,
+        "ttl": None,
+    }
+    assert registry.get("greet").cache == {"max_entries": 2, "ttl": 60}
+    assert registry.get("uncached").cache is None
+    # Validated when loaded, not on every access.
+    assert registry.get("greet").cache is registry.get("greet").cache
+
+
+@pytest.mark.parametrize(
+    "limits",
+    [
+        {"timeout_s": "5"},
+        {"timeout_s": 0},
+        {"timeout_s": True},
+        {"max_concurrency": 0},
+        {"max_concurrency": 1.5},
+        {"max_concurrency": True},
+    ],
+)
+def test_registry_rejects_invalid_limits(tmp_path, limits):
+    write_definition(tmp_path, "salute", **limits)
+    registry = FunctionRegistry(tmp_path, reload_interval=-1)
+
+    with pytest.raises(FileNotFoundError):
+        registry.get("salute")
+    with pytest.raises(ValueError, match=next(iter(limits))):
+        registry.scan(strict=True)
+
+
+def test_registry_accepts_limits(tmp_path):
+    write_definition(tmp_path, "salute", timeout_s=2.5, max_concurrency=4)
+    write_definition(tmp_path, "greet", timeout_s=None, max_concurrency=None)
+    registry = FunctionRegistry(tmp_path, reload_interval=-1)
+
+    assert registry.get("salute").timeout == 2.5
+    assert registry.get("salute").max_concurrency == 4
+    assert registry.get("greet").max_concurrency is None
+
+
+def test_registry_rejects_unknown_executor(tmp_path):
+    write_definition(tmp_path, "salute", executor="proccess")
+    registry = FunctionRegistry(tmp_path, reload_interval=-1)
+
+    with pytest.raises(FileNotFoundError):
+        registry.get("salute")
+    with pytest.raises(ValueError, match="executor"):
+        registry.scan(strict=True)
@@ -0,0 +1,263 @@
+import asyncio
+import socketserver
+import threading
+import time
+
+import pytest
+
+from eidos.registry import FunctionEntry
+from eidos.results import (
+    MemoryBackend,
+    RedisBackend,
+    ResultCache,
+    SQLiteBackend,
+    canonical_arguments,
+)
+
+
+def make_entry(name="lookup", digest="v1", **cache):
+    return FunctionEntry(
+        name=name,
+        path=None,
+        signature=(0, 0, 0),
+        definition={"name": name, "cache": cache or {"max_entries": 2}},
+        digest=digest,
+    )
+
+
+class RedisStandIn(socketserver.ThreadingTCPServer):
+    """Local server answering the subset of the Redis protocol used by the backend."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), RedisStandInHandler)
+        self.values: dict[bytes, tuple[bytes, float | None]] = {}
+        self.indexes: dict[bytes, dict[bytes, float]] = {}
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address
+        return f"redis://{host}:{port}/0"
+
+    def run(self, command: bytes, *args: bytes):
+        now = time.time()
+        match command.upper(), args:
+            case b"GET", (key,):
+                value, expires_at = self.values.get(key, (None, None))
+                if expires_at is not None and expires_at <= now:
+                    return None
+                return value
+            case b"SET", (key, value, *options):
+                expires_at = None
+                if options and options[0].upper() == b"PX":
+                    expires_at = now + int(options[1]) / 1000
+                self.values[key] = (value, expires_at)
+                return "OK"
+            case b"ZADD", (key, *options, score, member):
+                index = self.indexes.setdefault(key, {})
+                if b"XX" in options and member not in index:
+                    return 0
+                added = member not in index
+                index[member] = float(score)
+                return int(added)
+            case b"ZCARD", (key,):
+                return len(self.indexes.get(key, {}))
+            case b"ZPOPMIN", (key, count):
+                index = self.indexes.get(key, {})
+                popped = sorted(index, key=index.get)[: int(count)]
+                return [
+                    item
+                    for member in popped
+                    for item in (member, repr(index.pop(member)).encode())
+                ]
+            case b"DEL", keys:
+                return sum(self.values.pop(key, None) is not None for key in keys)
+            case _:
+                # E.g. the `CLIENT SETINFO` sent by the client when it connects.
+                return "OK"
+
+
+class RedisStandInHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        while line := self.rfile.readline():
+            args = []
+            for _ in range(int(line[1:])):
+                size = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(size + 2)[:-2])
+            with self.server.lock:
+                reply = self.server.run(*args)
+            self.wfile.write(encode_reply(reply))
+
+
+def encode_reply(reply) -> bytes:
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, str):
+        return f"+{reply}\r\n".encode()
+    if isinstance(reply, int):
+        return f":{reply}\r\n".encode()
+    if isinstance(reply, list):
+        return f"*{len(reply)}\r\n".encode() + b"".join(map(encode_reply, reply))
+    return b"$%d\r\n%s\r\n" % (len(reply), reply)
+
+
+@pytest.fixture
+def redis_url():
+    pytest.importorskip("redis")
+    server = RedisStandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def result_cache(request, tmp_path):
+    if request.param == "memory":
+        backend = MemoryBackend()
+    elif request.param == "sqlite":
+        backend = SQLiteBackend(tmp_path / "results.sqlite3")
+    else:
+        backend = RedisBackend(request.getfixturevalue("redis_url"))
+    return ResultCache(backend)
+
+
+def test_canonical_arguments():
+    assert canonical_arguments({"b": 1, "a": 2}) == canonical_arguments(
+        {"a": 2, "b": 1}
+    )
+    assert canonical_arguments(None) == "{}"
+    assert canonical_arguments({"a": object()}) is None
+
+
+def test_result_cache_get_and_set(result_cache):
+    entry = make_entry()
+    key = result_cache.key(entry, {"q": "eidos"})
+    assert result_cache.get(entry, key) is None
+
+    result_cache.set(entry, key, {"result": "found"})
+
+    assert result_cache.get(entry, key) == {"result": "found"}
+    assert result_cache.stats()["lookup"]["hits"] == 1
+    assert result_cache.stats()["lookup"]["misses"] == 1
+
+
+def test_result_cache_keys_on_definition_digest(result_cache):
+    entry = make_entry(digest="v1")
+    result_cache.set(entry, result_cache.key(entry, {}), {"result": "found"})
+
+    changed = make_entry(digest="v2")
+    assert result_cache.get(changed, result_cache.key(changed, {})) is None
+
+
+def test_result_cache_evicts_least_recently_used(result_cache):
+    entry = make_entry(max_entries=2)
+    keys = [result_cache.key(entry, {"q": i}) for i in range(3)]
+    for i, key in enumerate(keys):
+        result_cache.set(entry, key, {"result": i})
+        time.sleep(0.001)
+
+    assert result_cache.get(entry, keys[0]) is None
+    assert result_cache.get(entry, keys[2]) == {"result": 2}
+
+
+def test_result_cache_expires_results(result_cache):
+    entry = make_entry(ttl=0.01)
+    key = result_cache.key(entry, {})
+    result_cache.set(entry, key, {"result": "found"})
+
+    time.sleep(0.02)
+
+    assert result_cache.get(entry, key) is None
+
+
+def test_result_cache_ignores_functions_without_cache(result_cache):
+    entry = FunctionEntry(
+        name="salute",
+        path=None,
+        signature=(0, 0, 0),
+        definition={"name": "salute"},
+        digest="v1",
+    )
+    assert result_cache.key(entry, {}) is None
+
+
+def test_sqlite_backend_is_shared(tmp_path):
+    entry = make_entry()
+    first = ResultCache(SQLiteBackend(tmp_path / "results.sqlite3"))
+    second = ResultCache(SQLiteBackend(tmp_path / "results.sqlite3"))
+
+    first.set(entry, first.key(entry, {}), {"result": "found"})
+
+    assert second.get(entry, second.key(entry, {})) == {"result": "found"}
+
+
+def test_redis_backend_is_shared(redis_url):
+    entry = make_entry()
+    first = ResultCache(RedisBackend(redis_url))
+    second = ResultCache(RedisBackend(redis_url))
+
+    first.set(entry, first.key(entry, {}), {"result": "found"})
+
+    assert second.get(entry, second.key(entry, {})) == {"result": "found"}
+
+
+def test_redis_backend_unreachable_is_a_miss():
+    pytest.importorskip("redis")
+    entry = make_entry()
+    cache = ResultCache(RedisBackend("redis://127.0.0.1:1/0"))
+    key = cache.key(entry, {})
+
+    cache.set(entry, key, {"result": "found"})
+
+    assert cache.get(entry, key) is None
+    assert cache.stats()["lookup"]["misses"] == 1
+
+
+class ThreadRecordingBackend(MemoryBackend):
+    blocking = True
+
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def get(self, entry, key):
+        self.threads.add(threading.get_ident())
+        return super().get(entry, key)
+
+    def set(self, entry, key, result):
+        self.threads.add(threading.get_ident())
+        super().set(entry, key, result)
+
+
+def test_result_cache_async_runs_blocking_backends_in_threads():
+    entry = make_entry()
+    backend = ThreadRecordingBackend()
+    cache = ResultCache(backend)
+    key = cache.key(entry, {})
+
+    async def main():
+        await cache.set_async(entry, key, {"result": "found"})
+        return await cache.get_async(entry, key)
+
+    assert asyncio.run(main()) == {"result": "found"}
+    assert backend.threads and threading.get_ident() not in backend.threads
+    assert SQLiteBackend.blocking and not MemoryBackend.blocking
+
+
+def test_result_cache_empty_block_opts_in(result_cache):
+    entry = FunctionEntry(
+        name="lookup",
+        path=None,
+        signature=(0, 0, 0),
+        definition={"name": "lookup", "cache": {}},
+        digest="v1",
+    )
+    key = result_cache.key(entry, {})
+    assert key is not None
+
+    result_cache.set(entry, key, {"result": "found"})
+    assert result_cache.get(entry, key) == {"result": "found"}
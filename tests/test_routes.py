@@ -1,4 +1,7 @@
+import eidos.encoding
+import eidos.routes.execution
 from eidos.api import app
+from eidos.encoding import NDARRAY_MEDIA_TYPE, decode_ndarray, get_encoder
 from eidos.secure import query_scheme
 from fastapi.testclient import TestClient
 
@@ -89,3 +92,160 @@ def test_function_execute_bad_arguments():
             "message": "Error: function arguments are malformed.\nUnknown argument hey: not found in schema.",
         },
     }
+
+
+def test_list_functions():
+    response = client.get("/api/v1/functions/")
+    assert response.status_code == 200
+    assert [fn["name"] for fn in response.json()] == ["salute"]
+    assert response.headers["etag"]
+
+
+def test_list_functions_names():
+    response = client.get("/api/v1/functions/names")
+    assert response.status_code == 200
+    assert response.json() == ["salute"]
+
+
+def test_list_functions_not_modified():
+    etag = client.get("/api/v1/functions/").headers["etag"]
+
+    response = client.get("/api/v1/functions/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    response = client.get("/api/v1/functions/", headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+
+
+def test_list_functions_gzip():
+    response = client.get(
+        "/api/v1/functions/names", headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == ["salute"]
+
+    response = client.get(
+        "/api/v1/functions/names", headers={"Accept-Encoding": "gzip;q=0"}
+    )
+    assert "content-encoding" not in response.headers
+
+
+def test_function_execute_batch():
+    response = client.post(
+        "/api/v1/execution/batch",
+        json=[
+            {"id": "a", "function": "salute", "arguments": {"who": "Nikos"}},
+            {"id": "b", "function": "nonexistent"},
+        ],
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "id": "a",
+            "data": {"msg": "Hello, Nikos! o7"},
+            "status": {"code": 200, "message": "Success"},
+        },
+        {
+            "id": "b",
+            "data": None,
+            "status": {"code": 500, "message": "Error: function module not found."},
+        },
+    ]
+
+
+def test_function_execute_stream(functions):
+    functions.add(
+        "count",
+        "test_execute.count",
+        [{"name": "n", "type": "int", "description": "Number of chunks."}],
+        {"numbers": "list[int]"},
+    )
+
+    response = client.post("/api/v1/execution/count/stream", json={"n": 2})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.text == '{"data":{"numbers":0}}\n{"data":{"numbers":1}}\n'
+
+    response = client.post(
+        "/api/v1/execution/count/stream",
+        json={"n": 1},
+        headers={"Accept": "text/event-stream"},
+    )
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text == 'data: {"data":{"numbers":0}}\n\n'
+
+
+def test_function_execute_stream_missing():
+    response = client.post("/api/v1/execution/nonexistent/stream")
+    assert response.status_code == 500
+    assert response.json()["status"]["message"] == "Error: function module not found."
+
+
+def test_function_execute_ndarray(functions):
+    functions.add(
+        "count",
+        "test_execute.count_list",
+        [{"name": "n", "type": "int", "description": "Number of elements."}],
+        {"numbers": "list[int]"},
+    )
+
+    response = client.post(
+        "/api/v1/execution/count", json={"n": 3}, headers={"Accept": NDARRAY_MEDIA_TYPE}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == NDARRAY_MEDIA_TYPE
+    assert response.headers["content-length"] == str(len(response.content))
+    assert decode_ndarray(response.content)["data"]["numbers"].tolist() == [0, 1, 2]
+
+    response = client.post("/api/v1/execution/count", json={"n": 3})
+    assert response.json()["data"] == {"numbers": [0, 1, 2]}
+
+
+def test_metrics():
+    client.post("/api/v1/execution/salute", json={"who": "Nikos"})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "eidos_execution_stage_duration_seconds_bucket" in response.text
+
+
+def not_a_number():
+    return float("nan")
+
+
+def large_number():
+    return 2**70
+
+
+def test_function_execute_unserializable_result(functions, monkeypatch):
+    functions.add("not_a_number", "test_routes.not_a_number", response={"x": "float"})
+    functions.add("large_number", "test_routes.large_number", response={"x": "int"})
+    json_dumps = get_encoder("json")
+    monkeypatch.setattr(eidos.encoding, "dumps", json_dumps)
+    monkeypatch.setattr(eidos.routes.execution, "dumps", json_dumps)
+
+    response = client.post("/api/v1/execution/not_a_number")
+    assert response.status_code == 500
+    assert response.json()["status"]["message"].startswith(
+        "Error: function result cannot be serialized."
+    )
+
+    response = client.post("/api/v1/execution/large_number")
+    assert response.status_code == 200
+    assert response.json()["data"] == {"x": 2**70}
+
+    response = client.post(
+        "/api/v1/execution/batch",
+        json=[
+            {"id": "a", "function": "not_a_number"},
+            {"id": "b", "function": "large_number"},
+        ],
+    )
+    assert response.status_code == 200
+    first, second = response.json()
+    assert first["id"] == "a"
+    assert first["status"]["code"] == 500
+    assert second["data"] == {"x": 2**70}
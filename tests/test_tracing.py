@@ -0,0 +1,122 @@
+import importlib
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from eidos.execute import execute
+from eidos.tracing import (
+    NOOP_SPAN,
+    FileExporter,
+    InMemoryExporter,
+    Tracer,
+    parse_traceparent,
+    tracer,
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+TRACEPARENT = f"00-{TRACE_ID}-00f067aa0ba902b7-01"
+
+WHO = [{"name": "who", "type": "str", "description": "Name."}]
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    exporter = InMemoryExporter()
+    monkeypatch.setattr(tracer, "exporter", exporter)
+    return exporter.spans
+
+
+def test_parse_traceparent():
+    assert parse_traceparent(TRACEPARENT) == (TRACE_ID, "00f067aa0ba902b7")
+    assert parse_traceparent("00-xyz-00f067aa0ba902b7-01") is None
+    assert parse_traceparent(f"00-{'0' * 32}-00f067aa0ba902b7-01") is None
+    assert parse_traceparent(None) is None
+
+
+def test_disabled_tracer():
+    with Tracer().start_span("lookup") as span:
+        assert span is NOOP_SPAN
+
+
+def test_nested_spans(tmp_path):
+    exporter = FileExporter(tmp_path / "traces.jsonl")
+    tracer_ = Tracer(exporter)
+
+    with (
+        tracer_.start_span("request", traceparent=TRACEPARENT) as parent,
+        pytest.raises(ValueError),
+        tracer_.start_span("validation") as child,
+    ):
+        raise ValueError("boom")
+    exporter.close()
+
+    assert child.trace_id == parent.trace_id == TRACE_ID
+    assert child.parent_id == parent.span_id
+    assert parent.parent_id == "00f067aa0ba902b7"
+    assert child.status == {"code": "ERROR", "message": "boom"}
+    assert len((tmp_path / "traces.jsonl").read_text().splitlines()) == 2
+
+
+def test_file_exporter_writes_in_background(tmp_path):
+    exporter = FileExporter(tmp_path / "traces.jsonl", queue_size=1)
+    tracer_ = Tracer(exporter)
+
+    with tracer_.start_span("request") as span:
+        pass
+    exporter.flush()
+
+    (line,) = (tmp_path / "traces.jsonl").read_text().splitlines()
+    assert json.loads(line)["spanId"] == span.span_id
+    # Spans beyond the queue are dropped instead of blocking.
+    exporter._queue.put(None)
+    exporter._thread.join()
+    exporter.export(span)
+    exporter.export(span)
+    assert exporter.dropped == 1
+
+
+def test_execute_spans(functions, spans):
+    functions.add("salute", "test_execute.salute", WHO, {"msg": "str"})
+
+    execute("salute", {"who": "Nikos"})
+
+    by_name = {span.name: span for span in spans}
+    assert set(by_name) == {"lookup", "validation", "invocation", "execute"}
+    root = by_name["execute"]
+    assert root.parent_id is None
+    for name in ("lookup", "validation", "invocation"):
+        assert by_name[name].parent_id == root.span_id
+        assert by_name[name].trace_id == root.trace_id
+
+
+def test_http_request_spans(spans):
+    from eidos.api import app
+
+    client = TestClient(app, root_path="")
+    client.post(
+        "/api/v1/execution/salute",
+        json={"who": "Nikos"},
+        headers={"traceparent": TRACEPARENT},
+    )
+
+    names = [span.name for span in spans]
+    assert "POST /api/v1/execution/salute" in names
+    assert "serialization" in names
+    assert {span.trace_id for span in spans} == {TRACE_ID}
+    request = next(span for span in spans if span.name.startswith("POST"))
+    assert request.attributes["http.status_code"] == 200
+
+
+def test_lambda_spans(spans):
+    lambda_module = importlib.import_module("eidos.lambda")
+    event = {
+        "command": "EXECUTE",
+        "traceparent": TRACEPARENT,
+        "parameters": {"function": "salute", "args": {"who": "Nikos"}},
+    }
+
+    lambda_module.lambda_handler(event, {})
+
+    assert "lambda EXECUTE" in [span.name for span in spans]
+    assert {span.trace_id for span in spans} == {TRACE_ID}
@@ -1,7 +1,14 @@
 import json
+import os
 
 import pytest
-from eidos.utils import import_function
+from eidos.utils import (
+    import_function,
+    invalidate_json,
+    json_cache,
+    json_cache_stats,
+    json_load,
+)
 
 
 def test_import_function_success():
@@ -31,3 +38,25 @@ def test_import_function_invalid_module_string(module_str):
     with pytest.raises(ValueError) as exc_info:
         import_function(module_str)
     assert "You can't import built-in modules" in str(exc_info.value)
+
+
+def test_json_load_reloads_changed_files(tmp_path):
+    file_path = tmp_path / "salute.json"
+    file_path.write_text(json.dumps({"name": "salute"}))
+    invalidate_json()
+
+    assert json_load(file_path) == {"name": "salute"}
+    assert json_load(str(file_path)) is json_load(file_path)
+
+    # Atomically replaced with a file of the same size.
+    replacement = tmp_path / "replacement.json"
+    replacement.write_text(json.dumps({"name": "salutf"}))
+    os.replace(replacement, file_path)
+    assert json_load(file_path) == {"name": "salutf"}
+
+    stats = json_cache_stats()
+    assert stats["hits"] >= 2
+    assert stats["misses"] >= 2
+
+    invalidate_json(file_path)
+    assert str(file_path) not in json_cache
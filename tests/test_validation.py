@@ -1,5 +1,15 @@
+import array
+import pickle
+
 import pytest
+from eidos.validation.schema import (
+    InputValidator,
+    OutputValidator,
+    validate_input_schema,
+    validate_output_schema,
+)
 from eidos.validation.type import (
+    TypeChecker,
     get_variable_type_name,
     is_value_of_type,
     parse_type_name,
@@ -57,6 +67,90 @@ def test_is_value_of_type(value, type_str, accept_none, expected_result):
     assert is_value_of_type(value, type_str, accept_none) == expected_result
 
 
+@pytest.mark.parametrize(
+    "value,type_str,accept_none,expected_result",
+    [
+        (123, "int", False, True),
+        ("test", "str", False, True),
+        ([1, 2, 3], "list[int]", False, True),
+        ([1, "2", 3], "list[int]", False, False),
+        ([1, None, 3], "list[int]", True, True),
+        (None, "str", True, True),
+        ({"key": "value"}, "dict", False, True),
+        (None, "dict", False, False),
+    ],
+)
+def test_type_checker(value, type_str, accept_none, expected_result):
+    assert TypeChecker(type_str, accept_none)(value) == expected_result
+
+
+def test_type_checker_unknown_type():
+    check = TypeChecker("unknown_type")
+    with pytest.raises(AttributeError):
+        check("value")
+
+
+SCHEMA = [
+    {"name": "who", "type": "str", "description": "Name."},
+    {
+        "name": "times",
+        "type": "int",
+        "description": "Repetitions.",
+        "required": False,
+        "default": 1,
+    },
+]
+
+
+def test_input_validator():
+    validator = InputValidator(SCHEMA)
+    assert validator({"who": "Nikos"}) == {"who": "Nikos", "times": 1}
+    assert validator({"who": "Nikos", "times": 3}) == {"who": "Nikos", "times": 3}
+    assert validator({"who": "Nikos"}) == validate_input_schema(
+        {"who": "Nikos"}, SCHEMA
+    )
+
+
+@pytest.mark.parametrize(
+    "arguments,error,message",
+    [
+        ({"who": "Nikos", "hey": 1}, ValueError, "Unknown argument hey"),
+        ({"times": 3}, ValueError, "Argument who is required"),
+        (
+            {"who": "Nikos", "times": "3"},
+            TypeError,
+            "Argument times is not of type int",
+        ),
+    ],
+)
+def test_input_validator_errors(arguments, error, message):
+    with pytest.raises(error, match=message):
+        InputValidator(SCHEMA)(arguments)
+
+
+def test_output_validator():
+    assert OutputValidator({"msg": "str"})("hello") == {"msg": "hello"}
+    assert OutputValidator({"a": "int", "b": "list[int]"})((1, [2, None])) == {
+        "a": 1,
+        "b": [2, None],
+    }
+    with pytest.raises(TypeError):
+        OutputValidator({"msg": "str"})(1)
+    with pytest.raises(ValueError):
+        OutputValidator({"a": "int", "b": "int"})((1, 2, 3))
+
+
+def test_validate_output_schema_does_not_modify_schema():
+    schema = {"msg": "str"}
+    assert validate_output_schema("hello", schema) == {"msg": "hello"}
+    assert schema == {"msg": "str"}
+
+
+def test_validators_are_picklable():
+    validator = pickle.loads(pickle.dumps(InputValidator(SCHEMA)))
+    assert validator({"who": "Nikos"}) == {"who": "Nikos", "times": 1}
+
+
 @pytest.mark.parametrize(
     "variable,type_str",
     [
@@ -115,3 +209,35 @@ def test_validate_schema_type_generic_type_failure(schema_type):
     assert "Generic type" in str(exc_info.value) and "is not allowed for 'list'" in str(
         exc_info.value
     )
+
+
+@pytest.mark.parametrize(
+    "value,type_str,accept_none,expected_result",
+    [
+        ([1, 2, 3] * 5000, "list[int]", False, True),
+        ([1, 2, 3] * 5000 + ["4"], "list[int]", False, False),
+        ([True, False] * 5000, "list[int]", False, True),
+        ([1.0, None] * 5000, "list[float]", True, True),
+        ([1.0, None] * 5000, "list[float]", False, False),
+        ([1.0, 2] * 5000, "list[float]", False, False),
+        ((1.0, 2.0), "list[float]", False, True),
+        ([], "list[bool]", False, True),
+        (array.array("d", [1.0, 2.0]), "list[float]", False, True),
+        (array.array("q", [1, 2]), "list[int]", False, True),
+        (array.array("q", [1, 2]), "list[float]", False, False),
+        (array.array("q"), "list[float]", False, True),
+    ],
+)
+def test_type_checker_large_lists(value, type_str, accept_none, expected_result):
+    assert TypeChecker(type_str, accept_none)(value) == expected_result
+    assert is_value_of_type(value, type_str, accept_none) == expected_result
+
+
+def test_type_checker_numpy_arrays():
+    numpy = pytest.importorskip("numpy")
+
+    assert TypeChecker("list[float]", accept_arrays=True)(numpy.zeros(3))
+    assert TypeChecker("list[int]", accept_arrays=True)(numpy.arange(3))
+    assert not TypeChecker("list[float]", accept_arrays=True)(numpy.arange(3))
+    assert not TypeChecker("list[int]", accept_arrays=True)(numpy.zeros((2, 2)))
+    assert not TypeChecker("list[int]")(numpy.arange(3))